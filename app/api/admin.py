@@ -1,17 +1,86 @@
-from fastapi import APIRouter, Depends
+import time
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.config import get_settings
+from app.core.database import get_write_db
+from app.core.profiler import profiler, sign_profile_header
 from app.dependencies import require_admin
-from app.ingest.ingest import ingest_once
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# Jobs are imported on first use: ingest pulls in feedparser, BeautifulSoup and httpx,
+# and rescore numpy, none of which a worker needs to start serving.
+
 
 @router.post("/ingest")
-def run_ingest(_=Depends(require_admin), db: Session = Depends(get_db)):
+def run_ingest(_=Depends(require_admin), db: Session = Depends(get_write_db)):
+    from app.ingest.ingest import ingest_once
+
     inserted = ingest_once(db)
     return {"inserted": inserted}
 
 
+@router.post("/rescore")
+def run_rescore(background_tasks: BackgroundTasks, _=Depends(require_admin)):
+    from app.jobs.rescore import run_rescore as rescore
+
+    # Whole-table, so off the request: no writer held by the request, no statement timeout
+    background_tasks.add_task(rescore)
+    return {"status": "scheduled"}
+
+
+@router.post("/reconcile-votes")
+def run_vote_reconciliation(background_tasks: BackgroundTasks, restart: bool = False, _=Depends(require_admin)):
+    from app.jobs.reconcile_votes import run_reconcile
+
+    # Throttled and checkpointed; runs after the response is sent
+    background_tasks.add_task(run_reconcile, restart)
+    return {"status": "scheduled"}
+
+
+@router.post("/learn-source-scores")
+def run_source_score_learning(background_tasks: BackgroundTasks, _=Depends(require_admin)):
+    from app.jobs.learn_source_scores import run_learn_source_scores
+
+    background_tasks.add_task(run_learn_source_scores)
+    return {"status": "scheduled"}
+
+
+@router.post("/profile")
+def start_request_profile(requests: int = Query(default=10, ge=1), _=Depends(require_admin)):
+    """Sample every thread until `requests` requests started after this one have finished."""
+    requests = min(requests, get_settings().profile_max_requests)
+    if not profiler.arm(requests):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return {"status": "armed", "requests": requests}
+
+
+@router.post("/profile/ingest")
+def start_ingest_profile(background_tasks: BackgroundTasks, _=Depends(require_admin)):
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    background_tasks.add_task(profiler.profile_ingest)
+    return {"status": "scheduled"}
+
+
+@router.post("/profile/header")
+def profile_header(_=Depends(require_admin)):
+    """A signed X-Profile value; a request sent with it returns the worker's stacks while it ran."""
+    settings = get_settings()
+    if not settings.profile_signing_key:
+        raise HTTPException(status_code=404, detail="profile_signing_key is not configured")
+    expires_at = int(time.time()) + settings.profile_header_ttl_seconds
+    return {"header": "X-Profile", "value": sign_profile_header(settings.profile_signing_key, expires_at)}
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+def last_profile(_=Depends(require_admin)):
+    """The last finished profile, in collapsed-stack format (flamegraph.pl, speedscope)."""
+    if profiler.last_profile is None:
+        status = 202 if profiler.running else 404
+        raise HTTPException(status_code=status, detail="Profile still running" if profiler.running else "No profile yet")
+    return profiler.last_profile
@@ -1,117 +1,173 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, insert, select
 
-from app.core.database import get_db
-from app.core.credibility import compute_credibility
+from app.core.async_database import get_async_read_db, get_async_write_db
+from app.core.database import mark_recent_write
+from app.core.credibility import compute_credibility, hot_score
+from app.core.http_cache import make_etag, etag_matches, cache_headers, not_modified
+from app.core.serialization import FastJSONResponse
+from app.core.events import event_bus, sse_stream
+from app.core.front_page import CREDIBILITY_TAGS, front_page, hydrate
 from app.dependencies import get_current_user
 from app.models.article import Article, ArticleSource
 from app.models.source import Source
-from app.schemas.article import ArticleIn, ArticleOut
+from app.schemas.article import ArticleIn, ArticleOut, ArticleListOut, article_dict
 
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 
+# The list, detail and create routes are async on AsyncSession, so a request waiting on
+# the database holds no threadpool thread. Sync helpers run through db.run_sync.
+
+
+def _feed_version(db: Session) -> str:
+    """Cheap fingerprint of the articles table: changes on every insert or update."""
+    last_updated, last_id = db.query(func.max(Article.updated_at), func.max(Article.id)).one()
+    return f"{last_updated.isoformat() if last_updated else ''}-{last_id or 0}"
+
 
-@router.get("", response_model=list[dict])
-def list_articles(
-    db: Session = Depends(get_db),
+@router.get("", response_model=list[ArticleListOut])
+async def list_articles(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
     tag: str | None = Query(default=None),
     source_id: int | None = Query(default=None),
     q: str | None = Query(default=None),
     sort: str | None = Query(default=None),
     limit: int = Query(default=50, le=100),
 ):
-    query_ = db.query(Article)
-    if tag and tag.lower() not in {"undefined", "null", "none", ""}:
-        query_ = query_.filter(Article.credibility_tag == tag)
+    # top_week also depends on the clock, so its tag rolls over daily
+    window = date.today().isoformat() if sort == "top_week" else ""
+    version = await db.run_sync(_feed_version)
+    etag = make_etag(version, tag, source_id, q, sort, limit, window)
+    headers = cache_headers(request, etag)
+    if etag_matches(request, etag):
+        return not_modified(headers)
+
+    if tag and tag.lower() in {"undefined", "null", "none", ""}:
+        tag = None
+
+    # Unfiltered front-page views are served from the in-memory snapshots, rebuilt when
+    # the version in the ETag is newer than the one they were built at
+    if not source_id and not q and sort != "hot" and (tag is None or tag in CREDIBILITY_TAGS):
+        view_sort = sort if sort in ("top_week", "top_all") else "latest"
+        ids = await db.run_sync(front_page.ids, tag, view_sort, limit, version)
+        result = [article_dict(article, source) for article, source in await db.run_sync(hydrate, ids)]
+        return FastJSONResponse(result, headers=headers)
+
+    query_ = select(Article.id)
+    if tag:
+        query_ = query_.where(Article.credibility_tag == tag)
     if source_id:
-        query_ = query_.join(ArticleSource).filter(ArticleSource.source_id == source_id)
+        query_ = query_.join(ArticleSource).where(ArticleSource.source_id == source_id)
     if q:
         term = f"%{q.strip()}%"
-        query_ = query_.filter(or_(Article.title.ilike(term), Article.content_snippet.ilike(term)))
+        query_ = query_.where(or_(Article.title.ilike(term), Article.content_snippet.ilike(term)))
     # Sorting
     if sort == "top_week":
-        one_week_ago = func.datetime(func.current_timestamp(), "-7 days")
-        query_ = query_.filter(Article.created_at >= one_week_ago).order_by((Article.upvotes - Article.downvotes).desc())
+        one_week_ago = datetime.utcnow() - timedelta(days=7)
+        query_ = query_.where(Article.created_at >= one_week_ago).order_by((Article.upvotes - Article.downvotes).desc())
     elif sort == "top_all":
         query_ = query_.order_by((Article.upvotes - Article.downvotes).desc(), Article.created_at.desc())
+    elif sort == "hot":
+        # Stored at write time, so this is an index scan on ix_articles_hot_score
+        query_ = query_.order_by(Article.hot_score.desc(), Article.id.desc())
     else:
         query_ = query_.order_by(Article.created_at.desc())
     query_ = query_.limit(limit)
     
-    articles = query_.all()
-    result = []
-    for article in articles:
-        # Get source information
-        source_info = db.query(Source).join(ArticleSource).filter(ArticleSource.article_id == article.id).first()
-        article_dict = {
-            "id": article.id,
-            "title": article.title,
-            "canonical_url": article.canonical_url,
-            "content_snippet": article.content_snippet,
-            "thumbnail_url": article.thumbnail_url,
-            "published_at": article.published_at,
-            "upvotes": article.upvotes,
-            "downvotes": article.downvotes,
-            "credibility_score": article.credibility_score,
-            "credibility_tag": article.credibility_tag,
-            "created_at": article.created_at,
-            "source_name": source_info.name if source_info else "Unknown",
-            "source_id": source_info.id if source_info else None,
-        }
-        result.append(article_dict)
-    
-    return result
+    ids = list(await db.scalars(query_))
+    result = [article_dict(article, source) for article, source in await db.run_sync(hydrate, ids)]
+
+    return FastJSONResponse(result, headers=headers)
+
+
+@router.get("/stream")
+async def stream_articles(request: Request, last_event_id: str | None = Header(default=None)):
+    """Server-Sent Events: `article` for new stories, `vote` for count/credibility changes."""
+    return StreamingResponse(
+        sse_stream(event_bus, request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{article_id}", response_model=ArticleOut)
-def get_article(article_id: int, db: Session = Depends(get_db)):
-    art = db.query(Article).filter(Article.id == article_id).first()
+async def get_article(
+    article_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)
+):
+    art = await db.get(Article, article_id)
     if not art:
         raise HTTPException(status_code=404, detail="Article not found")
+    etag = make_etag(art.id, (art.updated_at or art.created_at).isoformat())
+    headers = cache_headers(request, etag)
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
     return art
 
 
 @router.post("", response_model=ArticleOut)
-def create_article(
+async def create_article(
     payload: ArticleIn,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_write_db),
     _user=Depends(get_current_user),
 ):
-    existing = db.query(Article).filter(Article.canonical_url == str(payload.canonical_url)).first()
+    existing = (await db.scalars(select(Article).where(Article.canonical_url == str(payload.canonical_url)))).first()
     if existing:
         return existing
 
+    sources = {}
+    if payload.sources:
+        source_ids = {s.source_id for s in payload.sources}
+        sources = {src.id: src for src in await db.scalars(select(Source).where(Source.id.in_(source_ids)))}
+    for s in payload.sources:
+        if s.source_id not in sources:
+            raise HTTPException(status_code=400, detail=f"Source {s.source_id} not found")
+
+    # Compute initial credibility using avg source score
+    if payload.sources:
+        avg_source_score = sum(sources[s.source_id].source_score for s in payload.sources) / len(payload.sources)
+    else:
+        avg_source_score = 0.5
+
+    # Scored before the INSERT so the row is written once, not inserted and then updated
+    created_at = datetime.utcnow()
+    score, tag = compute_credibility(0, 0, avg_source_score)
     article = Article(
         title=payload.title,
         canonical_url=str(payload.canonical_url),
         content_snippet=payload.content_snippet,
         published_at=payload.published_at,
         thumbnail_url=str(payload.thumbnail_url) if payload.thumbnail_url else None,
+        avg_source_score=avg_source_score,
+        upvotes=0,
+        downvotes=0,
+        credibility_score=score,
+        credibility_tag=tag,
+        hot_score=hot_score(0, 0, score, created_at),
+        created_at=created_at,
     )
     db.add(article)
-    db.flush()
-
-    for s in payload.sources:
-        src = db.query(Source).filter(Source.id == s.source_id).first()
-        if not src:
-            raise HTTPException(status_code=400, detail=f"Source {s.source_id} not found")
-        db.add(ArticleSource(article_id=article.id, source_id=src.id, url=str(s.url)))
+    await db.flush()
 
-    # Compute initial credibility using avg source score
     if payload.sources:
-        avg_source_score = sum(
-            db.query(Source).filter(Source.id == s.source_id).first().source_score for s in payload.sources
-        ) / len(payload.sources)
-    else:
-        avg_source_score = 0.5
-    score, tag = compute_credibility(article.upvotes, article.downvotes, avg_source_score)
-    article.credibility_score = score
-    article.credibility_tag = tag
+        # One executemany for all the links, not one INSERT per source
+        await db.execute(
+            insert(ArticleSource),
+            [{"article_id": article.id, "source_id": s.source_id, "url": str(s.url)} for s in payload.sources],
+        )
 
-    db.commit()
-    db.refresh(article)
+    await db.commit()
+    mark_recent_write(response)
+    first_source = sources[payload.sources[0].source_id] if payload.sources else None
+    event_bus.publish("article", article_dict(article, first_source))
     return article
 
 
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.database import get_db
-from app.core.security import create_access_token, verify_password, get_password_hash
+from app.core.database import get_db, get_write_db
+from app.core.security import create_access_token, password_hasher
 from app.models.user import User
 from app.schemas.auth import Token, UserCreate, UserOut
 from app.core.config import get_settings
@@ -11,44 +12,81 @@ from app.core.config import get_settings
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# These handlers are async so bcrypt waits on password_hasher's pool without holding
+# a threadpool thread; their short DB calls still go through run_in_threadpool.
+# The hashing slot is their first dependency, so a full queue is rejected before any DB work.
+# Lookups use the primary (get_db); only the final write takes the writer (get_write_db).
 
-@router.post("/register", response_model=UserOut)
-def register(data: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == data.email).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    user = User(email=data.email, password_hash=get_password_hash(data.password))
+
+def _user_by_email(db: Session, email: str) -> User | None:
+    user = db.query(User).filter(User.email == email).first()
+    # Return the connection to the pool before hashing; the detached user keeps its loaded fields
+    db.close()
+    return user
+
+
+def _save(db: Session, user: User) -> User:
+    # A user detached by _user_by_email is re-attached here, with its changes
     db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
 
-@router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+async def _authenticate(db: Session, write_db: Session, email: str, password: str) -> User:
+    user = await run_in_threadpool(_user_by_email, db, email)
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect username or password")
+    valid, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
+    if new_hash:
+        # Stored with an older bcrypt cost: upgrade while we have the plaintext
+        user.password_hash = new_hash
+        await run_in_threadpool(_save, write_db, user)
+    return user
+
+
+@router.post("/register", response_model=UserOut)
+async def register(
+    data: UserCreate,
+    _slot=Depends(password_hasher.slot),
+    db: Session = Depends(get_db),
+    write_db: Session = Depends(get_write_db),
+):
+    existing = await run_in_threadpool(_user_by_email, db, data.email)
+    if existing:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    user = User(email=data.email, password_hash=await password_hasher.hash(data.password))
+    return await run_in_threadpool(_save, write_db, user)
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    _slot=Depends(password_hasher.slot),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+    write_db: Session = Depends(get_write_db),
+):
+    user = await _authenticate(db, write_db, form_data.username, form_data.password)
     token = create_access_token(subject=str(user.id))
     return Token(access_token=token)
 
 
 @router.post("/promote_self", response_model=UserOut)
-def promote_self(db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()):
+async def promote_self(
+    _slot=Depends(password_hasher.slot),
+    db: Session = Depends(get_db),
+    write_db: Session = Depends(get_write_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+):
     """Dev/test convenience: promote the user to admin if not in prod.
     Requires valid credentials; returns 403 in prod.
     """
     settings = get_settings()
     if settings.environment == "prod":
         raise HTTPException(status_code=403, detail="Not allowed in prod")
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
-        raise HTTPException(status_code=400, detail="Incorrect username or password")
+    user = await _authenticate(db, write_db, form_data.username, form_data.password)
     if not user.is_admin:
         user.is_admin = True
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        user = await run_in_threadpool(_save, write_db, user)
     return user
-
-
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.async_database import get_async_read_db, get_async_write_db
+from app.core.database import mark_recent_write
+from app.core.serialization import FastJSONResponse, rows_to_dicts
 from app.dependencies import get_current_user
 from app.models.comment import Comment
 from app.models.article import Article
@@ -12,22 +15,35 @@ router = APIRouter(prefix="/articles/{article_id}/comments", tags=["comments"])
 
 
 @router.get("", response_model=list[CommentOut])
-def list_comments(article_id: int, db: Session = Depends(get_db)):
-    exists = db.query(Article.id).filter(Article.id == article_id).first()
+async def list_comments(article_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    exists = await db.scalar(select(Article.id).where(Article.id == article_id))
     if not exists:
         raise HTTPException(status_code=404, detail="Article not found")
-    return db.query(Comment).filter(Comment.article_id == article_id).order_by(Comment.created_at.asc()).all()
+    rows = (
+        await db.execute(
+            select(Comment.id, Comment.article_id, Comment.user_id, Comment.body, Comment.created_at)
+            .where(Comment.article_id == article_id)
+            .order_by(Comment.created_at.asc())
+        )
+    ).all()
+    return FastJSONResponse(rows_to_dicts(rows))
 
 
 @router.post("", response_model=CommentOut)
-def add_comment(article_id: int, payload: CommentIn, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    exists = db.query(Article.id).filter(Article.id == article_id).first()
+async def add_comment(
+    article_id: int,
+    payload: CommentIn,
+    response: Response,
+    db: AsyncSession = Depends(get_async_write_db),
+    user=Depends(get_current_user),
+):
+    exists = await db.scalar(select(Article.id).where(Article.id == article_id))
     if not exists:
         raise HTTPException(status_code=404, detail="Article not found")
     c = Comment(article_id=article_id, user_id=user.id, body=payload.body.strip())
     db.add(c)
-    db.commit()
-    db.refresh(c)
+    await db.commit()
+    mark_recent_write(response)
     return c
 
 
@@ -0,0 +1,42 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+
+from app.core import metrics, pool_metrics
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.dependencies import bearer_scheme, get_current_user, require_admin
+
+
+def require_metrics_reader(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: Session = Depends(get_db),
+) -> None:
+    """The scrape token (metrics_scrape_token) or an admin's access token.
+
+    Neither needs the database once the auth caches are warm, so metrics still
+    answer while the pools are exhausted.
+    """
+    token = get_settings().metrics_scrape_token
+    if token and credentials is not None and hmac.compare_digest(credentials.credentials.encode(), token.encode()):
+        return
+    require_admin(get_current_user(credentials, db))
+
+
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_metrics_reader)])
+
+
+@router.get("")
+def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/db-pool")
+def db_pool():
+    """Per-engine pool gauges (size, in_use, idle, overflow) and checkout wait/timeout totals.
+
+    Reads only in-process counters, so it still answers while the pools are exhausted.
+    """
+    return pool_metrics.snapshot()
@@ -1,22 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db, get_write_db
 from app.dependencies import require_admin
 from app.models.source import Source
-from app.schemas.source import SourceIn, SourceOut
+from app.schemas.source import SourceIn, SourceOut, SourceUpdate
+from app.jobs.source_scores import refresh_avg_source_scores
 
 
 router = APIRouter(prefix="/admin/sources", tags=["sources"])
 
 
 @router.get("", response_model=list[SourceOut])
-def list_sources(db: Session = Depends(get_db)):
+def list_sources(db: Session = Depends(get_read_db)):
     return db.query(Source).order_by(Source.name.asc()).all()
 
 
 @router.post("", response_model=SourceOut)
-def create_source(payload: SourceIn, db: Session = Depends(get_db), _admin=Depends(require_admin)):
+def create_source(payload: SourceIn, db: Session = Depends(get_write_db), _admin=Depends(require_admin)):
     existing = db.query(Source).filter(Source.name == payload.name).first()
     if existing:
         raise HTTPException(status_code=400, detail="Source already exists")
@@ -25,6 +27,8 @@ def create_source(payload: SourceIn, db: Session = Depends(get_db), _admin=Depen
         rss_url=str(payload.rss_url) if payload.rss_url else None,
         base_url=str(payload.base_url) if payload.base_url else None,
         source_score=payload.source_score,
+        # An explicit score is the admin's call, not the learning job's
+        source_score_pinned="source_score" in payload.model_fields_set,
     )
     db.add(src)
     db.commit()
@@ -32,3 +36,37 @@ def create_source(payload: SourceIn, db: Session = Depends(get_db), _admin=Depen
     return src
 
 
+@router.patch("/{source_id}", response_model=SourceOut)
+def update_source(
+    source_id: int,
+    payload: SourceUpdate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_write_db),
+    _admin=Depends(require_admin),
+):
+    src = db.query(Source).filter(Source.id == source_id).first()
+    if not src:
+        raise HTTPException(status_code=404, detail="Source not found")
+    changes = payload.model_dump(exclude_unset=True)
+    for field in ("rss_url", "base_url"):
+        if changes.get(field) is not None:
+            changes[field] = str(changes[field])
+    if "source_score" in changes:
+        changes.setdefault("source_score_pinned", True)
+    score_changed = "source_score" in changes and changes["source_score"] != src.source_score
+    if "name" in changes and changes["name"] != src.name:
+        if db.query(Source.id).filter(Source.name == changes["name"]).first():
+            raise HTTPException(status_code=400, detail="Source already exists")
+    for field, value in changes.items():
+        setattr(src, field, value)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with another rename or create to the same name
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Source already exists")
+    db.refresh(src)
+    if score_changed:
+        # Fan the new score out to the denormalized Article.avg_source_score after responding
+        background_tasks.add_task(refresh_avg_source_scores, src.id)
+    return src
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.async_database import get_async_write_db
+from app.core.database import dialect_insert, mark_recent_write
 from app.core.credibility import compute_credibility
+from app.core.events import event_bus
+from app.core.vote_buffer import vote_buffer
+from app.core.vote_counters import apply_counter_delta
 from app.dependencies import get_current_user
-from app.models.article import Article, ArticleSource
-from app.models.source import Source
+from app.models.article import Article
 from app.models.vote import Vote
 from app.schemas.vote import VoteIn, VoteOut
 
@@ -13,62 +20,92 @@ from app.schemas.vote import VoteIn, VoteOut
 router = APIRouter(prefix="/vote", tags=["vote"])
 
 
-@router.post("", response_model=VoteOut)
-def cast_vote(payload: VoteIn, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    article = db.query(Article).filter(Article.id == payload.article_id).first()
-    if not article:
-        raise HTTPException(status_code=404, detail="Article not found")
+def _apply_vote(db: Session, article_id: int, user_id: int, direction: str) -> tuple[int, int]:
+    """Record the user's vote and return the (upvotes, downvotes) deltas it causes.
 
-    vote = db.query(Vote).filter(Vote.article_id == article.id, Vote.user_id == user.id).first()
+    Each statement is atomic on its own, so concurrent requests can never
+    double count: whichever statement actually changes the votes row is the
+    one that reports a delta.
+    """
+    if direction == "clear":
+        removed = db.execute(
+            delete(Vote)
+            .where(Vote.article_id == article_id, Vote.user_id == user_id)
+            .returning(Vote.is_upvote)
+        ).scalar_one_or_none()
+        if removed is None:
+            return 0, 0
+        return (-1, 0) if removed else (0, -1)
 
-    if payload.direction == "clear":
-        if vote:
-            db.delete(vote)
-            if vote.is_upvote:
-                article.upvotes -= 1
-            else:
-                article.downvotes -= 1
-    elif payload.direction in ("up", "down"):
-        is_up = payload.direction == "up"
-        if not vote:
-            vote = Vote(article_id=article.id, user_id=user.id, is_upvote=is_up)
-            db.add(vote)
-            if is_up:
-                article.upvotes += 1
-            else:
-                article.downvotes += 1
-        else:
-            if vote.is_upvote != is_up:
-                if is_up:
-                    article.upvotes += 1
-                    article.downvotes -= 1
-                else:
-                    article.downvotes += 1
-                    article.upvotes -= 1
-                vote.is_upvote = is_up
-            # else idempotent
-    else:
-        raise HTTPException(status_code=400, detail="Invalid direction")
+    is_up = direction == "up"
+    inserted = db.execute(
+        dialect_insert(db)(Vote)
+        .values(article_id=article_id, user_id=user_id, is_upvote=is_up, created_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=[Vote.user_id, Vote.article_id])
+        .returning(Vote.id)
+    ).scalar_one_or_none()
+    if inserted is not None:
+        return (1, 0) if is_up else (0, 1)
+    flipped = db.execute(
+        update(Vote)
+        .where(Vote.article_id == article_id, Vote.user_id == user_id, Vote.is_upvote != is_up)
+        .values(is_upvote=is_up)
+        .returning(Vote.id)
+    ).scalar_one_or_none()
+    if flipped is not None:
+        return (1, -1) if is_up else (-1, 1)
+    # Same direction again: idempotent
+    return 0, 0
 
-    # Recompute credibility based on average source score
-    src_ids = [r.source_id for r in db.query(ArticleSource).filter(ArticleSource.article_id == article.id).all()]
-    if src_ids:
-        sources = db.query(Source).filter(Source.id.in_(src_ids)).all()
-        avg_source_score = sum(s.source_score for s in sources) / len(sources)
-    else:
-        avg_source_score = 0.5
-    article.credibility_score, article.credibility_tag = compute_credibility(
-        article.upvotes, article.downvotes, avg_source_score
-    )
 
-    db.commit()
+@router.post("", response_model=VoteOut)
+async def cast_vote(
+    payload: VoteIn,
+    response: Response,
+    db: AsyncSession = Depends(get_async_write_db),
+    user=Depends(get_current_user),
+):
+    if payload.direction not in ("up", "down", "clear"):
+        raise HTTPException(status_code=400, detail="Invalid direction")
+    article = (
+        await db.execute(
+            select(Article.upvotes, Article.downvotes, Article.avg_source_score).where(
+                Article.id == payload.article_id
+            )
+        )
+    ).first()
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
 
-    return VoteOut(
-        article_id=article.id,
-        upvotes=article.upvotes,
-        downvotes=article.downvotes,
-        credibility_score=article.credibility_score,
-        credibility_tag=article.credibility_tag,
-    )
+    with vote_buffer.admit() as buffered:
+        d_up, d_down = await db.run_sync(_apply_vote, payload.article_id, user.id, payload.direction)
+        if buffered:
+            # The vote row is durable now; the counters follow on the next buffer flush
+            await db.commit()
+            mark_recent_write(response)
+            pending_up, pending_down = vote_buffer.add(payload.article_id, d_up, d_down)
+            upvotes, downvotes = article.upvotes + pending_up, article.downvotes + pending_down
+            score, tag = compute_credibility(upvotes, downvotes, article.avg_source_score)
+            return VoteOut(
+                article_id=payload.article_id,
+                upvotes=upvotes,
+                downvotes=downvotes,
+                credibility_score=score,
+                credibility_tag=tag,
+            )
 
+    # Unbuffered (buffer off, or write-through during reconciliation): counters move in SQL,
+    # so concurrent votes on a hot article never lose updates
+    counts = await db.run_sync(apply_counter_delta, payload.article_id, d_up, d_down)
+    result = VoteOut(
+        article_id=payload.article_id,
+        upvotes=counts.upvotes,
+        downvotes=counts.downvotes,
+        credibility_score=counts.credibility_score,
+        credibility_tag=counts.credibility_tag,
+    )
+    await db.commit()
+    mark_recent_write(response)
+    event_bus.publish("vote", {**result.model_dump(), "created_at": counts.created_at})
 
+    return result
@@ -0,0 +1,143 @@
+"""AsyncEngine/AsyncSession counterparts of app.core.database, for `async def` routes.
+
+The engines point at the same databases as their sync twins (aiosqlite for
+SQLite, asyncpg for PostgreSQL), so a route can move to async without its
+data moving. Sync helpers shared with the jobs (hydrate, front_page,
+apply_counter_delta, ...) are reused through `await db.run_sync(fn, ...)`.
+"""
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from sqlalchemy.util import await_only
+
+from . import pool_metrics
+from .config import get_settings
+from .database import (
+    PROGRESS_INTERVAL,
+    READ_PRIMARY_COOKIE,
+    _apply_sqlite_profile,
+    _begin_immediate,
+    _defer_begin_to_sqlalchemy,
+    listen_sqlite_statement_timeout,
+    pool_args,
+    shared_memory_url,
+    sqlite_statement_deadline_handler,
+)
+
+
+# libpq URL parameters asyncpg takes as another connect argument (asyncpg's `ssl` accepts
+# libpq's sslmode values), and the server settings libpq sets from the URL
+LIBPQ_RENAMED = {"sslmode": "ssl"}
+LIBPQ_SERVER_SETTINGS = ("application_name",)
+# asyncpg connect arguments that are strings, so they can stay in the URL
+ASYNCPG_URL_ARGS = ("ssl", "passfile", "service", "servicefile", "target_session_attrs", "krbsrvname", "gsslib")
+
+
+def async_url(database_url: str) -> str:
+    """Swap a sync driver for its asyncio equivalent.
+
+    asyncpg is handed every URL query parameter as a connect argument, so
+    libpq's are renamed (sslmode) or dropped; the ones that become connect
+    arguments of another type are in asyncpg_connect_args.
+    """
+    if database_url.startswith("sqlite"):
+        return "sqlite+aiosqlite:" + shared_memory_url(database_url).split(":", 1)[1]
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if database_url.startswith(prefix):
+            url = make_url("postgresql+asyncpg:" + database_url[len(prefix):])
+            query = {LIBPQ_RENAMED.get(key, key): value for key, value in url.query.items()}
+            dropped = sorted(set(query) - set(ASYNCPG_URL_ARGS) - {"connect_timeout", *LIBPQ_SERVER_SETTINGS})
+            if dropped:
+                # e.g. sslrootcert: asyncpg reads the PG* environment variables (PGSSLROOTCERT) instead
+                print(f"Ignoring database URL parameters asyncpg does not support: {', '.join(dropped)}")
+            query = {key: value for key, value in query.items() if key in ASYNCPG_URL_ARGS}
+            return url.set(query=query).render_as_string(hide_password=False)
+    return database_url
+
+
+def asyncpg_connect_args(database_url: str) -> dict:
+    """Connect arguments for asyncpg: the statement timeout, and libpq's connect_timeout and application_name."""
+    query = make_url(database_url).query
+    server_settings = {key: query[key] for key in LIBPQ_SERVER_SETTINGS if key in query}
+    ms = get_settings().db_statement_timeout_ms
+    if ms > 0:
+        server_settings["statement_timeout"] = str(int(ms))
+    connect_args = {"server_settings": server_settings} if server_settings else {}
+    if "connect_timeout" in query:
+        connect_args["timeout"] = float(query["connect_timeout"])
+    return connect_args
+
+
+def _install_aiosqlite_deadline(dbapi_connection, connection_record) -> None:
+    # The sqlite3 connection lives on aiosqlite's thread; its handler runs there too
+    handler = sqlite_statement_deadline_handler(connection_record)
+    await_only(dbapi_connection.driver_connection.set_progress_handler(handler, PROGRESS_INTERVAL))
+
+
+def _create_async_engine(database_url: str, name: str, writer: bool = False):
+    url = async_url(database_url)
+    if url.startswith("sqlite"):
+        if "mode=memory" in url:
+            sqlite_engine = create_async_engine(url, poolclass=StaticPool)
+        else:
+            # As in app.core.database: one writer connection, taking the write lock at BEGIN
+            sizing = {"pool_size": 1, "max_overflow": 0} if writer else {}
+            sqlite_engine = create_async_engine(url, **pool_args(name, AsyncAdaptedQueuePool, **sizing))
+            event.listen(sqlite_engine.sync_engine, "connect", _apply_sqlite_profile)
+            if writer:
+                event.listen(sqlite_engine.sync_engine, "connect", _defer_begin_to_sqlalchemy)
+                event.listen(sqlite_engine.sync_engine, "begin", _begin_immediate)
+        listen_sqlite_statement_timeout(sqlite_engine.sync_engine, install=_install_aiosqlite_deadline)
+        return sqlite_engine
+    return create_async_engine(
+        url,
+        pool_pre_ping=True,
+        connect_args=asyncpg_connect_args(database_url),
+        **pool_args(name, AsyncAdaptedQueuePool),
+    )
+
+
+def _create_async_writer_engine(default_engine):
+    database_url = get_settings().get_database_url()
+    if database_url.startswith("sqlite") and ":memory:" not in database_url:
+        return _create_async_engine(database_url, "async_writer", writer=True)
+    return default_engine
+
+
+def _create_async_read_engine(default_engine):
+    read_url = get_settings().read_database_url
+    if not read_url:
+        return default_engine
+    return _create_async_engine(read_url, "async_read")
+
+
+# expire_on_commit=False: attributes can't lazy-load outside run_sync, so keep them after commit
+async_engine = _create_async_engine(get_settings().get_database_url(), "async_primary")
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+async_read_engine = _create_async_read_engine(async_engine)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, expire_on_commit=False, autoflush=False)
+# Request writes (votes, comments, articles); on Postgres it is `async_engine`
+async_writer_engine = _create_async_writer_engine(async_engine)
+AsyncWriteSessionLocal = async_sessionmaker(async_writer_engine, expire_on_commit=False, autoflush=False)
+pool_metrics.register("async_primary", async_engine.sync_engine)
+pool_metrics.register("async_read", async_read_engine.sync_engine)
+pool_metrics.register("async_writer", async_writer_engine.sync_engine)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_write_db():
+    # Like get_write_db: the transaction holds SQLite's write lock from its first statement
+    async with AsyncWriteSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    factory = AsyncSessionLocal if request.cookies.get(READ_PRIMARY_COOKIE) else AsyncReadSessionLocal
+    async with factory() as db:
+        yield db
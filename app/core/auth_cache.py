@@ -0,0 +1,68 @@
+"""Caches that let get_current_user skip JWT verification and the users lookup.
+
+token_cache maps sha256(token) to its verified subject, for no longer than
+the token's own expiry. user_cache maps a user id to a UserSnapshot. Any
+flush that updates or deletes a User evicts that user, once at flush and
+again after commit so a request racing the commit cannot keep the old
+snapshot. Changes made by other processes (or raw SQL) are picked up when
+the entry's TTL runs out.
+"""
+import hashlib
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import metrics
+from .config import get_settings
+from .ttl_cache import TTLCache
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The parts of a User that request handlers read; safe to share across sessions."""
+
+    id: int
+    email: str
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(id=user.id, email=user.email, is_admin=bool(user.is_admin))
+
+
+def token_key(token: str) -> str:
+    # Keyed by hash so raw bearer tokens are not held in memory
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+_settings = get_settings()
+token_cache = TTLCache(_settings.auth_cache_max_entries, _settings.auth_cache_ttl_seconds)
+user_cache = TTLCache(_settings.auth_cache_max_entries, _settings.auth_cache_ttl_seconds)
+metrics.register_cache("auth_token", token_cache)
+metrics.register_cache("auth_user", user_cache)
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _evict_changed_users(session: Session, flush_context) -> None:
+    changed = {obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)}
+    if changed:
+        for user_id in changed:
+            invalidate_user(user_id)
+        session.info.setdefault("changed_user_ids", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session: Session) -> None:
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
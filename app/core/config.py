@@ -17,17 +17,108 @@ class Settings(BaseSettings):
             return os.getenv("DATABASE_URL", self.database_url)
         return self.database_url
 
+    # Optional read replica for read-only endpoints (unset: everything uses database_url),
+    # and how long a client reads from the primary after its own writes
+    read_database_url: str | None = None
+    read_your_writes_seconds: int = 5
+
+    # SQLite file databases: "tuned" applies WAL and the pragmas below on connect,
+    # "default" leaves SQLite's rollback journal (busy_timeout still applies)
+    sqlite_profile: str = "tuned"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kb: int = 64 * 1024
+
+    # Connection pools, per engine and process: connections kept, extra connections allowed
+    # under load, seconds before a connection is replaced (-1: never), seconds a checkout
+    # waits before failing; and the longest any one statement may run (0 disables; migrations
+    # and jobs are exempt)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle_seconds: int = 1800
+    db_pool_timeout_seconds: float = 30
+    db_statement_timeout_ms: int = 30000
+
+    # Schema migrations and source seeding: "background" runs them after startup (every
+    # route but /healthz is 503 until done), "blocking" before serving, "off" leaves them to
+    # `python -m app.jobs.bootstrap`, run once per deploy; and how many times a failed
+    # bootstrap is tried, with backoff, before the worker gives up and exits
+    startup_bootstrap: str = "background"
+    startup_bootstrap_attempts: int = 5
+
+    # Request, query, ingest, cache and pool metrics at GET /metrics (Prometheus text format),
+    # and the bearer token a scraper sends for them (unset: admins only, like /metrics/db-pool)
+    metrics_enabled: bool = True
+    metrics_scrape_token: str | None = None
+
+    # Sampling profiler (admin only): sample interval, the key that signs X-Profile headers
+    # (unset: header trigger off), how long a signed header stays valid, and the most
+    # requests one profile may cover
+    profile_sample_interval_ms: float = 5
+    profile_signing_key: str | None = None
+    profile_header_ttl_seconds: int = 300
+    profile_max_requests: int = 1000
+
+    # Per-request SQL budgets: requests over either limit are logged with the most repeated
+    # statement and where it was issued (0 disables a limit; routes listed in
+    # app.core.query_budget.ROUTE_BUDGETS use their own statement limit)
+    query_trace_enabled: bool = True
+    query_budget_statements: int = 25
+    query_budget_ms: float = 250
+
     # Security
     jwt_secret_key: str = "change-me"  # do not use in prod
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24
+    # bcrypt cost (existing hashes are upgraded on login), and the dedicated hashing pool:
+    # worker threads, and how many hashes may be running or queued before returning 429
+    password_bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 16
+
+    # Verified-token and user-snapshot caches in get_current_user (0 TTL disables them)
+    auth_cache_ttl_seconds: int = 60
+    auth_cache_max_entries: int = 10000
 
     # Credibility thresholds
     credibility_confirmed_threshold: float = 0.7
     credibility_rumor_threshold: float = 0.3
     credibility_wilson_weight: float = 0.7
+    # Wilson interval z, and the (up, down) range served from a precomputed table (0 disables it)
+    credibility_wilson_z: float = 1.96
+    credibility_wilson_table_size: int = 256
     credibility_source_weight: float = 0.3
 
+    # HTTP caching: seconds shared caches (CDN) may serve anonymous feed responses
+    http_cache_max_age: int = 15
+
+    # Live stream (SSE): events kept for Last-Event-ID resume, and idle keepalive interval
+    stream_replay_buffer: int = 500
+    stream_keepalive_seconds: int = 15
+
+    # Front-page snapshots: max age before a view is rebuilt from the database
+    front_page_snapshot_ttl_seconds: int = 60
+
+    # Vote buffer: coalesce counter updates per article instead of one row write per vote
+    vote_buffer_enabled: bool = False
+    vote_buffer_flush_ms: int = 250
+    vote_buffer_max_votes: int = 1000
+
+    # Vote counter reconciliation: articles per chunk and pause between chunks
+    reconcile_chunk_size: int = 1000
+    reconcile_pause_ms: int = 50
+
+    # Hot ranking: seconds per 10x decay, and how much credibility lifts an article
+    hot_decay_seconds: int = 45000
+    hot_credibility_weight: float = 1.0
+
+    # Source score learning: Beta prior (mean, pseudo-votes), smallest change worth
+    # propagating to articles, and how far behind "now" a run stops to let writes land
+    source_score_prior_mean: float = 0.5
+    source_score_prior_weight: float = 20.0
+    source_score_min_change: float = 0.01
+    source_score_lag_seconds: int = 5
+
     # Elasticsearch (optional initially)
     elastic_cloud_id: str | None = None
     elastic_api_key: str | None = None
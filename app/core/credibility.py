@@ -1,9 +1,20 @@
-from math import sqrt
+from __future__ import annotations
+
+from datetime import datetime
+from functools import lru_cache
+from math import log10, sqrt
+from typing import TYPE_CHECKING
 
 from .config import get_settings
 
+if TYPE_CHECKING:
+    import numpy as np
+
+# numpy is imported inside the vectorized helpers: it costs worker boot time, and only
+# the table build and the rescore job need it
+
 
-def wilson_lower_bound(upvotes: int, downvotes: int, z: float = 1.96) -> float:
+def _wilson_formula(upvotes: int, downvotes: int, z: float) -> float:
     n = upvotes + downvotes
     if n == 0:
         return 0.0
@@ -15,6 +26,61 @@ def wilson_lower_bound(upvotes: int, downvotes: int, z: float = 1.96) -> float:
     return max(0.0, min(1.0, lower_bound))
 
 
+def wilson_lower_bound_array(upvotes: np.ndarray, downvotes: np.ndarray, z: float) -> np.ndarray:
+    """Vectorized _wilson_formula."""
+    import numpy as np
+
+    n = (upvotes + downvotes).astype(np.float64)
+    safe_n = np.where(n == 0, 1.0, n)
+    p_hat = upvotes / safe_n
+    denominator = 1 + z**2 / safe_n
+    centre_adj = p_hat + z**2 / (2 * safe_n)
+    adjusted_std = z * np.sqrt((p_hat * (1 - p_hat) + z**2 / (4 * safe_n)) / safe_n)
+    lower_bound = (centre_adj - adjusted_std) / denominator
+    return np.where(n == 0, 0.0, np.clip(lower_bound, 0.0, 1.0))
+
+
+# Keyed on (z, size), so changing either builds a fresh table on next use
+@lru_cache(maxsize=4)
+def wilson_table(z: float, size: int) -> np.ndarray:
+    """Lower bounds for every (up, down) with both below size, indexed [up, down]."""
+    import numpy as np
+
+    up, down = np.indices((size, size))
+    table = wilson_lower_bound_array(up, down, z)
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=4)
+def _wilson_rows(z: float, size: int) -> list[list[float]]:
+    # Nested lists index faster than an ndarray for one value at a time
+    return wilson_table(z, size).tolist()
+
+
+def wilson_lower_bound(upvotes: int, downvotes: int, z: float | None = None) -> float:
+    settings = get_settings()
+    if z is None:
+        z = settings.credibility_wilson_z
+    size = settings.credibility_wilson_table_size
+    if 0 <= upvotes < size and 0 <= downvotes < size:
+        return _wilson_rows(z, size)[upvotes][downvotes]
+    return _wilson_formula(upvotes, downvotes, z)
+
+
+def wilson_lower_bound_lookup(upvotes: np.ndarray, downvotes: np.ndarray) -> np.ndarray:
+    """Vectorized wilson_lower_bound: table lookups where possible, the formula elsewhere."""
+    settings = get_settings()
+    z, size = settings.credibility_wilson_z, settings.credibility_wilson_table_size
+    small = (upvotes >= 0) & (upvotes < size) & (downvotes >= 0) & (downvotes < size)
+    if small.all():
+        return wilson_table(z, size)[upvotes, downvotes]
+    result = wilson_lower_bound_array(upvotes, downvotes, z)
+    if small.any():
+        result[small] = wilson_table(z, size)[upvotes[small], downvotes[small]]
+    return result
+
+
 def compute_credibility(upvotes: int, downvotes: int, source_score: float) -> tuple[float, str]:
     settings = get_settings()
     wilson = wilson_lower_bound(upvotes, downvotes)
@@ -30,3 +96,21 @@ def compute_credibility(upvotes: int, downvotes: int, source_score: float) -> tu
     return score, tag
 
 
+# Reference point for the hot score's time term; only differences between articles matter
+HOT_EPOCH = datetime(2005, 12, 8, 7, 46, 43)
+
+
+def hot_score(upvotes: int, downvotes: int, credibility_score: float, created_at: datetime) -> float:
+    """Reddit-style hot rank: log-scaled net votes plus credibility plus a creation-time term.
+
+    Newer articles get a permanently larger time term, which is equivalent
+    to decaying older scores by 10x every hot_decay_seconds. The stored
+    value therefore only changes when votes or credibility do; it never
+    needs a periodic rewrite.
+    """
+    settings = get_settings()
+    net = upvotes - downvotes
+    order = log10(max(abs(net), 1))
+    sign = 1 if net > 0 else -1 if net < 0 else 0
+    age = (created_at - HOT_EPOCH).total_seconds()
+    return sign * order + settings.hot_credibility_weight * credibility_score + age / settings.hot_decay_seconds
@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
+import time
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 
+from . import pool_metrics
 from .config import get_settings
 
 
@@ -9,23 +14,199 @@ class Base(DeclarativeBase):
     pass
 
 
+def _apply_sqlite_profile(dbapi_connection, _connection_record) -> None:
+    settings = get_settings()
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(settings.sqlite_busy_timeout_ms)}")
+    if settings.sqlite_profile == "tuned":
+        # Readers no longer block on (or block) the writer; NORMAL is durable enough under WAL
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size = {-int(settings.sqlite_cache_size_kb)}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.close()
+
+
+def pool_args(name: str, poolclass: type = QueuePool, **overrides) -> dict:
+    """create_engine pool arguments from Settings, with a pool that reports to pool_metrics."""
+    settings = get_settings()
+    args = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        **overrides,
+    }
+    return {"poolclass": pool_metrics.timed_pool_class(poolclass, pool_metrics.PoolMetrics(name)), **args}
+
+
+def postgres_statement_timeout_args() -> dict:
+    # Server-side, so a runaway query is cancelled even if the worker is stuck
+    ms = get_settings().db_statement_timeout_ms
+    return {"options": f"-c statement_timeout={int(ms)}"} if ms > 0 else {}
+
+
+# Execution option that lifts db_statement_timeout_ms, for migrations and jobs whose
+# statements (backfills, whole-table recounts) are expected to run long
+UNBOUNDED = {"statement_timeout": False}
+
+
+def _unbounded(conn) -> bool:
+    return conn.get_execution_options().get("statement_timeout", True) is False
+
+
+def _lift_postgres_statement_timeout(conn) -> None:
+    # SET LOCAL ends with the transaction, so the pooled connection keeps its timeout
+    if _unbounded(conn):
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute("SET LOCAL statement_timeout = 0")
+        finally:
+            cursor.close()
+
+
+STATEMENT_DEADLINE = "statement_deadline"
+# SQLite VM instructions between deadline checks
+PROGRESS_INTERVAL = 1000
+
+
+def sqlite_statement_deadline_handler(connection_record):
+    """Progress handler that interrupts the running statement once its deadline passes."""
+    info = connection_record.info
+
+    def _past_deadline() -> bool:
+        deadline = info.get(STATEMENT_DEADLINE)
+        return deadline is not None and time.monotonic() > deadline
+
+    return _past_deadline
+
+
+def _install_sqlite_deadline(dbapi_connection, connection_record) -> None:
+    dbapi_connection.set_progress_handler(sqlite_statement_deadline_handler(connection_record), PROGRESS_INTERVAL)
+
+
+def _start_statement_deadline(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _unbounded(conn):
+        return
+    conn.info[STATEMENT_DEADLINE] = time.monotonic() + get_settings().db_statement_timeout_ms / 1000
+
+
+def _clear_statement_deadline(conn, *args) -> None:
+    conn.info.pop(STATEMENT_DEADLINE, None)
+
+
+def _clear_failed_statement_deadline(context) -> None:
+    if context.connection is not None:
+        context.connection.info.pop(STATEMENT_DEADLINE, None)
+
+
+def listen_sqlite_statement_timeout(sync_engine, install=_install_sqlite_deadline) -> None:
+    """SQLite has no statement_timeout; interrupt from a progress handler instead."""
+    if get_settings().db_statement_timeout_ms <= 0:
+        return
+    event.listen(sync_engine, "connect", install)
+    event.listen(sync_engine, "before_cursor_execute", _start_statement_deadline)
+    event.listen(sync_engine, "after_cursor_execute", _clear_statement_deadline)
+    event.listen(sync_engine, "handle_error", _clear_failed_statement_deadline)
+
+
+def _defer_begin_to_sqlalchemy(dbapi_connection, _connection_record) -> None:
+    # Stop pysqlite issuing its own BEGIN so _begin_immediate controls the transaction
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(conn) -> None:
+    # Take the write lock up front: a deferred transaction that read first can fail
+    # with SQLITE_BUSY on upgrade, which busy_timeout does not retry. Issued on a raw
+    # cursor, like the BEGIN SQLAlchemy leaves to other drivers, so statement tracing
+    # and budgets don't count it
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+    finally:
+        cursor.close()
+
+
+# Named shared-cache in-memory database, so the async engine sees the same tables as `engine`
+SHARED_MEMORY_URL = "sqlite:///file:app_memdb?mode=memory&cache=shared&uri=true"
+
+
+def shared_memory_url(database_url: str) -> str:
+    return SHARED_MEMORY_URL if ":memory:" in database_url else database_url
+
+
+def _sqlite_engine(database_url: str, name: str, writer: bool = False):
+    if ":memory:" in database_url:
+        # One shared connection; the writer is the same engine
+        memory_engine = create_engine(
+            shared_memory_url(database_url), connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        listen_sqlite_statement_timeout(memory_engine)
+        return memory_engine
+    # The writer is a single connection, so in-process writers queue in the pool
+    # instead of contending for SQLite's lock
+    sizing = {"pool_size": 1, "max_overflow": 0} if writer else {}
+    sqlite_engine = create_engine(
+        database_url, connect_args={"check_same_thread": False}, **pool_args(name, **sizing)
+    )
+    event.listen(sqlite_engine, "connect", _apply_sqlite_profile)
+    listen_sqlite_statement_timeout(sqlite_engine)
+    if writer:
+        event.listen(sqlite_engine, "connect", _defer_begin_to_sqlalchemy)
+        event.listen(sqlite_engine, "begin", _begin_immediate)
+    return sqlite_engine
+
+
+def _postgres_engine(database_url: str, name: str):
+    postgres_engine = create_engine(
+        database_url, pool_pre_ping=True, connect_args=postgres_statement_timeout_args(), **pool_args(name)
+    )
+    event.listen(postgres_engine, "begin", _lift_postgres_statement_timeout)
+    return postgres_engine
+
+
 def _create_engine_from_settings():
     settings = get_settings()
     database_url = settings.get_database_url()
     
     if database_url.startswith("sqlite"):
         # SQLite for dev/test
-        return create_engine(
-            database_url,
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool if ":memory:" in database_url else None,
-        )
+        return _sqlite_engine(database_url, "primary")
     # PostgreSQL for production
-    return create_engine(database_url, pool_pre_ping=True)
+    return _postgres_engine(database_url, "primary")
+
+
+def _create_writer_engine(default_engine):
+    database_url = get_settings().get_database_url()
+    if database_url.startswith("sqlite") and ":memory:" not in database_url:
+        return _sqlite_engine(database_url, "writer", writer=True)
+    return default_engine
+
+
+def _create_read_engine(default_engine):
+    read_url = get_settings().read_database_url
+    if not read_url:
+        return default_engine
+    if read_url.startswith("sqlite"):
+        return _sqlite_engine(read_url, "read")
+    return _postgres_engine(read_url, "read")
 
 
 engine = _create_engine_from_settings()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Read-only endpoints; the replica when read_database_url is set, otherwise `engine`
+read_engine = _create_read_engine(engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+# Writers (request writes, ingest poller, vote buffer) use this; on Postgres it is `engine`
+writer_engine = _create_writer_engine(engine)
+WriteSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=writer_engine)
+# Jobs (reconcile, rescore, score learning, seeding): the writer without the statement timeout
+job_engine = writer_engine.execution_options(**UNBOUNDED)
+JobSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=job_engine)
+pool_metrics.register("primary", engine)
+pool_metrics.register("read", read_engine)
+pool_metrics.register("writer", writer_engine)
 
 
 def get_db():
@@ -36,3 +217,44 @@ def get_db():
         db.close()
 
 
+def get_write_db():
+    """Session on the writer engine for request writes (BEGIN IMMEDIATE on SQLite files).
+
+    Take it only for the writes: on SQLite its transaction holds the database's write lock
+    from its first statement, reads included, until commit. Attributes stay loaded after
+    commit, so building the response doesn't start another transaction.
+    """
+    db = WriteSessionLocal(expire_on_commit=False)
+    try:
+        yield db
+    finally:
+        db.close()
+
+READ_PRIMARY_COOKIE = "read_primary"
+
+
+def mark_recent_write(response: Response) -> None:
+    """Send this client's reads to the primary for a while, so it sees its own write."""
+    seconds = get_settings().read_your_writes_seconds
+    if read_engine is not engine and seconds > 0:
+        response.set_cookie(READ_PRIMARY_COOKIE, "1", max_age=seconds, httponly=True, samesite="lax")
+
+
+def get_read_db(request: Request):
+    # The cookie only moves load back to the primary, so it needs no signature
+    factory = SessionLocal if request.cookies.get(READ_PRIMARY_COOKIE) else ReadSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def dialect_insert(db):
+    """insert() for the session's dialect, with on_conflict_do_nothing/do_update support."""
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert
+    if name == "sqlite":
+        return sqlite.insert
+    return insert
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+from fastapi import Request
+
+from .config import get_settings
+from .serialization import dumps
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: dict
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {dumps(self.data).decode('utf-8')}\n\n"
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: asyncio.Queue[Event | None] = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event: Event) -> None:
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop the backlog and hang up. The client
+            # reconnects with Last-Event-ID and resumes from the replay buffer.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventBus:
+    """In-process pub/sub with a bounded replay buffer.
+
+    Publishers are sync code (request threads, the ingest poller) and call
+    publish() after their transaction commits; subscribers are SSE streams
+    running on the event loop. Listeners are plain callables run inline in
+    the publishing thread, for in-process caches that must see every event.
+    Event ids are per-process and restart at 1.
+    """
+
+    def __init__(self, replay_size: int = 500, subscriber_queue_size: int = 100):
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._buffer: deque[Event] = deque(maxlen=replay_size)
+        self._subscribers: set[_Subscriber] = set()
+        self._listeners: list[Callable[[Event], None]] = []
+        self._subscriber_queue_size = subscriber_queue_size
+
+    def publish(self, event_type: str, data: dict) -> Event:
+        with self._lock:
+            event = Event(self._next_id, event_type, data)
+            self._next_id += 1
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"Event listener failed for {event.type}: {e}")
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, event)
+            except RuntimeError:
+                # Loop already closed
+                self.unsubscribe(sub)
+        return event
+
+    def add_listener(self, listener: Callable[[Event], None]) -> None:
+        self._listeners.append(listener)
+
+    def subscribe(self) -> _Subscriber:
+        sub = _Subscriber(asyncio.get_running_loop(), self._subscriber_queue_size)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def replay_since(self, last_event_id: int) -> tuple[list[Event], bool]:
+        """Return buffered events after last_event_id, and whether that is a complete resume."""
+        with self._lock:
+            events = [e for e in self._buffer if e.id > last_event_id]
+            oldest = self._buffer[0].id if self._buffer else self._next_id
+            complete = oldest <= last_event_id + 1 and last_event_id < self._next_id
+        return events, complete
+
+
+def _parse_event_id(value: str | None) -> int | None:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+async def sse_stream(bus: EventBus, request: Request, last_event_id: str | None) -> AsyncIterator[str]:
+    settings = get_settings()
+    sub = bus.subscribe()
+    try:
+        last_sent = 0
+        resume_from = _parse_event_id(last_event_id)
+        if resume_from is not None:
+            events, complete = bus.replay_since(resume_from)
+            if not complete:
+                # Gap we cannot fill (buffer overflowed or server restarted): tell the client to refetch
+                yield "event: reset\ndata: {}\n\n"
+            for event in events:
+                yield event.encode()
+                last_sent = event.id
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=settings.stream_keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                break
+            if event.id <= last_sent:
+                # Already sent during replay
+                continue
+            yield event.encode()
+            last_sent = event.id
+    finally:
+        bus.unsubscribe(sub)
+
+
+event_bus = EventBus(replay_size=get_settings().stream_replay_buffer)
@@ -0,0 +1,213 @@
+"""Materialized front-page views.
+
+For every (credibility tag, sort) combination the store keeps the ids of
+the top articles in memory, ordered the way list_articles would order
+them. Ingest and vote events from the event bus update the views
+incrementally. A view goes back to the database only when it can no
+longer answer on its own: it was never built, it is older than the
+snapshot TTL, removals left it shorter than the requested page, or the
+caller's feed version (the articles table's fingerprint, which list_articles
+also puts in its ETag) differs from the one it was built at, because
+another worker or a job wrote since. A page is then never older than the
+ETag it is served under.
+"""
+import threading
+import time
+from bisect import insort
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from . import metrics
+from .config import get_settings
+from .events import Event, event_bus
+from app.models.article import Article, ArticleSource
+from app.models.source import Source
+
+
+CREDIBILITY_TAGS = ("Confirmed", "Pending", "Rumor")
+SORTS = ("latest", "top_week", "top_all")
+# Entries kept per view; twice the largest page so a few removals don't force a rebuild
+CAPACITY = 200
+PAGE_MAX = 100
+
+
+def _week_ago() -> datetime:
+    return datetime.utcnow() - timedelta(days=7)
+
+
+def _sort_key(sort: str, article_id: int, created_at: datetime, upvotes: int, downvotes: int) -> tuple:
+    # Ascending order of the key is the order served
+    if sort == "latest":
+        return (-created_at.timestamp(), -article_id)
+    return (-(upvotes - downvotes), -created_at.timestamp(), -article_id)
+
+
+class _View:
+    def __init__(self, tag: str | None, sort: str):
+        self.tag = tag
+        self.sort = sort
+        self.entries: list[tuple[tuple, int, datetime]] = []
+        self.keys: dict[int, tuple] = {}
+        # True when the entries hold every matching article, not just the top CAPACITY
+        self.complete = False
+        self.built_at: float | None = None
+        self.version: str | None = None
+        self.short = False
+        # Events seen while a rebuild's query is in flight, replayed onto its result
+        self.loading = 0
+        self.pending: list[tuple] = []
+
+    def matches(self, tag: str, created_at: datetime) -> bool:
+        if self.tag is not None and tag != self.tag:
+            return False
+        if self.sort == "top_week" and created_at < _week_ago():
+            return False
+        return True
+
+    def remove(self, article_id: int) -> None:
+        key = self.keys.pop(article_id, None)
+        if key is None:
+            return
+        self.entries = [e for e in self.entries if e[1] != article_id]
+        if not self.complete and len(self.entries) < PAGE_MAX:
+            self.short = True
+
+    def upsert(self, article_id: int, tag: str, created_at: datetime, upvotes: int, downvotes: int) -> None:
+        self.remove(article_id)
+        if not self.matches(tag, created_at):
+            return
+        key = _sort_key(self.sort, article_id, created_at, upvotes, downvotes)
+        if not self.complete and (not self.entries or key > self.entries[-1][0]):
+            # Past the last known entry: unseen rows may rank ahead of it, so leave it to a rebuild
+            self.short = self.short or len(self.entries) < PAGE_MAX
+            return
+        insort(self.entries, (key, article_id, created_at))
+        self.keys[article_id] = key
+        if len(self.entries) > CAPACITY:
+            _, dropped, _ = self.entries.pop()
+            del self.keys[dropped]
+            self.complete = False
+
+    def load(self, db: Session) -> list:
+        """Query the rows for a rebuild. Runs without the store lock held."""
+        query_ = db.query(Article.id, Article.created_at, Article.upvotes, Article.downvotes)
+        if self.tag is not None:
+            query_ = query_.filter(Article.credibility_tag == self.tag)
+        net = Article.upvotes - Article.downvotes
+        if self.sort == "top_week":
+            query_ = query_.filter(Article.created_at >= _week_ago())
+            query_ = query_.order_by(net.desc(), Article.created_at.desc(), Article.id.desc())
+        elif self.sort == "top_all":
+            query_ = query_.order_by(net.desc(), Article.created_at.desc(), Article.id.desc())
+        else:
+            query_ = query_.order_by(Article.created_at.desc(), Article.id.desc())
+        return query_.limit(CAPACITY).all()
+
+    def install(self, rows: list, version: str | None) -> None:
+        self.entries = [(_sort_key(self.sort, *row), row.id, row.created_at) for row in rows]
+        self.keys = {article_id: key for key, article_id, _ in self.entries}
+        self.complete = len(rows) < CAPACITY
+        self.built_at = time.monotonic()
+        self.version = version
+        self.short = False
+        for event in self.pending:
+            self.upsert(*event)
+        if not self.loading:
+            self.pending = []
+
+    def page(self, limit: int) -> list[int] | None:
+        """Ids for one page, or None if the view cannot answer without a rebuild."""
+        entries = self.entries
+        if self.sort == "top_week":
+            cutoff = _week_ago()
+            entries = [e for e in entries if e[2] >= cutoff]
+        if len(entries) < limit and not self.complete:
+            return None
+        return [article_id for _, article_id, _ in entries[:limit]]
+
+
+class FrontPageStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {(tag, sort): _View(tag, sort) for tag in (None, *CREDIBILITY_TAGS) for sort in SORTS}
+        # Pages served from a snapshot vs. ones that needed a rebuild
+        self.hits = 0
+        self.misses = 0
+
+    def ids(self, db: Session, tag: str | None, sort: str, limit: int, version: str | None = None) -> list[int]:
+        """Ids for one page; with version (read from db), rebuilt if the table has changed since."""
+        view = self._views[(tag, sort)]
+        ttl = get_settings().front_page_snapshot_ttl_seconds
+        with self._lock:
+            stale = (
+                view.built_at is None
+                or view.short
+                or time.monotonic() - view.built_at > ttl
+                or (version is not None and version != view.version)
+            )
+            ids = None if stale else view.page(limit)
+            if ids is not None:
+                self.hits += 1
+                return ids
+            self.misses += 1
+            view.loading += 1
+        # The query runs unlocked: under AsyncSession.run_sync it yields to the event loop,
+        # and another request on the same thread must not then block on the lock
+        try:
+            rows = view.load(db)
+        except BaseException:
+            with self._lock:
+                view.loading -= 1
+                if not view.loading:
+                    view.pending = []
+            raise
+        with self._lock:
+            view.loading -= 1
+            view.install(rows, version)
+            return view.page(limit) or []
+
+    def apply(self, article_id: int, tag: str, created_at: datetime, upvotes: int, downvotes: int) -> None:
+        with self._lock:
+            for view in self._views.values():
+                if view.loading:
+                    view.pending.append((article_id, tag, created_at, upvotes, downvotes))
+                if view.built_at is not None:
+                    view.upsert(article_id, tag, created_at, upvotes, downvotes)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            for view in self._views.values():
+                view.built_at = None
+
+    def on_event(self, event: Event) -> None:
+        data = event.data
+        if event.type == "article":
+            self.apply(data["id"], data["credibility_tag"], data["created_at"], data["upvotes"], data["downvotes"])
+        elif event.type == "vote":
+            self.apply(
+                data["article_id"], data["credibility_tag"], data["created_at"], data["upvotes"], data["downvotes"]
+            )
+
+
+def hydrate(db: Session, ids: list[int]) -> list[tuple[Article, Source | None]]:
+    """Load the articles for ids, with their first source, in one query and in ids order."""
+    if not ids:
+        return []
+    rows = (
+        db.query(Article, Source)
+        .outerjoin(ArticleSource, ArticleSource.article_id == Article.id)
+        .outerjoin(Source, Source.id == ArticleSource.source_id)
+        .filter(Article.id.in_(ids))
+        .order_by(ArticleSource.id.asc())
+        .all()
+    )
+    by_id: dict[int, tuple[Article, Source | None]] = {}
+    for article, source in rows:
+        by_id.setdefault(article.id, (article, source))
+    return [by_id[i] for i in ids if i in by_id]
+
+
+front_page = FrontPageStore()
+event_bus.add_listener(front_page.on_event)
+metrics.register_cache("front_page", front_page)
@@ -0,0 +1,39 @@
+import hashlib
+
+from fastapi import Request, Response
+
+from .config import get_settings
+from .database import READ_PRIMARY_COOKIE
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the values that determine a response body."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def cache_headers(request: Request, etag: str) -> dict[str, str]:
+    settings = get_settings()
+    if "authorization" in request.headers or request.cookies.get(READ_PRIMARY_COOKIE):
+        # A client that just wrote reads the primary; no cache may answer for it meanwhile
+        cache_control = "private, no-cache"
+    else:
+        # Anonymous responses are identical for everyone; let a CDN keep them briefly
+        cache_control = f"public, max-age={settings.http_cache_max_age}, must-revalidate"
+    # Cookie: once mark_recent_write sets read_primary, cached feed copies stop matching
+    return {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization, Cookie"}
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
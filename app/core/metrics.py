@@ -0,0 +1,294 @@
+"""In-process metrics, rendered in the Prometheus text format at GET /metrics.
+
+Recording is lock-free: every thread writes to its own shard (a list of
+floats), so concurrent requests never contend or lose updates, and a
+scrape sums the shards. `metric.labels(...)` returns a child that is
+created once per label set and then reused, so the per-request cost is a
+dict lookup and a couple of list writes. Values that already live
+elsewhere (cache hit counts, pool gauges) are read by callbacks at scrape
+time instead of being mirrored on the hot path.
+
+instrument_app() adds the request middleware and hooks into the SQL
+tracer in app.core.query_budget, whose engine-wide listeners time each
+statement once for both metrics and query budgets; both apps call it.
+"""
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Iterable
+
+from . import pool_metrics, query_budget
+from .config import get_settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+INGEST_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600)
+
+
+class _Shards:
+    """Per-thread float vectors of a fixed size; only the owning thread writes to one."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._all: list[list[float]] = []
+
+    def mine(self) -> list[float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = [0.0] * self._size
+            self._all.append(values)
+            return values
+
+    def totals(self) -> list[float]:
+        totals = [0.0] * self._size
+        for values in list(self._all):
+            for i, v in enumerate(values):
+                totals[i] += v
+        return totals
+
+
+class _CounterChild:
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._shards.mine()[0] += amount
+
+    def samples(self, name: str, labels: str) -> Iterable[str]:
+        yield f"{name}{labels} {_fmt(self._shards.totals()[0])}"
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple):
+        self._buckets = buckets
+        # One slot per bucket, one for +Inf, then the sum
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.mine()
+        values[bisect_left(self._buckets, value)] += 1
+        values[-1] += value
+
+    def samples(self, name: str, labels: str) -> Iterable[str]:
+        totals = self._shards.totals()
+        inner = labels[1:-1]
+        sep = "," if inner else ""
+        cumulative = 0.0
+        for bound, count in zip((*self._buckets, "+Inf"), totals[:-1]):
+            cumulative += count
+            yield f'{name}_bucket{{{inner}{sep}le="{bound}"}} {_fmt(cumulative)}'
+        yield f"{name}_sum{labels} {_fmt(totals[-1])}"
+        yield f"{name}_count{labels} {_fmt(cumulative)}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        _registry.append(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            # setdefault is atomic, so racing threads end up sharing one child
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        for values, child in list(self._children.items()):
+            yield from child.samples(self.name, _labels(self.labelnames, values))
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+
+class Callback(_Metric):
+    """Samples produced at scrape time by fn, as (label values, value) pairs."""
+
+    def __init__(self, name: str, documentation: str, type_: str, labelnames: tuple[str, ...], fn: Callable):
+        self.type = type_
+        self._fn = fn
+        super().__init__(name, documentation, labelnames)
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        for values, value in self._fn():
+            yield f"{self.name}{_labels(self.labelnames, values)} {_fmt(value)}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_registry: list[_Metric] = []
+
+
+def render() -> str:
+    return "\n".join(line for metric in _registry for line in metric.collect()) + "\n"
+
+
+# --- HTTP -------------------------------------------------------------------------
+
+http_requests = Counter("http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+
+# --- Database ---------------------------------------------------------------------
+
+db_queries = Counter("db_queries_total", "SQL statements executed")
+db_query_duration = Histogram("db_query_duration_seconds", "SQL statement latency")
+db_request_queries = Histogram(
+    "db_request_queries", "SQL statements per HTTP request", ("route",), buckets=QUERY_COUNT_BUCKETS
+)
+db_request_query_duration = Histogram(
+    "db_request_query_seconds", "Time spent in SQL per HTTP request", ("route",)
+)
+
+
+def _pool_samples(key: str) -> Callable:
+    return lambda: (((name,), stats[key]) for name, stats in pool_metrics.snapshot().items() if key in stats)
+
+
+for _name, _key, _type, _doc in (
+    ("db_pool_in_use", "in_use", "gauge", "Connections checked out"),
+    ("db_pool_size", "size", "gauge", "Configured pool size"),
+    ("db_pool_overflow", "overflow", "gauge", "Connections beyond pool size"),
+    ("db_pool_checkouts_total", "checkouts", "counter", "Successful pool checkouts"),
+    ("db_pool_timeouts_total", "timeouts", "counter", "Checkouts that timed out waiting for a connection"),
+    ("db_pool_wait_seconds_total", "wait_seconds_total", "counter", "Total time checkouts spent waiting"),
+):
+    Callback(_name, _doc, _type, ("engine",), _pool_samples(_key))
+
+# --- Ingest -----------------------------------------------------------------------
+
+ingest_cycle_duration = Histogram(
+    "ingest_cycle_duration_seconds", "Duration of one ingest_once cycle", buckets=INGEST_BUCKETS
+)
+ingest_items_inserted = Counter("ingest_items_inserted_total", "Articles inserted by ingest", ("source",))
+ingest_source_failures = Counter("ingest_source_failures_total", "Ingest commits that failed", ("source",))
+
+# --- Caches -----------------------------------------------------------------------
+
+_caches: dict[str, object] = {}
+
+
+def register_cache(name: str, cache) -> None:
+    """Report cache's `hits` and `misses` attributes under name."""
+    _caches[name] = cache
+
+
+def _cache_samples():
+    for name, cache in list(_caches.items()):
+        yield (name, "hit"), cache.hits
+        yield (name, "miss"), cache.misses
+
+
+def _cache_ratios():
+    for name, cache in list(_caches.items()):
+        total = cache.hits + cache.misses
+        yield (name,), cache.hits / total if total else 0.0
+
+
+Callback("cache_requests_total", "Cache lookups by result", "counter", ("cache", "result"), _cache_samples)
+Callback("cache_hit_ratio", "Cache hits over lookups since start", "gauge", ("cache",), _cache_ratios)
+
+
+# --- Wiring -----------------------------------------------------------------------
+
+
+def _observe_statement(elapsed: float) -> None:
+    db_queries.inc()
+    db_query_duration.observe(elapsed)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware buffering), so streams pass straight through."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with query_budget.request_trace(scope) as queries:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                # Templates, not raw paths, keep label cardinality bounded
+                template = getattr(route, "path_format", None) or "unmatched"
+                method = scope["method"]
+                http_requests.labels(method, template, str(status)).inc()
+                http_request_duration.labels(method, template).observe(perf_counter() - started)
+                db_request_queries.labels(template).observe(queries.count)
+                db_request_query_duration.labels(template).observe(queries.seconds)
+
+
+_observing = False
+
+
+def instrument_app(app) -> None:
+    """Record request and query metrics for app (no-op when metrics_enabled is off)."""
+    global _observing
+    if not get_settings().metrics_enabled:
+        return
+    app.add_middleware(MetricsMiddleware)
+    # Statements are timed by the shared tracer's engine-wide listeners (app.core.query_budget)
+    query_budget.listen()
+    if not _observing:
+        query_budget.statement_observers.append(_observe_statement)
+        _observing = True
@@ -0,0 +1,206 @@
+"""Versioned schema migrations for SQLite and PostgreSQL.
+
+Applied versions are recorded in `schema_migrations`. On boot,
+run_migrations() only reads the version table once the database is current.
+A fresh database gets the full schema from the models via create_all and
+is stamped at the latest version. An existing database gets every pending
+migration applied in order, inside a single transaction.
+
+Migrations must be idempotent: databases created by the old ad hoc startup
+code may already contain some of the columns and indexes they add.
+
+Run `python -m app.core.migrations` to apply pending migrations by hand.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Engine,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    inspect,
+    select,
+    false,
+    text,
+    true,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
+from .database import UNBOUNDED, Base
+
+# Make sure every model is registered on Base.metadata
+from app.models import article, comment, job_checkpoint, source, user, vote  # noqa: F401
+
+
+_version_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _version_metadata,
+    Column("version", String(64), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    upgrade: Callable[[Connection], None]
+
+
+def _add_column(conn: Connection, table: str, column: Column) -> None:
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column.name in existing:
+        return
+    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+
+
+def _create_index(conn: Connection, table: str, name: str) -> None:
+    """Create a model-declared index if the database doesn't have it yet."""
+    index = next(i for i in Base.metadata.tables[table].indexes if i.name == name)
+    index.create(conn, checkfirst=True)
+
+
+def _baseline(conn: Connection) -> None:
+    # Creates only the tables that are missing; existing ones are left alone
+    Base.metadata.create_all(conn)
+
+
+def _articles_thumbnail_url(conn: Connection) -> None:
+    _add_column(conn, "articles", Column("thumbnail_url", String(1000), nullable=True))
+
+
+def _sources_is_active(conn: Connection) -> None:
+    _add_column(conn, "sources", Column("is_active", Boolean, nullable=False, server_default=true()))
+
+
+def _articles_updated_at(conn: Connection) -> None:
+    _add_column(conn, "articles", Column("updated_at", DateTime, nullable=True))
+    conn.execute(text("UPDATE articles SET updated_at = created_at WHERE updated_at IS NULL"))
+    _create_index(conn, "articles", "ix_articles_updated_at")
+
+
+def _join_and_vote_indexes(conn: Connection) -> None:
+    _create_index(conn, "article_sources", "ix_article_sources_article_id")
+    _create_index(conn, "article_sources", "ix_article_sources_source_id")
+    _create_index(conn, "votes", "ix_votes_article_id_is_upvote")
+
+
+def _articles_created_at_index(conn: Connection) -> None:
+    _create_index(conn, "articles", "ix_articles_created_at")
+
+
+def _articles_avg_source_score(conn: Connection) -> None:
+    _add_column(conn, "articles", Column("avg_source_score", Float, nullable=False, server_default="0.5"))
+    conn.execute(
+        text(
+            "UPDATE articles SET avg_source_score = COALESCE(("
+            " SELECT AVG(s.source_score) FROM article_sources a JOIN sources s ON s.id = a.source_id"
+            " WHERE a.article_id = articles.id), 0.5)"
+        )
+    )
+
+
+def _job_checkpoints(conn: Connection) -> None:
+    Base.metadata.tables["job_checkpoints"].create(conn, checkfirst=True)
+
+
+def _articles_hot_score(conn: Connection) -> None:
+    from .credibility import hot_score
+
+    _add_column(conn, "articles", Column("hot_score", Float, nullable=False, server_default="0"))
+    articles = Base.metadata.tables["articles"]
+    rows = conn.execute(
+        select(articles.c.id, articles.c.upvotes, articles.c.downvotes, articles.c.credibility_score, articles.c.created_at)
+    ).all()
+    if rows:
+        conn.execute(
+            articles.update().where(articles.c.id == bindparam("b_id")).values(hot_score=bindparam("b_hot")),
+            [{"b_id": r.id, "b_hot": hot_score(r.upvotes, r.downvotes, r.credibility_score, r.created_at)} for r in rows],
+        )
+    _create_index(conn, "articles", "ix_articles_hot_score")
+    _create_index(conn, "articles", "ix_articles_credibility_tag_hot_score")
+
+
+def _source_score_learning(conn: Connection) -> None:
+    for name in ("learned_upvotes", "learned_downvotes"):
+        _add_column(conn, "articles", Column(name, Integer, nullable=False, server_default="0"))
+    for name in ("article_upvotes", "article_downvotes"):
+        _add_column(conn, "sources", Column(name, Integer, nullable=False, server_default="0"))
+
+
+def _sources_score_pinned(conn: Connection) -> None:
+    _add_column(conn, "sources", Column("source_score_pinned", Boolean, nullable=False, server_default=false()))
+
+
+MIGRATIONS: list[Migration] = [
+    Migration("0001_baseline", _baseline),
+    Migration("0002_articles_thumbnail_url", _articles_thumbnail_url),
+    Migration("0003_sources_is_active", _sources_is_active),
+    Migration("0004_articles_updated_at", _articles_updated_at),
+    Migration("0005_join_and_vote_indexes", _join_and_vote_indexes),
+    Migration("0006_articles_created_at_index", _articles_created_at_index),
+    Migration("0007_articles_avg_source_score", _articles_avg_source_score),
+    Migration("0008_job_checkpoints", _job_checkpoints),
+    Migration("0009_articles_hot_score", _articles_hot_score),
+    Migration("0010_source_score_learning", _source_score_learning),
+    Migration("0011_sources_score_pinned", _sources_score_pinned),
+]
+
+
+def _applied_versions(conn: Connection) -> set[str]:
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def _stamp(conn: Connection, version: str) -> None:
+    conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+
+
+def run_migrations(engine: Engine) -> list[str]:
+    """Apply pending migrations and return the versions that were applied."""
+    # Backfills (0009's hot scores) may run for longer than db_statement_timeout_ms
+    engine = engine.execution_options(**UNBOUNDED)
+    with engine.connect() as conn:
+        if inspect(conn).has_table("schema_migrations"):
+            applied = _applied_versions(conn)
+            if all(m.version in applied for m in MIGRATIONS):
+                return []
+
+    applied_now: list[str] = []
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Serialize concurrently booting workers; released at commit
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'))"))
+        _version_metadata.create_all(conn)
+        applied = _applied_versions(conn)
+        fresh = not inspect(conn).has_table("articles")
+        if fresh:
+            Base.metadata.create_all(conn)
+        for migration in MIGRATIONS:
+            if migration.version in applied:
+                continue
+            if not fresh:
+                migration.upgrade(conn)
+            _stamp(conn, migration.version)
+            applied_now.append(migration.version)
+    return applied_now
+
+
+if __name__ == "__main__":
+    from .database import engine
+
+    versions = run_migrations(engine)
+    if versions:
+        for v in versions:
+            print(f"applied {v}")
+    else:
+        print("schema is up to date")
@@ -0,0 +1,93 @@
+"""Connection-pool instrumentation: checkout waits, timeouts and in-use counts per engine.
+
+Engines are created with a pool class from timed_pool_class(), which times
+every checkout (including the wait for a free connection when the pool is
+exhausted). The class carries its PoolMetrics, so the timing survives
+engine.dispose() recreating the pool. snapshot() adds the live gauges from
+each registered engine's current pool.
+"""
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+
+# Recent checkout waits kept per pool for the percentiles
+WAIT_SAMPLES = 1024
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._recent: deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self._recent.append(seconds)
+
+    def waits(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            totals = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+        for label, q in (("wait_ms_p50", 0.5), ("wait_ms_p99", 0.99)):
+            totals[label] = recent[min(len(recent) - 1, int(q * len(recent)))] * 1000 if recent else 0.0
+        return totals
+
+
+class _TimedCheckout:
+    """Pool mixin timing _do_get, the step that blocks while the pool is exhausted."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def timed_pool_class(base: type, metrics: PoolMetrics) -> type:
+    return type(f"Timed{base.__name__}", (_TimedCheckout, base), {"metrics": metrics})
+
+
+_registry: dict[str, tuple[object, PoolMetrics]] = {}
+
+
+def register(name: str, engine) -> None:
+    """Report engine under name, if its pool is timed; engines shared under two names count once."""
+    metrics = getattr(engine.pool, "metrics", None)
+    if metrics is not None and not any(registered is engine for registered, _ in _registry.values()):
+        _registry[name] = (engine, metrics)
+
+
+def _gauges(pool) -> dict:
+    gauges = {}
+    for key, method in (("size", "size"), ("in_use", "checkedout"), ("idle", "checkedin"), ("overflow", "overflow")):
+        fn = getattr(pool, method, None)
+        if fn is not None:
+            gauges[key] = fn()
+    return gauges
+
+
+def snapshot() -> dict[str, dict]:
+    return {name: {**_gauges(engine.pool), **metrics.waits()} for name, (engine, metrics) in _registry.items()}
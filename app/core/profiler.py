@@ -0,0 +1,256 @@
+"""On-demand sampling profiler for live requests and ingest cycles.
+
+Nothing runs until a profile is requested: there is no sampler thread, no
+trace hook and no per-call cost, and the middleware's fast path is one
+attribute check. While a profile runs, a daemon thread snapshots the
+other threads' stacks with sys._current_frames() every
+profile_sample_interval_ms and counts them, so the profiled code itself
+is never instrumented. Stacks parked in idle waits (an empty threadpool,
+the event loop's select) are dropped.
+
+Output is the "collapsed" format read by flamegraph.pl, speedscope and
+friends: one line per distinct stack, frames root-first separated by ";",
+then the sample count.
+
+Ways to start one (admin only):
+
+  POST /admin/profile?requests=N     the next N requests to start, across all
+                                     threads
+  POST /admin/profile/ingest         one ingest cycle, on its own thread
+  X-Profile: <signed value>          the span of this request; the response body
+                                     is replaced by the stacks. Get a value from
+                                     POST /admin/profile/header (requires
+                                     profile_signing_key).
+
+An X-Profile request runs on the event loop and the shared threadpool, so
+its sampler cannot tell its threads from other requests': every thread is
+sampled while it runs, and anything else the worker was doing shows up
+too. Send it to a quiet worker for a clean profile.
+
+GET /admin/profile returns the last finished profile.
+"""
+import hashlib
+import hmac
+import sys
+import threading
+import time
+from collections import Counter
+
+from .config import get_settings
+
+# Leaf frames that mean "this thread is waiting for work", not doing it
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    # aiosqlite's connection thread, blocked on its request queue
+    ("core.py", "_connection_worker_thread"),
+}
+
+
+def _label(code, cache: dict) -> str:
+    label = cache.get(code)
+    if label is None:
+        filename = code.co_filename
+        marker = filename.rfind("/app/")
+        short = filename[marker + 1:] if marker != -1 else filename.rsplit("/", 1)[-1]
+        label = cache[code] = f"{code.co_name} ({short}:{code.co_firstlineno})"
+    return label
+
+
+def _idle(frame) -> bool:
+    code = frame.f_code
+    return (code.co_filename.rsplit("/", 1)[-1], code.co_name) in IDLE_LEAVES
+
+
+class Sampler(threading.Thread):
+    """Counts the stacks of thread_ids (every other thread if None) until stop()."""
+
+    def __init__(self, interval_seconds: float, thread_ids: set[int] | None = None):
+        super().__init__(name="profiler", daemon=True)
+        self.interval_seconds = interval_seconds
+        self.thread_ids = thread_ids
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stopping = threading.Event()
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        labels: dict = {}
+        while not self._stopping.wait(self.interval_seconds):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                if _idle(frame):
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(_label(frame.f_code, labels))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(frames))] += 1
+                self.samples += 1
+
+    def stop(self) -> str:
+        self._stopping.set()
+        self.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def sign_profile_header(key: str, expires_at: int) -> str:
+    digest = hmac.new(key.encode(), f"profile:{expires_at}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires_at}.{digest}"
+
+
+def verify_profile_header(key: str, value: str) -> bool:
+    expires_at, _, digest = value.partition(".")
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(sign_profile_header(key, int(expires_at)), value)
+
+
+class RequestProfiler:
+    """One profile at a time; the last finished one is kept for GET /admin/profile."""
+
+    def __init__(self):
+        self.remaining_requests = 0
+        # Bumped by arm(), so requests already in flight when it ran are not counted
+        self.generation = 0
+        self.last_profile: str | None = None
+        self.running = False
+        self._sampler: Sampler | None = None
+        self._lock = threading.Lock()
+
+    def _interval(self) -> float:
+        return get_settings().profile_sample_interval_ms / 1000
+
+    def _begin(self, thread_ids: set[int] | None = None) -> Sampler | None:
+        with self._lock:
+            if self.running:
+                return None
+            self.running = True
+        sampler = Sampler(self._interval(), thread_ids)
+        sampler.start()
+        return sampler
+
+    def _finish(self, sampler: Sampler) -> str:
+        profile = sampler.stop()
+        with self._lock:
+            self.last_profile = profile
+            self.running = False
+        return profile
+
+    def arm(self, requests: int) -> bool:
+        """Profile the next `requests` requests; False if a profile is already running."""
+        sampler = self._begin()
+        if sampler is None:
+            return False
+        self._sampler = sampler
+        with self._lock:
+            self.generation += 1
+            self.remaining_requests = requests
+        return True
+
+    def request_started(self) -> int | None:
+        """Token for request_finished: the armed profile's generation, None if none is armed."""
+        with self._lock:
+            return self.generation if self.remaining_requests else None
+
+    def request_finished(self, generation: int) -> None:
+        with self._lock:
+            if self.remaining_requests <= 0 or generation != self.generation:
+                return
+            self.remaining_requests -= 1
+            if self.remaining_requests:
+                return
+            sampler, self._sampler = self._sampler, None
+        self._finish(sampler)
+
+    def start_single(self) -> Sampler | None:
+        return self._begin()
+
+    def finish_single(self, sampler: Sampler) -> str:
+        return self._finish(sampler)
+
+    def profile_ingest(self) -> None:
+        """Run one ingest cycle on this thread with only this thread sampled."""
+        from app.core.database import WriteSessionLocal
+        from app.ingest.ingest import ingest_once
+
+        sampler = self._begin({threading.get_ident()})
+        if sampler is None:
+            return
+        db = WriteSessionLocal()
+        try:
+            ingest_once(db)
+        except Exception as e:
+            print(f"Profiled ingest failed: {e}")
+        finally:
+            db.close()
+            self._finish(sampler)
+
+
+profiler = RequestProfiler()
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilerMiddleware:
+    """Counts requests while a profile is armed, and serves X-Profile requests."""
+
+    def __init__(self, app):
+        self.app = app
+        self.signing_key = get_settings().profile_signing_key
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (self.signing_key or profiler.remaining_requests):
+            await self.app(scope, receive, send)
+            return
+        value = _header(scope, b"x-profile") if self.signing_key else None
+        if value is not None and verify_profile_header(self.signing_key, value):
+            sampler = profiler.start_single()
+            if sampler is not None:
+                await self._profile_one(sampler, scope, receive, send)
+                return
+        # Taken before the request runs, so the POST /admin/profile that arms a profile
+        # is not one of the requests it counts
+        generation = profiler.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if generation is not None:
+                profiler.request_finished(generation)
+
+    async def _profile_one(self, sampler: Sampler, scope, receive, send) -> None:
+        status = 500
+
+        async def discard(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            body = profiler.finish_single(sampler).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profile-status", str(status).encode()),
+                    (b"x-profile-samples", str(sampler.samples).encode()),
+                    (b"x-profile-elapsed-ms", f"{elapsed_ms:.1f}".encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,244 @@
+"""Per-request SQL tracing, and budgets to catch N+1 queries before production does.
+
+This is the one SQL tracer in the app: engine-wide cursor listeners time
+every statement once and fill in the QueryTrace of the request it ran
+under (how many statements, how long they took, how often each distinct
+statement ran). The metrics middleware reads the same trace for its
+per-request histograms, and registers in statement_observers for the
+global query counters.
+
+A request over its budget (the route's entry in ROUTE_BUDGETS, else
+query_budget_statements, plus query_budget_ms) prints one report with the
+totals, the most repeated statements and a stack excerpt of where the
+statement that crossed the limit was issued, which is usually the loop
+doing the N+1.
+
+Within budget the cost is a counter bump and a dict update per statement;
+a stack is only captured once, when the limit is crossed.
+
+Tests hold endpoints to the same budgets with the pytest plugin in
+app.testing.query_budget.
+"""
+import contextlib
+import contextvars
+import sys
+from collections import Counter
+from time import perf_counter
+from typing import Callable
+
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import get_settings
+
+# Statement budgets by route name (the endpoint function, so they hold under any mount
+# prefix such as the integrated app's /news); other routes get query_budget_statements.
+# Each is what the route's most expensive path runs, measured with the auth cache cold,
+# so a single extra statement trips it.
+ROUTE_BUDGETS = {
+    # GET /articles: feed version, ids, hydrate. Must not grow with the page size
+    "list_articles": 3,
+    # GET /articles/{article_id}
+    "get_article": 1,
+    # POST /articles: user, dedupe check, sources, article, one INSERT for all source links
+    "create_article": 5,
+    # GET /articles/{article_id}/comments
+    "list_comments": 2,
+    # POST /articles/{article_id}/comments: user, article, insert
+    "add_comment": 3,
+    # POST /vote, flipping an existing vote: user, article, insert, flip, move counters, scores
+    "cast_vote": 6,
+    # POST /auth/login, upgrading an old bcrypt hash: user, update
+    "login": 2,
+    # POST /auth/register: existing check, insert
+    "register": 2,
+}
+
+EXCERPT_FRAMES = 6
+REPORT_STATEMENTS = 3
+
+
+def budget_for(route_name: str | None) -> int:
+    return ROUTE_BUDGETS.get(route_name, get_settings().query_budget_statements)
+
+
+class QueryTrace:
+    """Statements run under one request (or one `traced()` block)."""
+
+    __slots__ = ("key", "limit", "scope", "count", "seconds", "statements", "excerpt")
+
+    def __init__(self, key: str = "", limit: int | None = None, scope: dict | None = None):
+        self.key = key
+        self.scope = scope
+        # None: resolved from the route on the first statement, once routing has run
+        self.limit = limit
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+        self.excerpt: str | None = None
+
+    def resolve(self) -> None:
+        """Key and limit from the matched route; call once routing has run."""
+        route = self.scope.get("route")
+        self.key = f"{self.scope['method']} {getattr(route, 'path_format', None) or 'unmatched'}"
+        self.limit = budget_for(getattr(route, "name", None))
+
+    def over_budget(self, statements: int, ms: float = 0) -> bool:
+        return bool((statements and self.count > statements) or (ms and self.seconds * 1000 > ms))
+
+    def report(self, statements: int, ms: float = 0) -> str:
+        lines = [
+            f"{self.key or 'queries'}: {self.count} statements (budget {statements or '-'}), "
+            f"{self.seconds * 1000:.1f}ms in SQL (budget {f'{ms:g}ms' if ms else '-'})"
+        ]
+        for statement, count in self.statements.most_common(REPORT_STATEMENTS):
+            lines.append(f"  x{count} {' '.join(statement.split())[:160]}")
+        if self.excerpt:
+            lines.append(f"  crossed the limit at: {self.excerpt}")
+        return "\n".join(lines)
+
+
+def _frames():
+    """The current stack, outermost first, continued through greenlet_spawn.
+
+    AsyncSession runs statements in a child greenlet, whose stack stops at the
+    spawn; the route awaiting the result is on the parent greenlet's stack.
+    """
+    chains = []
+    frame, glet = sys._getframe(1), getcurrent()
+    while frame is not None:
+        chain = []
+        while frame is not None:
+            chain.append(frame)
+            frame = frame.f_back
+        chains.append(reversed(chain))
+        glet = glet.parent
+        frame = glet.gr_frame if glet is not None else None
+    for chain in reversed(chains):
+        yield from chain
+
+
+def _excerpt() -> str:
+    """The innermost first-party frames of the current stack, outermost first."""
+    frames = []
+    for frame in _frames():
+        filename = frame.f_code.co_filename
+        # Skip the ASGI middleware frames and this module
+        if "/app/" in filename and frame.f_code.co_name != "__call__" and not filename.endswith("query_budget.py"):
+            frames.append(f"{filename[filename.rfind('/app/') + 1:]}:{frame.f_lineno} {frame.f_code.co_name}")
+    return " > ".join(frames[-EXCERPT_FRAMES:]) or "(no application frames)"
+
+
+# A mutable holder, so statements run in threadpool or run_sync copies of the context still count
+_current: contextvars.ContextVar[QueryTrace | None] = contextvars.ContextVar("query_trace", default=None)
+_QUERY_STARTED = "query_trace_started"
+
+# Called with every finished request's trace; the pytest plugin collects them this way
+observers: list[Callable[[QueryTrace], None]] = []
+# Called with every statement's duration in seconds, request or not; metrics counts them this way
+statement_observers: list[Callable[[float], None]] = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_QUERY_STARTED, []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stack = conn.info.get(_QUERY_STARTED)
+    if not stack:
+        return
+    elapsed = perf_counter() - stack.pop()
+    for observe in statement_observers:
+        observe(elapsed)
+    trace = _current.get()
+    if trace is None:
+        return
+    trace.seconds += elapsed
+    trace.count += 1
+    trace.statements[statement] += 1
+    if trace.limit is None:
+        trace.resolve()
+    if trace.limit and trace.count == trace.limit + 1:
+        trace.excerpt = _excerpt()
+
+
+def _handle_error(context) -> None:
+    if context.connection is not None:
+        stack = context.connection.info.get(_QUERY_STARTED)
+        if stack:
+            stack.pop()
+
+
+@contextlib.contextmanager
+def request_trace(scope: dict):
+    """The QueryTrace for the request in scope: the one an outer middleware opened, else a new one."""
+    trace = _current.get()
+    if trace is not None and trace.scope is not None:
+        yield trace
+        return
+    trace = QueryTrace(scope=scope)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+class traced:
+    """`with traced() as trace:` counts the statements run inside the block on this context."""
+
+    def __init__(self, key: str = "", limit: int = 0):
+        self.trace = QueryTrace(key, limit)
+
+    def __enter__(self) -> QueryTrace:
+        listen()
+        self._token = _current.set(self.trace)
+        return self.trace
+
+    def __exit__(self, *exc) -> None:
+        _current.reset(self._token)
+
+
+class QueryBudgetMiddleware:
+    """Traces each request and prints a report for the ones over budget."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_trace(scope) as trace:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if trace.limit is None:
+                    trace.resolve()
+                ms = get_settings().query_budget_ms
+                if trace.over_budget(trace.limit, ms):
+                    print(f"Query budget exceeded: {trace.report(trace.limit, ms)}")
+                for observer in list(observers):
+                    observer(trace)
+
+
+_listening = False
+
+
+def listen() -> None:
+    """Attach the cursor listeners to every engine (idempotent)."""
+    global _listening
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _listening = True
+
+
+def trace_app(app) -> None:
+    """Hold app's requests to their query budgets (no-op when query_trace_enabled is off)."""
+    if not get_settings().query_trace_enabled:
+        return
+    app.add_middleware(QueryBudgetMiddleware)
+    listen()
@@ -1,13 +1,24 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 
 from .config import get_settings
 
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_settings = get_settings()
+# Pinning min/max to the configured cost makes hashes at any other cost "need update"
+password_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=_settings.password_bcrypt_rounds,
+    bcrypt__min_rounds=_settings.password_bcrypt_rounds,
+    bcrypt__max_rounds=_settings.password_bcrypt_rounds,
+)
 
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -27,3 +38,52 @@ def get_password_hash(password: str) -> str:
     return password_context.hash(password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify, and return a fresh hash when the stored one uses an outdated cost."""
+    return password_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt on its own small thread pool, off FastAPI's shared threadpool.
+
+    Routes that hash take a slot() dependency first. At most
+    password_hash_max_pending requests may hold a slot; beyond that callers
+    get an immediate 429 before any DB work, instead of queueing behind the
+    backlog, so a login storm cannot stall unrelated endpoints. Slots are
+    only touched from the event loop, so the count needs no lock.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    async def slot(self):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many sign-in attempts, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    async def _run(self, fn: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+
+password_hasher = PasswordHasher(_settings.password_hash_workers, _settings.password_hash_max_pending)
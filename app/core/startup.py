@@ -0,0 +1,90 @@
+"""Deferred startup: run the bootstrap off the request path, serve 503 until it is done.
+
+With startup_bootstrap="background" a worker binds its port right away and
+runs the bootstrap (migrations, seeding, background services) on a thread.
+Until it succeeds every request except the health check and static files
+gets 503 with Retry-After, so nothing reaches a route before the schema is
+current. A failed bootstrap is retried with exponential backoff; after
+startup_bootstrap_attempts failures the worker shuts itself down (SIGTERM)
+so the process manager replaces it, rather than serving 503 forever.
+
+With "blocking" the same retries run before the app serves, and a final
+failure aborts startup.
+"""
+import os
+import signal
+import threading
+import time
+import traceback
+from typing import Callable
+
+from starlette.responses import JSONResponse
+
+from .config import get_settings
+
+RETRY_DELAY_SECONDS = 1.0
+MAX_RETRY_DELAY_SECONDS = 30.0
+STARTING_RETRY_AFTER_SECONDS = 5
+
+
+class ReadinessGateMiddleware:
+    """503 for every HTTP request but exempt paths until `ready` is set."""
+
+    def __init__(self, app, ready: threading.Event, exempt: tuple[str, ...] = ("/healthz",)):
+        self.app = app
+        self.ready = ready
+        self.exempt = exempt
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and not self.ready.is_set()
+            and scope["path"] not in self.exempt
+            and not scope["path"].startswith("/static/")
+        ):
+            response = JSONResponse(
+                {"detail": "Service is starting"},
+                status_code=503,
+                headers={"Retry-After": str(STARTING_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def run_with_retries(step: Callable[[], None], attempts: int) -> bool:
+    """Run step until it succeeds, backing off between failures; False once attempts run out."""
+    delay = RETRY_DELAY_SECONDS
+    for attempt in range(1, attempts + 1):
+        try:
+            step()
+            return True
+        except Exception:
+            traceback.print_exc()
+            if attempt == attempts:
+                break
+            print(f"Bootstrap failed (attempt {attempt}/{attempts}), retrying in {delay:g}s")
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+    return False
+
+
+def install_bootstrap(app, step: Callable[[], None], ready: threading.Event) -> None:
+    """Run step at startup per startup_bootstrap and set ready once it has succeeded."""
+    settings = get_settings()
+
+    def _run_in_background():
+        if run_with_retries(step, settings.startup_bootstrap_attempts):
+            ready.set()
+            return
+        print(f"Bootstrap failed {settings.startup_bootstrap_attempts} times, shutting down")
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    @app.on_event("startup")
+    def _start_bootstrap():
+        if settings.startup_bootstrap == "background":
+            threading.Thread(target=_run_in_background, name="bootstrap", daemon=True).start()
+            return
+        if not run_with_retries(step, settings.startup_bootstrap_attempts):
+            raise RuntimeError(f"Bootstrap failed {settings.startup_bootstrap_attempts} times")
+        ready.set()
@@ -0,0 +1,249 @@
+"""Write-coalescing buffer for article vote counters.
+
+With APP_VOTE_BUFFER_ENABLED, cast_vote still commits each row in `votes`
+immediately, but the counter and credibility update on `articles` goes
+into this buffer. Deltas are summed per article and flushed every
+vote_buffer_flush_ms, or sooner once vote_buffer_max_votes are pending.
+A hot article then costs one row update per flush instead of one per vote.
+
+The votes table stays the source of truth. Graceful shutdown flushes
+whatever is pending; deltas lost in a crash are repaired by the
+reconciliation job (python -m app.jobs.reconcile_votes). A recount would
+count a delta still held in some worker's buffer twice, so the two
+coordinate through job_checkpoints:
+
+- every running buffer keeps a heartbeat row, vote_buffer:{host}:{pid};
+- while reconciliation holds its lease (WRITE_THROUGH_LEASE), buffers go
+  write-through: new votes move the counters in their own transaction, as
+  with the buffer off, and the buffer flushes what it holds, waits for
+  votes already admitted, flushes again, then acknowledges by storing the
+  lease's expiry in its heartbeat row's position;
+- reconciliation recounts only once every live buffer has acknowledged.
+
+A buffer checks the lease every QUIESCE_POLL_SECONDS and goes back to
+buffering once it is released or expires. A crashed buffer's heartbeat
+goes stale after HEARTBEAT_TTL_SECONDS and no longer holds anything up.
+"""
+import contextlib
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .database import WriteSessionLocal
+from .events import event_bus
+from .vote_counters import apply_counter_delta
+from app.models.job_checkpoint import JobCheckpoint
+
+
+HEARTBEAT_PREFIX = "vote_buffer:"
+HEARTBEAT_INTERVAL_SECONDS = 10
+# A buffer whose heartbeat is older than this is taken to have died with its process
+HEARTBEAT_TTL_SECONDS = 60
+# Reconciliation's lease row; position is its expiry (unix seconds), 0 when released
+WRITE_THROUGH_LEASE = "reconcile_votes:lease"
+QUIESCE_POLL_SECONDS = 1
+# Longest to wait for admitted votes to add their delta (shutdown runs on the event loop)
+ADMITTED_WAIT_SECONDS = 5
+
+
+def unquiesced_buffers(db: Session, leases: set[int]) -> list[str]:
+    """Live buffers (host:pid) that have not acknowledged any of the given lease expiries."""
+    since = datetime.utcnow() - timedelta(seconds=HEARTBEAT_TTL_SECONDS)
+    rows = (
+        db.query(JobCheckpoint.name, JobCheckpoint.position)
+        .filter(JobCheckpoint.name.startswith(HEARTBEAT_PREFIX), JobCheckpoint.updated_at >= since)
+        .all()
+    )
+    return [r.name[len(HEARTBEAT_PREFIX):] for r in rows if r.position not in leases]
+
+
+class VoteBuffer:
+    def __init__(self, session_factory=WriteSessionLocal):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._pending: dict[int, list[int]] = {}
+        self._pending_votes = 0
+        # Votes admitted to the buffer whose delta is not added yet; write-through waits for them
+        self._admitted = 0
+        self._settled = threading.Condition(self._lock)
+        self._write_through = False
+        self._acked_lease = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._heartbeat_name = f"{HEARTBEAT_PREFIX}{socket.gethostname()}:{os.getpid()}"
+
+    @contextlib.contextmanager
+    def admit(self):
+        """Around one vote: yields True if its delta goes to this buffer (then add() it),
+        False if the vote must move the counters itself (buffer stopped or write-through)."""
+        with self._lock:
+            buffered = self._thread is not None and not self._write_through
+            if buffered:
+                self._admitted += 1
+        try:
+            yield buffered
+        finally:
+            if buffered:
+                with self._lock:
+                    self._admitted -= 1
+                    if not self._admitted:
+                        self._settled.notify_all()
+
+    def add(self, article_id: int, d_up: int, d_down: int) -> tuple[int, int]:
+        """Queue a delta; returns the article's total unflushed (up, down) delta."""
+        settings = get_settings()
+        with self._lock:
+            delta = self._pending.setdefault(article_id, [0, 0])
+            delta[0] += d_up
+            delta[1] += d_down
+            self._pending_votes += 1
+            full = self._pending_votes >= settings.vote_buffer_max_votes
+            pending = (delta[0], delta[1])
+        if full:
+            self._wake.set()
+        return pending
+
+    def flush(self) -> int:
+        """Write all pending deltas in one transaction; returns the number of articles updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_votes = 0
+        pending = {a: d for a, d in pending.items() if d != [0, 0]}
+        if not pending:
+            return 0
+        db: Session = self._session_factory()
+        flushed = []
+        try:
+            # Sorted ids give concurrent flushers (other workers) a consistent lock order
+            for article_id in sorted(pending):
+                d_up, d_down = pending[article_id]
+                row = apply_counter_delta(db, article_id, d_up, d_down)
+                if row is not None:
+                    flushed.append((article_id, row))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self._requeue(pending)
+            print(f"Vote buffer flush failed, will retry: {e}")
+            return 0
+        finally:
+            db.close()
+        for article_id, row in flushed:
+            event_bus.publish(
+                "vote",
+                {
+                    "article_id": article_id,
+                    "upvotes": row.upvotes,
+                    "downvotes": row.downvotes,
+                    "credibility_score": row.credibility_score,
+                    "credibility_tag": row.credibility_tag,
+                    "created_at": row.created_at,
+                },
+            )
+        return len(flushed)
+
+    def _requeue(self, pending: dict[int, list[int]]) -> None:
+        with self._lock:
+            for article_id, (d_up, d_down) in pending.items():
+                delta = self._pending.setdefault(article_id, [0, 0])
+                delta[0] += d_up
+                delta[1] += d_down
+
+    def _heartbeat(self) -> None:
+        db: Session = self._session_factory()
+        try:
+            checkpoint = db.get(JobCheckpoint, self._heartbeat_name)
+            if checkpoint is None:
+                db.add(JobCheckpoint(name=self._heartbeat_name, position=self._acked_lease))
+            else:
+                checkpoint.position = self._acked_lease
+                checkpoint.updated_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    def _follow_reconciliation(self) -> None:
+        """Go write-through while reconciliation holds its lease, and acknowledge it once drained."""
+        db: Session = self._session_factory()
+        try:
+            expires = db.scalar(select(JobCheckpoint.position).where(JobCheckpoint.name == WRITE_THROUGH_LEASE))
+        finally:
+            db.close()
+        lease = expires if expires and expires > time.time() else 0
+        if lease == self._acked_lease:
+            return
+        if lease:
+            with self._lock:
+                self._write_through = True
+                settled = self._settled.wait_for(lambda: not self._admitted, ADMITTED_WAIT_SECONDS)
+            self.flush()
+            if not settled or self._pending:
+                # Votes still in flight, or the flush failed and requeued: acknowledge on a later poll
+                return
+        else:
+            with self._lock:
+                self._write_through = False
+        self._acked_lease = lease
+        self._heartbeat()
+
+    def _unregister(self) -> None:
+        db: Session = self._session_factory()
+        try:
+            db.execute(delete(JobCheckpoint).where(JobCheckpoint.name == self._heartbeat_name))
+            db.commit()
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        interval = get_settings().vote_buffer_flush_ms / 1000
+        last_beat = last_poll = time.monotonic()
+        while not self._stop.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+            if time.monotonic() - last_poll >= QUIESCE_POLL_SECONDS:
+                try:
+                    self._follow_reconciliation()
+                    last_poll = time.monotonic()
+                except Exception as e:
+                    print(f"Vote buffer reconciliation check failed, will retry: {e}")
+            if time.monotonic() - last_beat >= HEARTBEAT_INTERVAL_SECONDS:
+                try:
+                    self._heartbeat()
+                    last_beat = time.monotonic()
+                except Exception as e:
+                    print(f"Vote buffer heartbeat failed, will retry: {e}")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        # Registered, and write-through if a reconciliation is running, before the first
+        # vote is buffered, so reconciliation can see us
+        self._heartbeat()
+        self._follow_reconciliation()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vote-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        # New votes move the counters themselves from here; wait for the ones already admitted
+        with self._lock:
+            self._thread = None
+            self._settled.wait_for(lambda: not self._admitted, ADMITTED_WAIT_SECONDS)
+        self.flush()
+        self._unregister()
+
+
+vote_buffer = VoteBuffer()
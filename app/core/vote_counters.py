@@ -0,0 +1,92 @@
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import Row, case, func, select, update
+from sqlalchemy.orm import Session
+
+from .credibility import compute_credibility, hot_score
+from app.models.article import Article
+from app.models.vote import Vote
+
+
+def apply_counter_delta(db: Session, article_id: int, d_up: int, d_down: int) -> Row | None:
+    """Move an article's counters in SQL, then recompute its credibility from the result.
+
+    The counters move with one relative UPDATE ... RETURNING, so concurrent
+    deltas on the same article never overwrite one another on any session;
+    the row lock it takes holds until the caller commits, so the credibility
+    and hot score written next match the counts returned. Returns
+    (upvotes, downvotes, credibility_score, credibility_tag, created_at) as
+    stored, or None if the article does not exist. The caller commits.
+    """
+    row = db.execute(
+        update(Article)
+        .where(Article.id == article_id)
+        .values(upvotes=Article.upvotes + d_up, downvotes=Article.downvotes + d_down)
+        .returning(Article.upvotes, Article.downvotes, Article.avg_source_score, Article.created_at)
+    ).one_or_none()
+    if row is None:
+        return None
+    # Recompute credibility from the maintained average source score
+    score, tag = compute_credibility(row.upvotes, row.downvotes, row.avg_source_score)
+    return db.execute(
+        update(Article)
+        .where(Article.id == article_id)
+        .values(
+            credibility_score=score,
+            credibility_tag=tag,
+            hot_score=hot_score(row.upvotes, row.downvotes, score, row.created_at),
+        )
+        .returning(
+            Article.upvotes, Article.downvotes, Article.credibility_score, Article.credibility_tag, Article.created_at
+        )
+    ).one()
+
+
+def vote_tallies(db: Session, criterion) -> dict[int, tuple[int, int]]:
+    """(upvotes, downvotes) per article from the votes table, for votes matching criterion."""
+    return {
+        row.article_id: (row.up, row.down)
+        for row in db.execute(
+            select(
+                Vote.article_id,
+                func.sum(case((Vote.is_upvote, 1), else_=0)).label("up"),
+                func.sum(case((Vote.is_upvote, 0), else_=1)).label("down"),
+            )
+            .where(criterion)
+            .group_by(Vote.article_id)
+        )
+    }
+
+
+def recount_from_votes(db: Session, article_ids: Iterable[int]) -> int:
+    """Reset counters and credibility for article_ids from the votes table. The caller commits."""
+    ids = list(article_ids)
+    if not ids:
+        return 0
+    # Lock the rows first so the tally below includes every vote committed before us
+    rows = (
+        db.query(Article.id, Article.avg_source_score, Article.created_at)
+        .filter(Article.id.in_(ids))
+        .order_by(Article.id.asc())
+        .with_for_update()
+        .all()
+    )
+    tallies = vote_tallies(db, Vote.article_id.in_(ids))
+    now = datetime.utcnow()
+    for row in rows:
+        up, down = tallies.get(row.id, (0, 0))
+        score, tag = compute_credibility(up, down, row.avg_source_score)
+        db.execute(
+            update(Article)
+            .where(Article.id == row.id)
+            .values(
+                upvotes=up,
+                downvotes=down,
+                credibility_score=score,
+                credibility_tag=tag,
+                hot_score=hot_score(up, down, score, row.created_at),
+                updated_at=now,
+            )
+        )
+    return len(rows)
@@ -1,8 +1,11 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
+from app.core.auth_cache import UserSnapshot, token_cache, token_key, user_cache
 from app.core.config import get_settings
 from app.core.database import get_db
 from app.models.user import User
@@ -11,28 +14,43 @@ from app.models.user import User
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
+def _verified_subject(token: str) -> str:
+    """Subject of a valid token; signatures are checked once per token until it expires."""
+    key = token_key(token)
+    subject = token_cache.get(key)
+    if subject is not None:
+        return subject
+    settings = get_settings()
+    payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+    subject = payload.get("sub")
+    if subject is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    expires = payload.get("exp")
+    token_cache.set(key, subject, None if expires is None else expires - time.time())
+    return subject
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
     db: Session = Depends(get_db),
-) -> User:
+) -> UserSnapshot:
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    token = credentials.credentials
-    settings = get_settings()
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        subject = payload.get("sub")
-        if subject is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        user = db.query(User).filter(User.id == int(subject)).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-        return user
-    except JWTError:
+        user_id = int(_verified_subject(credentials.credentials))
+    except (JWTError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    user = user_cache.get(user_id)
+    if user is None:
+        row = db.get(User, user_id)
+        if not row:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        user = UserSnapshot.from_user(row)
+        user_cache.set(user_id, user)
+    return user
 
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
+def require_admin(user: UserSnapshot = Depends(get_current_user)) -> UserSnapshot:
     if not user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin required")
     return user
@@ -1,12 +1,15 @@
 from datetime import datetime, timedelta
+from time import perf_counter
 from typing import Sequence
 
 from sqlalchemy.orm import Session
 
 from app.models.source import Source
 from app.models.article import Article, ArticleSource
-from app.schemas.article import ArticleIn, ArticleSourceIn
-from app.core.credibility import compute_credibility
+from app.schemas.article import ArticleIn, ArticleSourceIn, article_dict
+from app.core.credibility import compute_credibility, hot_score
+from app.core.events import event_bus
+from app.core.metrics import ingest_cycle_duration, ingest_items_inserted, ingest_source_failures
 from .rss import parse_rss
 from .scrape import scrape_wwe_news, scrape_pwi, scrape_aew
 from .normalize import dedup_fingerprint
@@ -28,14 +31,27 @@ def _iter_items_for_source(source: Source):
 
 
 def ingest_once(db: Session, source_ids: Sequence[int] | None = None) -> int:
+    started = perf_counter()
+    try:
+        return _ingest(db, source_ids)
+    finally:
+        ingest_cycle_duration.observe(perf_counter() - started)
+
+
+def _ingest(db: Session, source_ids: Sequence[int] | None) -> int:
     sources_q = db.query(Source).filter(Source.is_active == True)
     if source_ids:
         sources_q = sources_q.filter(Source.id.in_(list(source_ids)))
     sources = sources_q.all()
+    # Detach the sources and end the read transaction: nothing stays open during network fetches
+    db.expunge_all()
+    db.commit()
 
     inserted = 0
     for src in sources:
-        for item in _iter_items_for_source(src):
+        items = list(_iter_items_for_source(src))
+        new_articles: list[dict] = []
+        for item in items:
             if not item.get("title") or not item.get("canonical_url"):
                 continue
             # Dedup by canonical_url or title fp
@@ -54,6 +70,7 @@ def ingest_once(db: Session, source_ids: Sequence[int] | None = None) -> int:
                 published_at=item.get("published_at"),
                 dedup_group_id=fp,
                 thumbnail_url=item.get("thumbnail_url"),
+                avg_source_score=src.source_score,
             )
             db.add(article)
             db.flush()
@@ -63,23 +80,19 @@ def ingest_once(db: Session, source_ids: Sequence[int] | None = None) -> int:
             score, tag = compute_credibility(article.upvotes, article.downvotes, src.source_score)
             article.credibility_score = score
             article.credibility_tag = tag
-            inserted += 1
+            article.hot_score = hot_score(article.upvotes, article.downvotes, score, article.created_at)
+            new_articles.append(article_dict(article, src))
 
-    if inserted:
+        # One short write transaction per source
         try:
             db.commit()
         except Exception as e:
-            # Handle database lock gracefully
             db.rollback()
-            print(f"Database commit failed: {e}")
-            # Try to commit individual articles
-            for article in db.new:
-                try:
-                    db.add(article)
-                    db.commit()
-                except:
-                    db.rollback()
-                    continue
+            print(f"Database commit failed for {src.name}: {e}")
+            ingest_source_failures.labels(src.name).inc()
+            continue
+        inserted += len(new_articles)
+        ingest_items_inserted.labels(src.name).inc(len(new_articles))
+        for payload in new_articles:
+            event_bus.publish("article", payload)
     return inserted
-
-
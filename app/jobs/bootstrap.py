@@ -0,0 +1,99 @@
+"""One-time setup: bring the schema up to date and seed the default sources.
+
+Workers no longer do this before serving. By default the app runs it on a
+background thread after startup (/healthz answers 503 until it finishes);
+with startup_bootstrap="off", run it once per deploy instead:
+
+    python -m app.jobs.bootstrap
+
+Seeding is batched: one query for the existing names, one insert for the
+missing sources and one update for the broken ones. It is skipped in prod
+unless --seed is given.
+"""
+import argparse
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import JobSessionLocal, engine
+from app.core.migrations import run_migrations
+from app.models.source import Source
+
+
+SEED_SOURCES = [
+    # Tier 1 core
+    {"name": "PWInsider", "rss_url": "http://www.pwinsider.com/rss.php", "base_url": "https://www.pwinsider.com"},
+    {"name": "Wrestling Observer", "rss_url": "https://www.f4wonline.com/rss.xml", "base_url": "https://www.f4wonline.com"},
+    {"name": "Pro Wrestling Torch", "rss_url": "https://www.pwtorch.com/feed", "base_url": "https://www.pwtorch.com"},
+    {"name": "Fightful", "rss_url": "https://www.fightful.com/rss.xml", "base_url": "https://www.fightful.com"},
+    {"name": "SEScoops", "rss_url": "https://www.sescoops.com/feed", "base_url": "https://www.sescoops.com"},
+    {"name": "WrestleZone", "rss_url": "https://www.wrestlezone.com/feed", "base_url": "https://www.wrestlezone.com"},
+    {"name": "411Mania Wrestling", "rss_url": "https://411mania.com/wrestling/feed/", "base_url": "https://411mania.com/wrestling/"},
+    {"name": "Ringside News", "rss_url": "https://www.ringsidenews.com/feed/", "base_url": "https://www.ringsidenews.com"},
+    {"name": "Cageside Seats", "rss_url": "https://www.cagesideseats.com/rss/index.xml", "base_url": "https://www.cagesideseats.com"},
+
+    # Tier 2 official promotions
+    {"name": "WWE", "rss_url": None, "base_url": "https://www.wwe.com/news"},
+    {"name": "AEW", "rss_url": None, "base_url": "https://www.allelitewrestling.com/aew-news"},
+    {"name": "TNA Wrestling", "rss_url": "https://tnawrestling.com/news/feed/", "base_url": "https://tnawrestling.com/news/"},
+    {"name": "NJPW", "rss_url": "https://www.njpw1972.com/feed", "base_url": "https://www.njpw1972.com"},
+    {"name": "Ring of Honor", "rss_url": "https://www.rohwrestling.com/news/feed", "base_url": "https://www.rohwrestling.com/news"},
+
+    # Tier 3 mainstream sports
+    {"name": "ESPN WWE", "rss_url": "https://www.espn.com/espn/rss/wwe/news", "base_url": "https://www.espn.com/wwe/"},
+    {"name": "CBS Sports WWE", "rss_url": "https://www.cbssports.com/rss/headlines/wwe/", "base_url": "https://www.cbssports.com/wwe/"},
+    # Fox Sports requires partner key for optimized RSS; skip for now to avoid breakage
+]
+
+# Broken sources that were polluting the feed
+BROKEN_SOURCES = ["WWE", "AEW", "Fightful"]
+
+
+def seed_sources(db: Session) -> dict:
+    names = [s["name"] for s in SEED_SOURCES]
+    existing = set(db.scalars(select(Source.name).where(Source.name.in_(names))))
+    missing = [
+        Source(name=s["name"], rss_url=s["rss_url"], base_url=s["base_url"], source_score=0.5)
+        for s in SEED_SOURCES
+        if s["name"] not in existing
+    ]
+    try:
+        db.add_all(missing)
+        db.flush()
+        disabled = db.execute(
+            update(Source)
+            .where(Source.name.in_(BROKEN_SOURCES), Source.is_active.is_(True))
+            .values(is_active=False)
+            .returning(Source.name)
+        ).scalars().all()
+        db.commit()
+    except IntegrityError:
+        # Another worker seeded concurrently; its rows stand
+        db.rollback()
+        return {"added": 0, "disabled": []}
+    for name in disabled:
+        print(f"DISABLED broken source: {name}")
+    return {"added": len(missing), "disabled": disabled}
+
+
+def run_bootstrap(seed: bool | None = None) -> dict:
+    """Apply pending migrations, then seed sources (by default everywhere but prod)."""
+    if seed is None:
+        seed = get_settings().environment != "prod"
+    result = {"migrations": run_migrations(engine)}
+    if seed:
+        db = JobSessionLocal()
+        try:
+            result["sources"] = seed_sources(db)
+        finally:
+            db.close()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply schema migrations and seed the default sources")
+    parser.add_argument("--seed", action=argparse.BooleanOptionalAction, default=None, help="default: not in prod")
+    args = parser.parse_args()
+    print(run_bootstrap(args.seed))
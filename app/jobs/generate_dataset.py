@@ -0,0 +1,412 @@
+"""Synthetic dataset generator for benchmarks and load tests.
+
+Fills an empty database with users, sources, articles, article sources,
+votes and comments whose shapes resemble production rather than dev.db:
+
+  articles   spread over --days, ids in publication order, 1-3 sources each
+             (sources drawn by a Zipf law, so a few outlets publish most)
+  votes      per-article counts drawn from a Zipf law (--vote-exponent):
+             most articles get a handful, a few get thousands; each voter
+             votes once per article, and the up share follows the
+             sources' scores
+  comments   proportional to an article's votes, arriving in bursts
+             (threads that flare up hours after publication)
+  users      --users accounts, user{n}@example.com, all with --password
+             (hashed once); user1 is an admin
+
+Article counters, credibility and hot scores are computed from the
+generated votes with the same vectorized code as app.jobs.rescore, so the
+database is consistent without running any job afterwards.
+
+Rows are generated with NumPy a chunk of articles at a time and written in
+bulk: COPY on PostgreSQL, executemany on SQLite. The target is the
+configured database (APP_DATABASE_URL) and must not already hold users or
+articles; the schema is created if missing. --wrestlers N also writes a
+wrestler JSON database (the format backend/wrestling_api.py loads) drawn
+from the same ring names as the article titles.
+
+    APP_DATABASE_URL=sqlite:///big.db python -m app.jobs.generate_dataset --articles 2000000
+"""
+import argparse
+import csv
+import io
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+
+from app.core.database import job_engine
+from app.core.migrations import run_migrations
+from app.core.security import get_password_hash
+from app.jobs.bootstrap import SEED_SOURCES
+from app.jobs.rescore import compute_credibility_array, hot_score_array
+from app.models.article import Article
+from app.models.user import User
+
+FIRST_NAMES = [
+    "Cody", "Seth", "Roman", "Drew", "Rhea", "Bianca", "Kenny", "Jon", "Hangman", "Will", "Kazuchika",
+    "Tetsuya", "Becky", "Charlotte", "Sami", "Kevin", "Bryan", "Adam", "Mercedes", "Orange", "Swerve",
+    "Jade", "Toni", "Hiroshi", "Shingo", "Ilja", "Gunther", "Logan", "Tiffany", "Damian", "Liv", "Jey",
+]
+LAST_NAMES = [
+    "Rhodes", "Rollins", "Reigns", "McIntyre", "Ripley", "Belair", "Omega", "Moxley", "Page", "Ospreay",
+    "Okada", "Naito", "Lynch", "Flair", "Zayn", "Owens", "Danielson", "Cole", "Mone", "Cassidy",
+    "Strickland", "Cargill", "Storm", "Tanahashi", "Takagi", "Dragunov", "Paul", "Stratton", "Priest",
+    "Morgan", "Uso", "Hardy",
+]
+HEADLINES = [
+    "{a} reportedly set for return at next week's pay-per-view",
+    "Backstage update on {a} and {b} following the main event",
+    "{a} signs multi-year extension, sources say",
+    "Injury update: {a} expected to miss several weeks",
+    "{a} vs. {b} announced for upcoming title match",
+    "Creative plans for {a} said to have changed",
+    "{a} addresses rumors about {b} in new interview",
+    "Card spoilers: {a} and {b} booked for tag team bout",
+    "Ratings: how {a}'s segment performed this week",
+    "{a} comments on contract status ahead of free agency",
+]
+SNIPPETS = [
+    "According to multiple reports, the decision was made earlier this week.",
+    "Nothing has been confirmed by the promotion at the time of writing.",
+    "The segment drew strong reactions from fans in attendance.",
+    "More details are expected to emerge over the coming days.",
+]
+COMMENT_BODIES = [
+    "Called it weeks ago.", "Not buying this one until it's confirmed.", "This would be huge if true.",
+    "Source on this?", "Best match of the year so far.", "Creative keeps dropping the ball here.",
+    "Finally!", "Feels like a work to me.", "Tickets already bought.", "Here we go again...",
+]
+PROMOTIONS = ["WWE", "AEW", "NJPW", "TNA Wrestling", "Ring of Honor", "Independent"]
+STYLES = ["Technical", "High-flyer", "Powerhouse", "Brawler", "Strong style", "Submission specialist"]
+
+
+def wrestler_names(count: int, rng: np.random.Generator) -> list[str]:
+    """`count` distinct ring names, the same ones for the same rng state; past the first/last
+    combinations a number is appended."""
+    pairs = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    rng.shuffle(pairs)
+    return [pairs[i % len(pairs)] + (f" {i // len(pairs) + 1}" if i >= len(pairs) else "") for i in range(count)]
+
+
+def _timestamps(values: np.ndarray) -> list[str]:
+    """datetime64 values as the text SQLAlchemy stores for DateTime (and COPY accepts)."""
+    return [s.replace("T", " ") for s in np.datetime_as_string(values.astype("datetime64[us]"), unit="us")]
+
+
+def _coprime_stride(n: int, rng: np.random.Generator) -> int:
+    # Stepping by a stride coprime to n visits n distinct values before repeating
+    while True:
+        stride = int(rng.integers(1, n)) if n > 1 else 1
+        if np.gcd(stride, n) == 1:
+            return stride
+
+
+class BulkWriter:
+    """COPY on PostgreSQL, one executemany per table and chunk elsewhere."""
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.postgres = conn.dialect.name == "postgresql"
+        self.marker = "?" if conn.dialect.paramstyle == "qmark" else "%s"
+
+    def write(self, table: str, columns: tuple[str, ...], rows: list[tuple]) -> None:
+        if not rows:
+            return
+        names = ", ".join(columns)
+        if self.postgres:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor = self.conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(f"COPY {table} ({names}) FROM STDIN WITH (FORMAT csv)", buffer)
+            finally:
+                cursor.close()
+        else:
+            marks = ", ".join([self.marker] * len(columns))
+            self.conn.exec_driver_sql(f"INSERT INTO {table} ({names}) VALUES ({marks})", rows)
+
+    def reset_sequences(self, tables: list[str]) -> None:
+        """Rows were written with explicit ids; move PostgreSQL's sequences past them."""
+        if not self.postgres:
+            return
+        for table in tables:
+            self.conn.execute(
+                text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), GREATEST(MAX(id), 1)) FROM {table}")
+            )
+
+
+def generate(
+    articles: int = 100_000,
+    users: int = 10_000,
+    sources: int = 40,
+    days: int = 365,
+    vote_exponent: float = 2.1,
+    comments_per_vote: float = 0.3,
+    password: str = "loadtest",
+    chunk_size: int = 20_000,
+    seed: int = 0,
+) -> dict:
+    rng = np.random.default_rng(seed)
+    run_migrations(job_engine)
+    with job_engine.connect() as conn:
+        if conn.scalar(select(func.count()).select_from(User)) or conn.scalar(
+            select(func.count()).select_from(Article)
+        ):
+            raise SystemExit("The database already has users or articles; point APP_DATABASE_URL at a new one")
+    now = np.datetime64(datetime.utcnow().replace(microsecond=0), "s")
+    names = wrestler_names(len(FIRST_NAMES) * len(LAST_NAMES), rng)
+    totals = {"users": users, "sources": 0, "articles": 0, "article_sources": 0, "votes": 0, "comments": 0}
+
+    with job_engine.begin() as conn:
+        writer = BulkWriter(conn)
+        password_hash = get_password_hash(password)
+        joined = _timestamps(now - rng.integers(days * 86400, (days + 30) * 86400, users).astype("timedelta64[s]"))
+        for start in range(0, users, chunk_size):
+            writer.write(
+                "users",
+                ("id", "email", "password_hash", "is_admin", "created_at"),
+                [
+                    (i + 1, f"user{i + 1}@example.com", password_hash, int(i == 0), joined[i])
+                    for i in range(start, min(start + chunk_size, users))
+                ],
+            )
+
+        # The seeded outlets first, so bootstrap finds them already present
+        source_names = [s["name"] for s in SEED_SOURCES][:sources]
+        source_names += [f"Synthetic Source {i}" for i in range(len(source_names) + 1, sources + 1)]
+        source_scores = rng.beta(5, 3, len(source_names))
+        created = _timestamps(np.full(len(source_names), now - np.timedelta64((days + 30) * 86400, "s")))
+        writer.write(
+            "sources",
+            ("id", "name", "rss_url", "base_url", "source_score", "article_upvotes", "article_downvotes", "is_active", "created_at"),
+            [
+                (i + 1, name, None, f"https://source{i + 1}.example.com", float(source_scores[i]), 0, 0, 1, created[i])
+                for i, name in enumerate(source_names)
+            ],
+        )
+        totals["sources"] = len(source_names)
+
+    # Publication times, oldest first so ids follow time like they do in production
+    published = np.sort(now - rng.integers(0, days * 86400, articles).astype("timedelta64[s]"))
+    user_stride = _coprime_stride(users, rng)
+    source_stride = _coprime_stride(len(source_names), rng)
+    next_ids = {"article_sources": 1, "votes": 1, "comments": 1}
+    started = time.perf_counter()
+
+    for start in range(0, articles, chunk_size):
+        stop = min(start + chunk_size, articles)
+        count = stop - start
+        ids = np.arange(start + 1, stop + 1)
+        times = published[start:stop]
+
+        # Sources: 1-3 per article, distinct within an article, popular outlets more often
+        per_article = 1 + rng.binomial(2, 0.25, count)
+        first = (rng.zipf(1.3, count) - 1) % len(source_names)
+        owner = np.repeat(np.arange(count), per_article)
+        offset = np.arange(len(owner)) - np.repeat(np.cumsum(per_article) - per_article, per_article)
+        source_ids = (first[owner] + offset * source_stride) % len(source_names) + 1
+        avg_scores = np.add.reduceat(source_scores[source_ids - 1], np.cumsum(per_article) - per_article) / per_article
+
+        # Votes: Zipf-distributed counts, distinct voters per article, up share led by source quality
+        votes = np.minimum(rng.zipf(vote_exponent, count) - 1, users)
+        up_share = np.clip(rng.normal(avg_scores, 0.15), 0.02, 0.98)
+        voter_article = np.repeat(np.arange(count), votes)
+        voter_offset = np.arange(len(voter_article)) - np.repeat(np.cumsum(votes) - votes, votes)
+        voters = (rng.integers(0, users, count)[voter_article] + voter_offset * user_stride) % users + 1
+        is_up = rng.random(len(voter_article)) < up_share[voter_article]
+        vote_times = np.minimum(
+            times[voter_article] + rng.exponential(12 * 3600, len(voter_article)).astype("timedelta64[s]"), now
+        )
+        ups = np.bincount(voter_article, weights=is_up, minlength=count).astype(np.int64)
+        downs = votes - ups
+
+        # Comments: proportional to votes, in 1-3 bursts starting hours after publication
+        comments = rng.poisson(comments_per_vote * votes + 0.2)
+        comment_article = np.repeat(np.arange(count), comments)
+        bursts = rng.exponential(6 * 3600, (count, 3))
+        burst = rng.integers(0, 1 + rng.binomial(2, 0.3, count)[comment_article])
+        comment_times = np.minimum(
+            times[comment_article]
+            + (bursts[comment_article, burst] + rng.exponential(240, len(comment_article))).astype("timedelta64[s]"),
+            now,
+        )
+        # A few regulars write most of the comments
+        commenters = (rng.zipf(1.5, len(comment_article)) - 1) % users + 1
+
+        scores, tags = compute_credibility_array(ups, downs, avg_scores)
+        hot = hot_score_array(ups, downs, scores, times.astype("datetime64[us]"))
+        title_names = rng.integers(0, len(names), (count, 2))
+        templates = rng.integers(0, len(HEADLINES), count)
+        snippets = rng.integers(0, len(SNIPPETS), count)
+        published_text = _timestamps(times)
+
+        with job_engine.begin() as conn:
+            writer = BulkWriter(conn)
+            writer.write(
+                "articles",
+                (
+                    "id", "title", "canonical_url", "content_snippet", "thumbnail_url", "published_at",
+                    "dedup_group_id", "upvotes", "downvotes", "avg_source_score", "credibility_score",
+                    "credibility_tag", "hot_score", "learned_upvotes", "learned_downvotes", "created_at", "updated_at",
+                ),
+                [
+                    (
+                        int(ids[i]),
+                        HEADLINES[templates[i]].format(a=names[title_names[i, 0]], b=names[title_names[i, 1]]),
+                        f"https://news.example.com/{ids[i]}",
+                        SNIPPETS[snippets[i]],
+                        None,
+                        published_text[i],
+                        f"synthetic-{ids[i]}",
+                        int(ups[i]),
+                        int(downs[i]),
+                        float(avg_scores[i]),
+                        float(scores[i]),
+                        str(tags[i]),
+                        float(hot[i]),
+                        0,
+                        0,
+                        published_text[i],
+                        published_text[i],
+                    )
+                    for i in range(count)
+                ],
+            )
+            first_id = next_ids["article_sources"]
+            writer.write(
+                "article_sources",
+                ("id", "article_id", "source_id", "url"),
+                [
+                    (first_id + n, article_id, source_id, f"https://source{source_id}.example.com/{article_id}")
+                    for n, (article_id, source_id) in enumerate(zip(ids[owner].tolist(), source_ids.tolist()))
+                ],
+            )
+            first_id = next_ids["votes"]
+            writer.write(
+                "votes",
+                ("id", "user_id", "article_id", "is_upvote", "created_at"),
+                [
+                    (first_id + n, user_id, article_id, up, created)
+                    for n, (user_id, article_id, up, created) in enumerate(
+                        zip(voters.tolist(), ids[voter_article].tolist(), is_up.astype(int).tolist(), _timestamps(vote_times))
+                    )
+                ],
+            )
+            first_id = next_ids["comments"]
+            bodies = rng.integers(0, len(COMMENT_BODIES), len(comment_article))
+            writer.write(
+                "comments",
+                ("id", "article_id", "user_id", "body", "created_at"),
+                [
+                    (first_id + n, article_id, user_id, COMMENT_BODIES[body], created)
+                    for n, (article_id, user_id, body, created) in enumerate(
+                        zip(ids[comment_article].tolist(), commenters.tolist(), bodies.tolist(), _timestamps(comment_times))
+                    )
+                ],
+            )
+
+        next_ids["article_sources"] += len(owner)
+        next_ids["votes"] += len(voter_article)
+        next_ids["comments"] += len(comment_article)
+        totals["articles"] += count
+        totals["article_sources"] += len(owner)
+        totals["votes"] += len(voter_article)
+        totals["comments"] += len(comment_article)
+        rate = totals["articles"] / (time.perf_counter() - started)
+        print(f"{totals['articles']}/{articles} articles, {totals['votes']} votes, {totals['comments']} comments ({rate:.0f} articles/s)")
+
+    with job_engine.begin() as conn:
+        BulkWriter(conn).reset_sequences(["users", "sources", "articles", "article_sources", "votes", "comments"])
+    return totals
+
+
+def generate_wrestlers(count: int, seed: int = 0) -> dict:
+    """A wrestler database in the format backend/wrestling_api.py loads, using the article names."""
+    rng = np.random.default_rng(seed)
+    names = wrestler_names(max(len(FIRST_NAMES) * len(LAST_NAMES), count), rng)
+    wrestlers = []
+    for i in range(count):
+        cagematch_id = 1000 + i
+        debut_year = int(rng.integers(1995, 2023))
+        wrestlers.append(
+            {
+                "id": f"synthetic-{cagematch_id}",
+                "name": names[i],
+                "nicknames": [f"The {STYLES[i % len(STYLES)]}"],
+                "real_name": names[i].split(" ")[0] + " " + LAST_NAMES[int(rng.integers(0, len(LAST_NAMES)))],
+                "age_numeric": int(rng.integers(21, 50)),
+                "height": f"{int(rng.integers(165, 205))} cm",
+                "weight": f"{int(rng.integers(60, 150))} kg",
+                "hometown": "Synthetic City",
+                "promotion": PROMOTIONS[int(rng.zipf(1.5) - 1) % len(PROMOTIONS)],
+                "wrestling_style": STYLES[int(rng.integers(0, len(STYLES)))],
+                "experience": f"{2025 - debut_year} years",
+                "trainers": [names[int(rng.integers(0, len(names)))]],
+                "signature_moves": [f"Move {int(rng.integers(1, 500))}"],
+                "social_media": {},
+                "averageRating": round(float(rng.beta(6, 3) * 10), 2),
+                "total_votes": int(rng.zipf(1.8)),
+                "total_comments": int(rng.zipf(2.0) - 1),
+                "cagematch_id": str(cagematch_id),
+                "profile_url": f"https://www.cagematch.net/?id=2&nr={cagematch_id}",
+                "stats_url": "",
+                "image_url": "",
+                "debut": str(debut_year),
+                "background_sports": "",
+                "alter_egos": [],
+                "roles": ["Singles Wrestler"],
+                "brand": "",
+                "gender": "male" if i % 4 else "female",
+            }
+        )
+    return {
+        "wrestlers": wrestlers,
+        "metadata": {
+            "total_wrestlers": count,
+            "data_source": "synthetic (app.jobs.generate_dataset)",
+            "version": "synthetic-1",
+            "created_at": datetime.utcnow().isoformat(),
+            "data_quality": "synthetic",
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill an empty database with a synthetic, production-shaped dataset")
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--sources", type=int, default=40)
+    parser.add_argument("--days", type=int, default=365, help="articles are spread over this many days")
+    parser.add_argument("--vote-exponent", type=float, default=2.1, help="Zipf exponent of votes per article (lower: heavier tail)")
+    parser.add_argument("--comments-per-vote", type=float, default=0.3)
+    parser.add_argument("--password", default="loadtest", help="password of every generated user")
+    parser.add_argument("--chunk-size", type=int, default=20_000, help="articles generated and written per transaction")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--wrestlers", type=int, default=0, help="also write a wrestler JSON database with this many wrestlers")
+    parser.add_argument("--wrestlers-out", default="wrestlers_synthetic.json")
+    args = parser.parse_args()
+
+    began = time.perf_counter()
+    print(
+        generate(
+            articles=args.articles,
+            users=args.users,
+            sources=args.sources,
+            days=args.days,
+            vote_exponent=args.vote_exponent,
+            comments_per_vote=args.comments_per_vote,
+            password=args.password,
+            chunk_size=args.chunk_size,
+            seed=args.seed,
+        )
+    )
+    if args.wrestlers:
+        with open(args.wrestlers_out, "w", encoding="utf-8") as f:
+            json.dump(generate_wrestlers(args.wrestlers, args.seed), f)
+        print(f"Wrote {args.wrestlers} wrestlers to {args.wrestlers_out}")
+    print(f"Done in {time.perf_counter() - began:.1f}s")
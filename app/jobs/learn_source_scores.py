@@ -0,0 +1,147 @@
+"""Learn Source.source_score from how readers vote on each source's articles.
+
+Every source keeps running totals of the up/down votes on its articles
+(Source.article_upvotes / article_downvotes). A run folds in only the
+articles whose counters moved since the last run, a chunk at a time: the
+chunk's rows are locked FOR UPDATE, so votes landing meanwhile wait for
+the commit instead of slipping in between the GROUP BY that yields the
+per-source deltas against the counts last learned
+(Article.learned_upvotes / learned_downvotes) and the UPDATE that records
+them as learned. The score is the posterior mean of a Beta prior:
+
+    (up + prior_mean * prior_weight) / (up + down + prior_weight)
+
+so a source with few votes stays near the prior and moves as evidence
+accumulates. Sources whose score moved by at least source_score_min_change
+get their articles' avg_source_score refreshed. Sources whose score an
+admin set by hand (Source.source_score_pinned) keep their totals up to
+date but their score is left alone.
+
+Because deltas are taken against learned counts, re-processing an article
+is harmless; the stored watermark only bounds how much is scanned. Run
+from the shell with `python -m app.jobs.learn_source_scores`, or via
+POST /admin/learn-source-scores.
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import JobSessionLocal
+from app.models.article import Article, ArticleSource
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.source import Source
+from .source_scores import refresh_avg_source_scores
+
+
+CHECKPOINT_NAME = "learn_source_scores"
+_EPOCH = datetime(1970, 1, 1)
+
+
+def smoothed_source_score(upvotes: int, downvotes: int) -> float:
+    settings = get_settings()
+    prior = settings.source_score_prior_weight
+    return (upvotes + settings.source_score_prior_mean * prior) / (upvotes + downvotes + prior)
+
+
+def learn_source_scores(db: Session, full: bool = False, chunk_size: int = 1000) -> dict[str, int]:
+    """Fold new vote outcomes into source scores; returns counts of articles, sources and sources moved."""
+    settings = get_settings()
+    checkpoint = db.get(JobCheckpoint, CHECKPOINT_NAME)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=CHECKPOINT_NAME, position=0)
+        db.add(checkpoint)
+    if full:
+        checkpoint.position = 0
+
+    # Stop a little behind now so transactions still in flight are picked up next run
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.source_score_lag_seconds)
+    changed = and_(
+        or_(Article.upvotes != Article.learned_upvotes, Article.downvotes != Article.learned_downvotes),
+        or_(Article.updated_at.is_(None), Article.updated_at <= cutoff),
+    )
+    if checkpoint.position:
+        changed = and_(changed, Article.updated_at > _EPOCH + timedelta(seconds=checkpoint.position))
+
+    learned = 0
+    touched: set[int] = set()
+    last_id = 0
+    while True:
+        ids = list(
+            db.execute(
+                select(Article.id)
+                .where(changed, Article.id > last_id)
+                .order_by(Article.id.asc())
+                .limit(chunk_size)
+                .with_for_update()
+            ).scalars()
+        )
+        if not ids:
+            break
+        in_chunk = Article.id.in_(ids)
+        deltas = db.execute(
+            select(
+                ArticleSource.source_id,
+                func.sum(Article.upvotes - Article.learned_upvotes).label("d_up"),
+                func.sum(Article.downvotes - Article.learned_downvotes).label("d_down"),
+            )
+            .join(Article, Article.id == ArticleSource.article_id)
+            .where(in_chunk)
+            .group_by(ArticleSource.source_id)
+        ).all()
+        for d in deltas:
+            db.execute(
+                update(Source)
+                .where(Source.id == d.source_id)
+                .values(
+                    article_upvotes=Source.article_upvotes + int(d.d_up),
+                    article_downvotes=Source.article_downvotes + int(d.d_down),
+                )
+            )
+            touched.add(d.source_id)
+        # Keep updated_at as is: this bookkeeping must not look like a content change
+        db.execute(
+            update(Article)
+            .where(in_chunk)
+            .values(
+                learned_upvotes=Article.upvotes,
+                learned_downvotes=Article.downvotes,
+                updated_at=Article.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        learned += len(ids)
+        last_id = ids[-1]
+
+    moved = []
+    # Every unpinned source, not just the touched ones: one unpinned since the last run catches up here
+    for src in db.query(Source).filter(Source.source_score_pinned.is_(False)):
+        score = smoothed_source_score(src.article_upvotes, src.article_downvotes)
+        if abs(score - src.source_score) >= settings.source_score_min_change:
+            src.source_score = score
+            moved.append(src.id)
+    checkpoint.position = int((cutoff - _EPOCH).total_seconds())
+    db.commit()
+
+    for source_id in moved:
+        refresh_avg_source_scores(source_id)
+    return {"articles": learned, "sources": len(touched), "moved": len(moved)}
+
+
+def run_learn_source_scores(full: bool = False) -> dict[str, int]:
+    """Entry point for background tasks: owns its own session."""
+    db = JobSessionLocal()
+    try:
+        return learn_source_scores(db, full=full)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learn source scores from article vote outcomes")
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and scan every article")
+    args = parser.parse_args()
+    print(run_learn_source_scores(full=args.full))
@@ -0,0 +1,191 @@
+"""Vote counter reconciliation.
+
+Walks `articles` in primary-key order, aggregates `votes` for each chunk
+with one GROUP BY, and recounts only the articles whose stored
+upvotes/downvotes differ. Progress is saved in job_checkpoints after every
+chunk, so an interrupted run resumes where it stopped. A pause between
+chunks keeps it out of the way of foreground traffic.
+
+A buffered delta is a vote already in the table but not yet in the
+counters, so a recount next to a live vote buffer would count it twice.
+Only one run at a time holds the lease row, and while it is held every
+vote buffer goes write-through (see app.core.vote_buffer): the run waits
+until each live buffer has flushed and acknowledged the lease before it
+recounts anything, and stops if one has not. A second run returns
+without touching anything.
+
+Run from the shell with `python -m app.jobs.reconcile_votes`, or via
+POST /admin/reconcile-votes.
+"""
+import argparse
+import time
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import JobSessionLocal
+from app.core.front_page import front_page
+from app.core.vote_buffer import HEARTBEAT_TTL_SECONDS, QUIESCE_POLL_SECONDS, WRITE_THROUGH_LEASE, unquiesced_buffers
+from app.core.vote_counters import recount_from_votes, vote_tallies
+from app.models.article import Article
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.vote import Vote
+
+
+CHECKPOINT_NAME = "reconcile_votes"
+# position holds the lease expiry (unix seconds); renewed after every chunk
+LEASE_NAME = WRITE_THROUGH_LEASE
+LEASE_SECONDS = 300
+# How long to wait for vote buffers to go write-through; long enough for a crashed
+# worker's heartbeat to go stale
+QUIESCE_WAIT_SECONDS = HEARTBEAT_TTL_SECONDS + 5
+
+
+def _checkpoint(db: Session) -> JobCheckpoint:
+    checkpoint = db.get(JobCheckpoint, CHECKPOINT_NAME)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=CHECKPOINT_NAME, position=0)
+        db.add(checkpoint)
+        db.flush()
+    return checkpoint
+
+
+def _take_lease(db: Session, held: int = 0) -> int:
+    """Take (held=0) or renew the run lease; returns its new expiry, or 0 if another run has it."""
+    if not held and db.get(JobCheckpoint, LEASE_NAME) is None:
+        try:
+            db.add(JobCheckpoint(name=LEASE_NAME, position=0))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+    now = int(time.time())
+    expires = now + LEASE_SECONDS
+    # A renewal only succeeds while the lease is still ours; a take only once it has expired
+    owned = JobCheckpoint.position == held if held else JobCheckpoint.position < now
+    result = db.execute(
+        update(JobCheckpoint).where(JobCheckpoint.name == LEASE_NAME, owned).values(position=expires)
+    )
+    return expires if result.rowcount == 1 else 0
+
+
+def _wait_for_buffers(db: Session, leases: set[int]) -> list[str]:
+    """Wait for every live vote buffer to acknowledge the lease; returns those that did not."""
+    deadline = time.monotonic() + QUIESCE_WAIT_SECONDS
+    while True:
+        waiting = unquiesced_buffers(db, leases)
+        db.rollback()
+        if not waiting or time.monotonic() >= deadline:
+            return waiting
+        time.sleep(QUIESCE_POLL_SECONDS / 2)
+
+
+def _release_lease(db: Session, held: int) -> None:
+    # Anything still open here is a chunk that failed or was abandoned
+    db.rollback()
+    db.execute(
+        update(JobCheckpoint).where(JobCheckpoint.name == LEASE_NAME, JobCheckpoint.position == held).values(position=0)
+    )
+    db.commit()
+
+
+def reconcile_vote_counters(
+    db: Session,
+    chunk_size: int | None = None,
+    pause_ms: int | None = None,
+    restart: bool = False,
+) -> dict[str, int | str]:
+    """Repair drifted counters; returns how many articles were checked and repaired.
+
+    When it cannot run, or stops early, the result also has a "skipped" reason.
+    """
+    settings = get_settings()
+    chunk_size = chunk_size or settings.reconcile_chunk_size
+    pause_ms = settings.reconcile_pause_ms if pause_ms is None else pause_ms
+
+    checked = repaired = 0
+    lease = _take_lease(db)
+    if not lease:
+        db.rollback()
+        return {"checked": 0, "repaired": 0, "skipped": "another reconciliation is running"}
+    db.commit()
+    # Every expiry this run has held; a buffer acknowledges whichever it saw last
+    leases = {lease}
+
+    try:
+        buffers = _wait_for_buffers(db, leases)
+        if buffers:
+            return {"checked": 0, "repaired": 0, "skipped": f"vote buffers not write-through: {', '.join(buffers)}"}
+        checkpoint = _checkpoint(db)
+        if restart:
+            checkpoint.position = 0
+        db.commit()
+
+        while True:
+            rows = (
+                db.query(Article.id, Article.upvotes, Article.downvotes)
+                .filter(Article.id > checkpoint.position)
+                .order_by(Article.id.asc())
+                .limit(chunk_size)
+                .all()
+            )
+            if not rows:
+                break
+            lo, hi = rows[0].id, rows[-1].id
+            tallies = vote_tallies(db, Vote.article_id.between(lo, hi))
+            drifted = [r.id for r in rows if (r.upvotes, r.downvotes) != tallies.get(r.id, (0, 0))]
+            chunk_repaired = recount_from_votes(db, drifted) if drifted else 0
+            # Checked after the tally: a buffer registers before it takes its first vote, so
+            # one that started buffering since the wait shows up here
+            buffers = unquiesced_buffers(db, leases)
+            if buffers:
+                db.rollback()
+                return {
+                    "checked": checked,
+                    "repaired": repaired,
+                    "skipped": f"vote buffers not write-through: {', '.join(buffers)}",
+                }
+            lease = _take_lease(db, lease)
+            if not lease:
+                db.rollback()
+                return {"checked": checked, "repaired": repaired, "skipped": "lease lost to another run"}
+            leases.add(lease)
+            repaired += chunk_repaired
+            checked += len(rows)
+            checkpoint.position = hi
+            db.commit()
+            if pause_ms:
+                time.sleep(pause_ms / 1000)
+
+        # Finished a full pass: the next run starts from the beginning
+        checkpoint.position = 0
+        db.commit()
+    finally:
+        if repaired:
+            front_page.invalidate()
+        if lease:
+            _release_lease(db, lease)
+    return {"checked": checked, "repaired": repaired}
+
+
+def run_reconcile(restart: bool = False) -> dict[str, int | str]:
+    """Entry point for background tasks: owns its own session."""
+    db = JobSessionLocal()
+    try:
+        return reconcile_vote_counters(db, restart=restart)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repair article vote counters from the votes table")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--pause-ms", type=int, default=None)
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    args = parser.parse_args()
+    _db = JobSessionLocal()
+    try:
+        print(reconcile_vote_counters(_db, args.chunk_size, args.pause_ms, args.restart))
+    finally:
+        _db.close()
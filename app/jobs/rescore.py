@@ -0,0 +1,153 @@
+"""Bulk credibility re-scoring.
+
+Recomputes Article.credibility_score / credibility_tag / hot_score for
+every article from (upvotes, downvotes, avg_source_score, created_at)
+using the current Settings. Run it after changing credibility weights,
+thresholds or hot-ranking settings, or after source scores move. Rows are
+streamed in primary-key order, each chunk is scored with NumPy array
+operations, and only rows whose score or tag changed are written back
+with one executemany UPDATE per chunk.
+
+Run from the shell with `python -m app.jobs.rescore`, or via POST /admin/rescore
+(in the background).
+"""
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.credibility import HOT_EPOCH, wilson_lower_bound_lookup
+from app.core.database import JobSessionLocal
+from app.core.front_page import front_page
+from app.models.article import Article
+
+
+def compute_credibility_array(
+    upvotes: np.ndarray, downvotes: np.ndarray, source_scores: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized app.core.credibility.compute_credibility: returns (scores, tags)."""
+    settings = get_settings()
+    wilson = wilson_lower_bound_lookup(upvotes, downvotes)
+    scores = settings.credibility_wilson_weight * wilson + settings.credibility_source_weight * source_scores
+    tags = np.select(
+        [scores >= settings.credibility_confirmed_threshold, scores <= settings.credibility_rumor_threshold],
+        ["Confirmed", "Rumor"],
+        default="Pending",
+    )
+    return scores, tags
+
+
+def hot_score_array(
+    upvotes: np.ndarray, downvotes: np.ndarray, credibility_scores: np.ndarray, created_at: np.ndarray
+) -> np.ndarray:
+    """Vectorized app.core.credibility.hot_score; created_at is datetime64."""
+    settings = get_settings()
+    net = upvotes - downvotes
+    order = np.log10(np.maximum(np.abs(net), 1))
+    age = (created_at - np.datetime64(HOT_EPOCH)) / np.timedelta64(1, "s")
+    return (
+        np.sign(net) * order
+        + settings.hot_credibility_weight * credibility_scores
+        + age / settings.hot_decay_seconds
+    )
+
+
+# Core executemany statement: skips ORM bulk-update bookkeeping. It only matches rows whose
+# inputs are still the ones the score was computed from: a vote that lands in between has
+# already re-scored its article, and must not be overwritten with the stale value.
+_articles = Article.__table__
+_bulk_update = (
+    update(_articles)
+    .where(
+        _articles.c.id == bindparam("b_id"),
+        _articles.c.upvotes == bindparam("b_up"),
+        _articles.c.downvotes == bindparam("b_down"),
+        _articles.c.avg_source_score == bindparam("b_avg"),
+    )
+    .values(
+        credibility_score=bindparam("b_score"),
+        credibility_tag=bindparam("b_tag"),
+        hot_score=bindparam("b_hot"),
+        updated_at=bindparam("b_now"),
+    )
+)
+
+
+def rescore_articles(db: Session, chunk_size: int = 10_000) -> dict[str, int]:
+    """Re-score every article; returns how many were scanned and how many changed."""
+    scanned = changed = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(
+                Article.id,
+                Article.upvotes,
+                Article.downvotes,
+                Article.avg_source_score,
+                Article.credibility_score,
+                Article.credibility_tag,
+                Article.created_at,
+                Article.hot_score,
+            )
+            .filter(Article.id > last_id)
+            .order_by(Article.id.asc())
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            break
+        ids, ups, downs, src_scores, old_scores, old_tags, created, old_hot = (np.array(col) for col in zip(*rows))
+        ups, downs = ups.astype(np.int64), downs.astype(np.int64)
+        scores, tags = compute_credibility_array(ups, downs, src_scores.astype(np.float64))
+        hot = hot_score_array(ups, downs, scores, created.astype("datetime64[us]"))
+        dirty = (
+            ~np.isclose(scores, old_scores.astype(np.float64), rtol=0, atol=1e-12)
+            | (tags != old_tags)
+            | ~np.isclose(hot, old_hot.astype(np.float64), rtol=0, atol=1e-9)
+        )
+        if dirty.any():
+            now = datetime.utcnow()
+            # Rows whose counters or source score moved since the read above match nothing;
+            # rowcount (summed over the parameter sets) counts only the rows written
+            result = db.execute(
+                _bulk_update,
+                [
+                    {
+                        "b_id": int(i),
+                        "b_up": int(u),
+                        "b_down": int(d),
+                        "b_avg": float(a),
+                        "b_score": float(s),
+                        "b_tag": str(t),
+                        "b_hot": float(h),
+                        "b_now": now,
+                    }
+                    for i, u, d, a, s, t, h in zip(
+                        ids[dirty], ups[dirty], downs[dirty], src_scores[dirty], scores[dirty], tags[dirty], hot[dirty]
+                    )
+                ],
+            )
+            db.commit()
+            changed += result.rowcount
+        scanned += len(rows)
+        last_id = int(ids[-1])
+
+    if changed:
+        # Tags moved, so the per-tag snapshots no longer hold the right members
+        front_page.invalidate()
+    return {"scanned": scanned, "changed": changed}
+
+
+def run_rescore() -> dict[str, int]:
+    """Entry point for background tasks: owns its own session."""
+    db = JobSessionLocal()
+    try:
+        return rescore_articles(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print(run_rescore())
@@ -0,0 +1,76 @@
+from sqlalchemy import bindparam, func, select, update
+
+from app.core.credibility import compute_credibility, hot_score
+from app.core.database import JobSessionLocal
+from app.core.front_page import front_page
+from app.models.article import Article, ArticleSource
+from app.models.source import Source
+
+
+def avg_source_score_expr():
+    """Correlated subquery: mean source_score over an article's sources (0.5 when it has none)."""
+    avg = (
+        select(func.avg(Source.source_score))
+        .select_from(ArticleSource)
+        .join(Source, Source.id == ArticleSource.source_id)
+        .where(ArticleSource.article_id == Article.id)
+        .scalar_subquery()
+    )
+    return func.coalesce(avg, 0.5)
+
+
+_articles = Article.__table__
+_score_update = (
+    update(_articles)
+    .where(_articles.c.id == bindparam("b_id"))
+    .values(credibility_score=bindparam("b_score"), credibility_tag=bindparam("b_tag"), hot_score=bindparam("b_hot"))
+)
+
+
+def refresh_avg_source_scores(source_id: int, chunk_size: int = 1000) -> int:
+    """Recompute avg_source_score, and the credibility and hot score derived from it,
+    for every article citing source_id.
+
+    Meant to run as a background task after a source's score changes. Work
+    is done in article-id order, one committed transaction per chunk, so row
+    locks are held briefly even for sources with a large archive.
+    """
+    db = JobSessionLocal()
+    updated = 0
+    try:
+        last_id = 0
+        while True:
+            ids = [
+                row.article_id
+                for row in db.query(ArticleSource.article_id)
+                .filter(ArticleSource.source_id == source_id, ArticleSource.article_id > last_id)
+                .order_by(ArticleSource.article_id.asc())
+                .distinct()
+                .limit(chunk_size)
+            ]
+            if not ids:
+                break
+            # The UPDATE locks the chunk's rows, so the counters it returns can't move under
+            # a vote before the scores computed from them are written
+            rows = db.execute(
+                update(Article)
+                .where(Article.id.in_(ids))
+                .values(avg_source_score=avg_source_score_expr())
+                .returning(Article.id, Article.upvotes, Article.downvotes, Article.avg_source_score, Article.created_at)
+                .execution_options(synchronize_session=False)
+            ).all()
+            params = []
+            for row in rows:
+                score, tag = compute_credibility(row.upvotes, row.downvotes, row.avg_source_score)
+                hot = hot_score(row.upvotes, row.downvotes, score, row.created_at)
+                params.append({"b_id": row.id, "b_score": score, "b_tag": tag, "b_hot": hot})
+            if params:
+                db.execute(_score_update, params)
+            db.commit()
+            updated += len(ids)
+            last_id = ids[-1]
+    finally:
+        db.close()
+    if updated:
+        front_page.invalidate()
+    return updated
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, Float
+from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, Float, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 
@@ -7,6 +7,10 @@ from app.core.database import Base
 
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (
+        # sort=hot within a credibility tag
+        Index("ix_articles_credibility_tag_hot_score", "credibility_tag", "hot_score"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(500), index=True)
@@ -17,9 +21,18 @@ class Article(Base):
     dedup_group_id: Mapped[str | None] = mapped_column(String(64), index=True)
     upvotes: Mapped[int] = mapped_column(Integer, default=0)
     downvotes: Mapped[int] = mapped_column(Integer, default=0)
+    # Mean source_score of the article's sources, kept in sync so votes need no joins
+    avg_source_score: Mapped[float] = mapped_column(Float, default=0.5, server_default="0.5", nullable=False)
     credibility_score: Mapped[float] = mapped_column(Float, default=0.5)
     credibility_tag: Mapped[str] = mapped_column(String(20), default="Pending")
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    hot_score: Mapped[float] = mapped_column(Float, default=0.0, server_default="0", nullable=False, index=True)
+    # Counts already folded into the sources' vote totals by the source score job
+    learned_upvotes: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    learned_downvotes: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True, index=True
+    )
 
     # Relationships
     sources: Mapped[list["ArticleSource"]] = relationship("ArticleSource", back_populates="article", cascade="all, delete-orphan")
@@ -29,8 +42,8 @@ class ArticleSource(Base):
     __tablename__ = "article_sources"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    article_id: Mapped[int] = mapped_column(ForeignKey("articles.id", ondelete="CASCADE"))
-    source_id: Mapped[int] = mapped_column(ForeignKey("sources.id", ondelete="CASCADE"))
+    article_id: Mapped[int] = mapped_column(ForeignKey("articles.id", ondelete="CASCADE"), index=True)
+    source_id: Mapped[int] = mapped_column(ForeignKey("sources.id", ondelete="CASCADE"), index=True)
     url: Mapped[str] = mapped_column(String(1000))
 
     article: Mapped[Article] = relationship("Article", back_populates="sources")
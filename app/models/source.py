@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, DateTime, Float, Boolean
+from sqlalchemy import String, Integer, DateTime, Float, Boolean, false
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 
@@ -13,6 +13,11 @@ class Source(Base):
     rss_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     base_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     source_score: Mapped[float] = mapped_column(Float, default=0.5)
+    # Vote totals across the source's articles; source_score is learned from these
+    article_upvotes: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    article_downvotes: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Set by an admin: learning keeps the vote totals current but leaves source_score alone
+    source_score_pinned: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Integer, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 
@@ -9,6 +9,8 @@ class Vote(Base):
     __tablename__ = "votes"
     __table_args__ = (
         UniqueConstraint("user_id", "article_id", name="uq_user_article"),
+        # Per-article up/down aggregation is answered from the index alone
+        Index("ix_votes_article_id_is_upvote", "article_id", "is_upvote"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
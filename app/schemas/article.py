@@ -33,3 +33,25 @@ class ArticleOut(BaseModel):
         from_attributes = True
 
 
+class ArticleListOut(ArticleOut):
+    source_name: str
+    source_id: int | None
+
+
+def article_dict(article, source=None) -> dict:
+    """Plain-dict form of ArticleListOut, ready for FastJSONResponse or an event payload."""
+    return {
+        "id": article.id,
+        "title": article.title,
+        "canonical_url": article.canonical_url,
+        "content_snippet": article.content_snippet,
+        "thumbnail_url": article.thumbnail_url,
+        "published_at": article.published_at,
+        "upvotes": article.upvotes,
+        "downvotes": article.downvotes,
+        "credibility_score": article.credibility_score,
+        "credibility_tag": article.credibility_tag,
+        "created_at": article.created_at,
+        "source_name": source.name if source else "Unknown",
+        "source_id": source.id if source else None,
+    }
@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, field_validator
 
 
 class SourceIn(BaseModel):
@@ -9,12 +9,31 @@ class SourceIn(BaseModel):
     source_score: float = 0.5
 
 
+class SourceUpdate(BaseModel):
+    name: str | None = None
+    rss_url: HttpUrl | None = None
+    base_url: HttpUrl | None = None
+    source_score: float | None = None
+    # Setting source_score pins it against learning; false hands it back to the learning job
+    source_score_pinned: bool | None = None
+    is_active: bool | None = None
+
+    # None means "leave unchanged" by omission only; these columns can't be set to null
+    @field_validator("name", "source_score", "source_score_pinned", "is_active")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
 class SourceOut(BaseModel):
     id: int
     name: str
     rss_url: str | None
     base_url: str | None
     source_score: float
+    source_score_pinned: bool
     created_at: datetime
 
     class Config:
@@ -0,0 +1,45 @@
+"""pytest plugin that fails a test when an endpoint goes over its SQL budget.
+
+Enable it with `pytest -p app.testing.query_budget`, or with
+`pytest_plugins = ["app.testing.query_budget"]` in a conftest. The app under
+test must be built with trace_app() (create_app() does unless
+query_trace_enabled is off).
+
+    def test_feed(client, query_budget):
+        with query_budget():                # each request within its ROUTE_BUDGETS entry
+            client.get("/articles")
+        with query_budget(statements=3):    # or one limit for every request in the block
+            client.post("/vote", json=vote, headers=auth)
+
+The failure message is the tracer's report: totals, the most repeated
+statements and where the statement over the limit was issued. Time in SQL
+is only checked when ms is given, since it varies between machines.
+"""
+import contextlib
+
+import pytest
+
+from app.core import query_budget as tracer
+
+
+@pytest.fixture
+def query_budget():
+    @contextlib.contextmanager
+    def check(statements: int | None = None, ms: float = 0):
+        traces: list[tracer.QueryTrace] = []
+        tracer.observers.append(traces.append)
+        try:
+            yield traces
+        finally:
+            tracer.observers.remove(traces.append)
+        if not traces:
+            pytest.fail("no requests were traced; is the app built with trace_app()?")
+        failures = []
+        for trace in traces:
+            limit = trace.limit if statements is None else statements
+            if trace.over_budget(limit, ms):
+                failures.append(trace.report(limit, ms))
+        if failures:
+            pytest.fail("Query budget exceeded:\n" + "\n".join(failures), pytrace=False)
+
+    return check
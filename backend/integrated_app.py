@@ -11,15 +11,22 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 # Import news functionality
-from newsite.app.core.database import Base, engine, get_db
+from newsite.app.core.database import get_db
 from newsite.app.api.auth import router as auth_router
 from newsite.app.api.articles import router as articles_router
 from newsite.app.api.sources import router as sources_router
 from newsite.app.api.votes import router as votes_router
 from newsite.app.api.admin import router as admin_router
 from newsite.app.api.comments import router as comments_router
+from newsite.app.api.metrics import router as metrics_router
 from newsite.app.core.config import get_settings
-from newsite.app.models.source import Source
+from newsite.app.core.serialization import FastJSONResponse
+from newsite.app.core.metrics import instrument_app
+from newsite.app.core.profiler import ProfilerMiddleware
+from newsite.app.core.query_budget import trace_app
+from newsite.app.core.startup import ReadinessGateMiddleware, install_bootstrap
+from newsite.app.core.vote_buffer import vote_buffer
+from newsite.app.jobs.bootstrap import run_bootstrap
 
 # Import stats functionality
 from wrestling_api import WrestlingAPI
@@ -50,8 +57,31 @@ def create_integrated_app() -> FastAPI:
             allow_headers=["*"],
         )
 
-    # Create tables for dev/test
-    Base.metadata.create_all(bind=engine)
+    # News schema migrations and source seeding run after startup, as in app.main;
+    # every route but /health answers 503 until they finish
+    app.state.ready = threading.Event()
+    app.add_middleware(ReadinessGateMiddleware, ready=app.state.ready, exempt=("/health",))
+
+    def _bootstrap():
+        if settings.startup_bootstrap != "off":
+            run_bootstrap()
+        # The vote buffer flushes and heartbeats on its own thread; votes move the
+        # counters directly until it is running
+        if settings.vote_buffer_enabled:
+            vote_buffer.start()
+
+    install_bootstrap(app, _bootstrap, app.state.ready)
+
+    if settings.vote_buffer_enabled:
+        @app.on_event("shutdown")
+        def _stop_vote_buffer():
+            vote_buffer.stop()
+
+    # Request/query metrics at /metrics, covering the news and stats routes alike
+    instrument_app(app)
+    trace_app(app)
+    app.add_middleware(ProfilerMiddleware)
+    app.include_router(metrics_router)
 
     # Initialize wrestling stats API
     wrestling_api = WrestlingAPI()
@@ -70,14 +100,16 @@ def create_integrated_app() -> FastAPI:
     # Health check
     @app.get("/health")
     def health():
+        if not app.state.ready.is_set():
+            return JSONResponse({"status": "starting", "service": "Ultimate Wrestling Platform"}, status_code=503)
         return {"status": "ok", "service": "Ultimate Wrestling Platform"}
 
     # Mount static files
     app.mount("/static", StaticFiles(directory="static"), name="static")
 
-    # Seed sources for news (non-prod only)
+    # News poller (non-prod only); sources are seeded by the bootstrap
     if settings.environment != "prod":
-        seed_news_sources(app)
+        start_news_poller(app)
 
     return app
 
@@ -85,7 +117,7 @@ def create_stats_router(wrestling_api: WrestlingAPI):
     """Create router for wrestling statistics endpoints"""
     from fastapi import APIRouter
     
-    router = APIRouter(tags=["wrestling-stats"])
+    router = APIRouter(tags=["wrestling-stats"], default_response_class=FastJSONResponse)
     
     @router.get("/wrestlers")
     def get_all_wrestlers():
@@ -153,69 +185,21 @@ def create_stats_router(wrestling_api: WrestlingAPI):
 
     return router
 
-def seed_news_sources(app: FastAPI):
-    """Seed news sources for development"""
+def start_news_poller(app: FastAPI):
+    """Poll news feeds in-process for dev/test, once the bootstrap has finished"""
     from sqlalchemy.orm import Session
-    from newsite.app.core.database import SessionLocal
-
-    seed_items = [
-        # Tier 1 core
-        {"name": "PWInsider", "rss_url": "http://www.pwinsider.com/rss.php", "base_url": "https://www.pwinsider.com"},
-        {"name": "Wrestling Observer", "rss_url": "https://www.f4wonline.com/rss.xml", "base_url": "https://www.f4wonline.com"},
-        {"name": "Pro Wrestling Torch", "rss_url": "https://www.pwtorch.com/feed", "base_url": "https://www.pwtorch.com"},
-        {"name": "Fightful", "rss_url": "https://www.fightful.com/rss.xml", "base_url": "https://www.fightful.com"},
-        {"name": "SEScoops", "rss_url": "https://www.sescoops.com/feed", "base_url": "https://www.sescoops.com"},
-        {"name": "WrestleZone", "rss_url": "https://www.wrestlezone.com/feed", "base_url": "https://www.wrestlezone.com"},
-        {"name": "411Mania Wrestling", "rss_url": "https://411mania.com/wrestling/feed/", "base_url": "https://411mania.com/wrestling/"},
-        {"name": "Ringside News", "rss_url": "https://www.ringsidenews.com/feed/", "base_url": "https://www.ringsidenews.com"},
-        {"name": "Cageside Seats", "rss_url": "https://www.cagesideseats.com/rss/index.xml", "base_url": "https://www.cagesideseats.com"},
-
-        # Tier 2 official promotions
-        {"name": "WWE", "rss_url": None, "base_url": "https://www.wwe.com/news"},
-        {"name": "AEW", "rss_url": None, "base_url": "https://www.allelitewrestling.com/aew-news"},
-        {"name": "TNA Wrestling", "rss_url": "https://tnawrestling.com/news/feed/", "base_url": "https://tnawrestling.com/news/"},
-        {"name": "NJPW", "rss_url": "https://www.njpw1972.com/feed", "base_url": "https://www.njpw1972.com"},
-        {"name": "Ring of Honor", "rss_url": "https://www.rohwrestling.com/news/feed", "base_url": "https://www.rohwrestling.com/news"},
-
-        # Tier 3 mainstream sports
-        {"name": "ESPN WWE", "rss_url": "https://www.espn.com/espn/rss/wwe/news", "base_url": "https://www.espn.com/wwe/"},
-        {"name": "CBS Sports WWE", "rss_url": "https://www.cbssports.com/rss/headlines/wwe/", "base_url": "https://www.cbssports.com/wwe/"},
-    ]
-    
-    db: Session = SessionLocal()
-    try:
-        for s in seed_items:
-            try:
-                exists = db.query(Source).filter(Source.name == s["name"]).first()
-                if not exists:
-                    db.add(Source(name=s["name"], rss_url=s["rss_url"], base_url=s["base_url"], source_score=0.5))
-                    db.commit()
-            except Exception:
-                db.rollback()
-                continue
-        
-        # Disable broken sources
-        broken_sources = ["WWE", "AEW", "Fightful"]
-        for source_name in broken_sources:
-            try:
-                source = db.query(Source).filter(Source.name == source_name).first()
-                if source and source.is_active:
-                    source.is_active = False
-                    db.commit()
-                    print(f"DISABLED broken source: {source_name}")
-            except Exception:
-                db.rollback()
-                continue
-    finally:
-        db.close()
 
     # Start news poller for dev/test
     def _poller(stop_event: threading.Event):
+        # Not before the schema exists
+        while not app.state.ready.wait(1):
+            if stop_event.is_set():
+                return
         while not stop_event.is_set():
             try:
-                from newsite.app.core.database import SessionLocal as _SessionLocal
+                from newsite.app.core.database import WriteSessionLocal as _WriteSessionLocal
                 from newsite.app.ingest.ingest import ingest_once as _ingest_once
-                _db: Session = _SessionLocal()
+                _db: Session = _WriteSessionLocal()
                 try:
                     _ingest_once(_db)
                 finally:
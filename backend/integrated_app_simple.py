@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional, Dict, Any
 
 # Import stats functionality
@@ -38,7 +39,7 @@ def create_stats_router(wrestling_api: WrestlingAPI):
     """Create router for wrestling statistics endpoints"""
     from fastapi import APIRouter
     
-    router = APIRouter(tags=["wrestling-stats"])
+    router = APIRouter(tags=["wrestling-stats"], default_response_class=ORJSONResponse)
     
     @router.get("/wrestlers")
     def get_all_wrestlers():
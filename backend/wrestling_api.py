@@ -10,7 +10,8 @@ CORS(app)
 
 class WrestlingAPI:
     def __init__(self):
-        self.database_file = 'wrestling_database_accurate_final_v2_20250815_023309.json'
+        # WRESTLER_DATABASE_FILE points at another export, e.g. a generated one for load tests
+        self.database_file = os.environ.get('WRESTLER_DATABASE_FILE', 'wrestling_database_accurate_final_v2_20250815_023309.json')
         self.data = self.load_database()
     
     def load_database(self):
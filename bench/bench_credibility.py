@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Wilson lower-bound lookup table vs the closed-form formula.
+
+Each workload runs twice, first with APP_CREDIBILITY_WILSON_TABLE_SIZE=0
+(formula only, the old behaviour) and then with the configured table size.
+
+  score   compute_credibility over vote counts drawn like a real archive
+          (most articles under a few hundred votes, a long tail above)
+  vote    the cast_vote counter path: apply_counter_delta + commit
+  ingest  the ingest insert path: add, flush, score, commit per batch
+  rescore rescore_articles over the articles created by `ingest`
+
+The database workloads use a throwaway SQLite file, so their numbers show
+how much of a vote or insert is scoring at all, not just the micro gain.
+
+Usage: python bench/bench_credibility.py [--articles 5000] [--votes 5000] [--table-size 256]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_tmp = tempfile.mkdtemp(prefix="bench_cred_")
+os.environ.setdefault("APP_DATABASE_URL", f"sqlite:///{_tmp}/bench.db")
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import get_settings
+from app.core.credibility import compute_credibility, hot_score
+from app.core.database import SessionLocal, engine
+from app.core.migrations import run_migrations
+from app.core.vote_counters import apply_counter_delta
+from app.jobs.rescore import rescore_articles
+from app.models.article import Article
+
+
+def vote_counts(n: int, seed: int) -> list[tuple[int, int]]:
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(n):
+        total = int(rng.paretovariate(1.2) * 5) - 5
+        up = rng.randint(0, total) if total > 0 else 0
+        pairs.append((up, max(total - up, 0)))
+    return pairs
+
+
+def bench_score(pairs: list[tuple[int, int]]) -> float:
+    start = time.perf_counter()
+    for _ in range(20):
+        for up, down in pairs:
+            compute_credibility(up, down, 0.5)
+    return 20 * len(pairs) / (time.perf_counter() - start)
+
+
+def bench_ingest(n: int, tag: str) -> float:
+    db = SessionLocal()
+    start = time.perf_counter()
+    for i in range(n):
+        article = Article(title=f"Story {i}", canonical_url=f"https://example.com/{tag}/{i}")
+        db.add(article)
+        db.flush()
+        score, cred_tag = compute_credibility(0, 0, 0.5)
+        article.credibility_score = score
+        article.credibility_tag = cred_tag
+        article.hot_score = hot_score(0, 0, score, article.created_at)
+        if i % 100 == 99:
+            db.commit()
+    db.commit()
+    db.close()
+    return n / (time.perf_counter() - start)
+
+
+def bench_votes(pairs: list[tuple[int, int]], article_ids: list[int]) -> float:
+    db = SessionLocal()
+    start = time.perf_counter()
+    for (up, down), article_id in zip(pairs, article_ids):
+        apply_counter_delta(db, article_id, 1 if up >= down else 0, 0 if up >= down else 1)
+        db.commit()
+    db.close()
+    return len(pairs) / (time.perf_counter() - start)
+
+
+def bench_rescore() -> float:
+    db = SessionLocal()
+    start = time.perf_counter()
+    scanned = rescore_articles(db)["scanned"]
+    db.close()
+    return scanned / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--votes", type=int, default=5000)
+    parser.add_argument("--table-size", type=int, default=get_settings().credibility_wilson_table_size)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    settings = get_settings()
+    pairs = vote_counts(args.votes, args.seed)
+    rng = random.Random(args.seed)
+
+    results = {}
+    for label, size in (("formula", 0), ("table", args.table_size)):
+        settings.credibility_wilson_table_size = size
+        compute_credibility(0, 0, 0.5)  # build the table outside the timings
+        ingest = bench_ingest(args.articles, label)
+        db = SessionLocal()
+        ids = [row.id for row in db.query(Article.id)]
+        db.close()
+        results[label] = {
+            "score": bench_score(pairs),
+            "ingest": ingest,
+            "vote": bench_votes(pairs, [rng.choice(ids) for _ in pairs]),
+            "rescore": bench_rescore(),
+        }
+
+    print(f"{'workload':>8} {'formula/s':>12} {'table/s':>12} {'speedup':>8}")
+    for workload in ("score", "ingest", "vote", "rescore"):
+        before, after = results["formula"][workload], results["table"][workload]
+        print(f"{workload:>8} {before:12.0f} {after:12.0f} {after / before:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Login storm benchmark: login throughput, and how other endpoints fare meanwhile.
+
+Starts the app in-process (uvicorn, temporary SQLite file) and runs two
+phases of --seconds each:
+
+  quiet  only the probe clients, which loop on GET /articles and /healthz
+  storm  the same probes while POST /auth/login attempts arrive at --rate
+         per second, independently of whether earlier ones finished
+
+It reports the probes' p50/p99 in each phase, and for the storm the
+successful logins per second, login latency and the outcome counts.
+Before the dedicated hashing pool, a storm filled FastAPI's shared
+threadpool with bcrypt calls and probe p99 grew with it; with the pool,
+probe latency should barely move, and once the queue is full excess
+logins are rejected with 429 instead of waiting ever longer. Use
+--max-pending to see the effect of the queue limit (a large value
+approximates an unbounded queue). The client shares the process, so on
+a machine with few cores its own work shows up in probe latency too.
+
+Usage: python bench/bench_login.py [--seconds 10] [--rate 20] [--workers 2] [--max-pending 16]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rate", type=float, default=20, help="login attempts per second during the storm")
+    parser.add_argument("--probes", type=int, default=4, help="concurrent probe clients")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="APP_PASSWORD_HASH_WORKERS")
+    parser.add_argument("--max-pending", type=int, default=None, help="APP_PASSWORD_HASH_MAX_PENDING")
+    parser.add_argument("--rounds", type=int, default=None, help="APP_PASSWORD_BCRYPT_ROUNDS")
+    parser.add_argument("--port", type=int, default=8798)
+    return parser.parse_args()
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    args = parse_args()
+    tmpdir = tempfile.TemporaryDirectory()
+    # Configure before the app modules read their settings
+    os.environ["APP_DATABASE_URL"] = f"sqlite:///{tmpdir.name}/bench_login.db"
+    os.environ.setdefault("APP_ENVIRONMENT", "test")
+    for flag, var in (
+        (args.workers, "APP_PASSWORD_HASH_WORKERS"),
+        (args.max_pending, "APP_PASSWORD_HASH_MAX_PENDING"),
+        (args.rounds, "APP_PASSWORD_BCRYPT_ROUNDS"),
+    ):
+        if flag is not None:
+            os.environ[var] = str(flag)
+
+    import httpx
+    import uvicorn
+
+    from app.core.config import get_settings
+    from app.core.database import SessionLocal
+    from app.core.security import get_password_hash
+    from app.jobs.bootstrap import run_bootstrap
+    from app.main import app
+    from app.models.source import Source
+    from app.models.user import User
+
+    settings = get_settings()
+    run_bootstrap()
+    db = SessionLocal()
+    # Keep the dev poller's RSS fetches out of the measurements
+    db.query(Source).update({Source.is_active: False})
+    password_hash = get_password_hash("bench-login")
+    db.add_all(User(email=f"login{i}@example.com", password_hash=password_hash) for i in range(args.users))
+    db.commit()
+    db.close()
+
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning"))
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    async def probe(client: httpx.AsyncClient, stop: float, latencies: list[float]):
+        paths = ("/articles?limit=20", "/healthz")
+        i = 0
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            await client.get(paths[i % 2])
+            latencies.append(time.perf_counter() - started)
+            i += 1
+
+    async def log_in(client: httpx.AsyncClient, n: int, outcomes: dict[str, int], waits: list[float]):
+        started = time.perf_counter()
+        try:
+            r = await client.post(
+                "/auth/login", data={"username": f"login{n % args.users}@example.com", "password": "bench-login"}
+            )
+            key = "ok" if r.status_code == 200 else str(r.status_code)
+        except httpx.HTTPError as e:
+            key = type(e).__name__
+        outcomes[key] = outcomes.get(key, 0) + 1
+        if key == "ok":
+            waits.append(time.perf_counter() - started)
+
+    async def login_storm(client: httpx.AsyncClient, stop: float, outcomes: dict[str, int], waits: list[float]):
+        # Open loop: attempts keep arriving at --rate whether or not earlier ones finished
+        attempts = []
+        n = 0
+        while time.perf_counter() < stop:
+            attempts.append(asyncio.create_task(log_in(client, n, outcomes, waits)))
+            n += 1
+            await asyncio.sleep(1 / args.rate)
+        await asyncio.gather(*attempts)
+
+    async def phase(with_storm: bool):
+        latencies: list[float] = []
+        outcomes: dict[str, int] = {}
+        waits: list[float] = []
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120) as client:
+            stop = time.perf_counter() + args.seconds
+            tasks = [probe(client, stop, latencies) for _ in range(args.probes)]
+            if with_storm:
+                tasks.append(login_storm(client, stop, outcomes, waits))
+            started = time.perf_counter()
+            await asyncio.gather(*tasks)
+            # Includes draining logins still queued at the deadline
+            elapsed = time.perf_counter() - started
+        return latencies, outcomes, waits, elapsed
+
+    print(
+        f"bcrypt rounds={settings.password_bcrypt_rounds} hash workers={settings.password_hash_workers} "
+        f"max pending={settings.password_hash_max_pending} login rate={args.rate:g}/s"
+    )
+    for name, storm in (("quiet", False), ("storm", True)):
+        latencies, outcomes, waits, elapsed = asyncio.run(phase(storm))
+        line = (
+            f"{name:>5}: probes p50={statistics.median(latencies) * 1000:7.1f}ms "
+            f"p99={percentile(latencies, 0.99) * 1000:7.1f}ms ({len(latencies)} reqs)"
+        )
+        if storm:
+            line += (
+                f"\n       logins {outcomes.get('ok', 0) / elapsed:.1f}/s over {elapsed:.1f}s, "
+                f"p50={percentile(waits, 0.5) * 1000:.0f}ms p99={percentile(waits, 0.99) * 1000:.0f}ms, "
+                f"outcomes {outcomes}"
+            )
+        print(line)
+
+    server.should_exit = True
+    server_thread.join(timeout=10)
+    tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: stock FastAPI serialization vs the FastJSONResponse path.
+
+The stock path is what a route returning list[dict] gets: jsonable_encoder
+followed by JSONResponse's stdlib json.dumps. The fast path hands the same
+dicts to FastJSONResponse (orjson).
+
+Usage: python bench/bench_serialization.py [--items 100] [--rounds 2000]
+"""
+import argparse
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.serialization import FastJSONResponse
+
+
+def make_payload(items: int) -> list[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "id": i,
+            "title": f"Breaking: championship match announced for event #{i}",
+            "canonical_url": f"https://www.example.com/news/{i}",
+            "content_snippet": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3,
+            "thumbnail_url": f"https://cdn.example.com/img/{i}.jpg",
+            "published_at": now - timedelta(minutes=i),
+            "upvotes": i * 3,
+            "downvotes": i,
+            "credibility_score": 0.42 + i / 1000,
+            "credibility_tag": "Pending",
+            "created_at": now - timedelta(minutes=i),
+            "source_name": "PWInsider",
+            "source_id": 1,
+        }
+        for i in range(items)
+    ]
+
+
+def stock_path(payload: list[dict]) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def fast_path(payload: list[dict]) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    payload = make_payload(args.items)
+    results = {}
+    for name, fn in (("stock", stock_path), ("fast", fast_path)):
+        best = min(timeit.repeat(lambda: fn(payload), number=args.rounds, repeat=5))
+        results[name] = best / args.rounds * 1e6
+        print(f"{name:>6}: {results[name]:9.1f} µs per response ({args.items} items)")
+    print(f"speedup: {results['stock'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
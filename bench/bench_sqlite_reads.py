@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent read throughput on SQLite while ingest is writing.
+
+Seeds a temporary database, then for --seconds runs one ingest-like writer
+(batches of articles through WriteSessionLocal, flushed one by one and
+committed per batch, as ingest_once does per source) alongside --readers
+processes issuing the front-page query through SessionLocal. Readers are
+separate processes, like uvicorn workers, so they contend on SQLite's
+locks rather than on the GIL.
+
+Each profile runs in a fresh child process, because the engines are
+configured at import:
+
+  default  SQLite's rollback journal (only busy_timeout applied)
+  tuned    WAL, synchronous=NORMAL, mmap, larger cache, in-memory temp store
+
+Usage: python bench/bench_sqlite_reads.py [--seconds 10] [--readers 8] [--seed-articles 5000] [--batch 50]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seed-articles", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=50, help="articles per ingest commit")
+    parser.add_argument("--profile", choices=("default", "tuned"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_profile(args) -> dict:
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ["APP_DATABASE_URL"] = f"sqlite:///{tmpdir.name}/bench.db"
+    os.environ["APP_ENVIRONMENT"] = "test"
+    os.environ["APP_SQLITE_PROFILE"] = args.profile
+    sys.path.insert(0, str(ROOT))
+
+    from sqlalchemy.exc import OperationalError
+
+    from app.core.database import SessionLocal, WriteSessionLocal, engine
+    from app.core.front_page import hydrate
+    from app.core.migrations import run_migrations
+    from app.models.article import Article, ArticleSource
+    from app.models.source import Source
+
+    run_migrations(engine)
+    db = WriteSessionLocal()
+    source = Source(name="Bench", rss_url="https://example.com/rss", source_score=0.5)
+    db.add(source)
+    db.flush()
+    for i in range(args.seed_articles):
+        article = Article(title=f"Seed {i}", canonical_url=f"https://example.com/seed/{i}", dedup_group_id=f"seed{i}")
+        db.add(article)
+        db.flush()
+        db.add(ArticleSource(article_id=article.id, source_id=source.id, url=article.canonical_url))
+    db.commit()
+    source_id = source.id
+    db.close()
+
+    stop = time.perf_counter() + args.seconds
+    errors = {"read": 0, "write": 0}
+    written = [0]
+
+    def ingest():
+        n = 0
+        while time.perf_counter() < stop:
+            db = WriteSessionLocal()
+            try:
+                for _ in range(args.batch):
+                    url = f"https://example.com/new/{n}"
+                    article = Article(title=f"New {n}", canonical_url=url, dedup_group_id=f"new{n}")
+                    db.add(article)
+                    db.flush()
+                    db.add(ArticleSource(article_id=article.id, source_id=source_id, url=url))
+                    n += 1
+                db.commit()
+                written[0] += args.batch
+            except OperationalError:
+                db.rollback()
+                errors["write"] += 1
+            finally:
+                db.close()
+
+    def read(results):
+        # Forked: drop the parent's pooled connections without closing them
+        engine.dispose(close=False)
+        latencies = []
+        failed = 0
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            db = SessionLocal()
+            try:
+                ids = [row.id for row in db.query(Article.id).order_by(Article.created_at.desc()).limit(50)]
+                hydrate(db, ids)
+                latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                failed += 1
+            finally:
+                db.close()
+        results.put((latencies, failed))
+
+    results = multiprocessing.get_context("fork").Queue()
+    readers = [multiprocessing.get_context("fork").Process(target=read, args=(results,)) for _ in range(args.readers)]
+    for p in readers:
+        p.start()
+    writer = threading.Thread(target=ingest)
+    writer.start()
+    read_latencies: list[float] = []
+    for _ in readers:
+        latencies, failed = results.get()
+        read_latencies.extend(latencies)
+        errors["read"] += failed
+    for p in readers:
+        p.join()
+    writer.join()
+    tmpdir.cleanup()
+    return {
+        "profile": args.profile,
+        "reads_per_s": len(read_latencies) / args.seconds,
+        "read_p50_ms": percentile(read_latencies, 0.5) * 1000,
+        "read_p99_ms": percentile(read_latencies, 0.99) * 1000,
+        "writes_per_s": written[0] / args.seconds,
+        "read_errors": errors["read"],
+        "write_errors": errors["write"],
+    }
+
+
+def main():
+    args = parse_args()
+    if args.profile:
+        print(json.dumps(run_profile(args)))
+        return
+
+    print(f"{'profile':>8} {'reads/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'writes/s':>9} {'errors r/w':>11}")
+    for profile in ("default", "tuned"):
+        out = subprocess.run(
+            [sys.executable, __file__, *sys.argv[1:], "--profile", profile],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(
+            f"{profile:>8} {r['reads_per_s']:9.0f} {r['read_p50_ms']:8.1f} {r['read_p99_ms']:8.1f} "
+            f"{r['writes_per_s']:9.0f} {r['read_errors']:>5}/{r['write_errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Cold-start report: what `import app.main` spends its time on, and how long a
+uvicorn worker takes to answer.
+
+Import profile: runs `python -X importtime -c "import app.main"` in a fresh
+interpreter and prints the --top imports by cumulative time (each module's
+time includes the modules it pulled in first), followed by the top
+first-party modules by self time.
+
+Boot: starts `uvicorn app.main:app` --runs times on a copy of the database
+and reports the median time until
+
+  serving  the port answers (/healthz 503 while bootstrap runs)
+  ready    /healthz returns 200: migrations checked and sources seeded
+
+Pass --app-dir to profile another checkout, e.g. a `git worktree` of an
+older revision, and --database to start from an existing SQLite file
+(default: a new empty one, so "ready" includes creating the schema).
+
+Usage: python bench/boot_profile.py [--top 25] [--runs 5] [--app-dir .] [--database dev.db]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=str(ROOT))
+    parser.add_argument("--database", default=None, help="SQLite file to copy for each run")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8793)
+    return parser.parse_args()
+
+
+def app_env(tmpdir: str, database: str | None, run: int) -> dict:
+    path = Path(tmpdir) / f"boot{run}.db"
+    if database:
+        shutil.copy(database, path)
+    return {**os.environ, "APP_DATABASE_URL": f"sqlite:///{path}", "APP_ENVIRONMENT": "test"}
+
+
+def import_profile(args, env: dict) -> list[tuple[int, int, int, str]]:
+    """(self_us, cumulative_us, depth, module) for every import, in the order reported."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=args.app_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def boot_once(args, env: dict) -> tuple[float, float]:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=args.app_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    serving = None
+    try:
+        while True:
+            try:
+                status = httpx.get(f"http://127.0.0.1:{args.port}/healthz").status_code
+                serving = serving or time.perf_counter() - started
+                if status == 200:
+                    return serving, time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() - started > 60:
+                raise SystemExit("server did not become ready")
+            time.sleep(0.01)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def main():
+    args = parse_args()
+    tmpdir = tempfile.TemporaryDirectory()
+
+    rows = import_profile(args, app_env(tmpdir.name, args.database, 0))
+    total = next(cumulative for _, cumulative, _, name in rows if name == "app.main")
+    print(f"import app.main: {total / 1000:.0f}ms  ({args.app_dir})")
+    print(f"\n{'cumul ms':>9} {'self ms':>8}  module (top {args.top} by cumulative time)")
+    for self_us, cumulative_us, depth, name in sorted(rows, key=lambda r: -r[1])[: args.top]:
+        print(f"{cumulative_us / 1000:9.1f} {self_us / 1000:8.1f}  {'  ' * depth}{name}")
+    print(f"\n{'self ms':>9}  first-party module (top {args.top // 2} by self time)")
+    first_party = [r for r in rows if r[3] == "app" or r[3].startswith("app.")]
+    for self_us, _, _, name in sorted(first_party, key=lambda r: -r[0])[: args.top // 2]:
+        print(f"{self_us / 1000:9.1f}  {name}")
+
+    serving, ready = [], []
+    for run in range(1, args.runs + 1):
+        s, r = boot_once(args, app_env(tmpdir.name, args.database, run))
+        serving.append(s)
+        ready.append(r)
+    print(
+        f"\nuvicorn boot over {args.runs} runs (median): "
+        f"serving {statistics.median(serving) * 1000:.0f}ms, ready {statistics.median(ready) * 1000:.0f}ms"
+    )
+    tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
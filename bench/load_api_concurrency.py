@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Concurrency sweep for the hot API routes: article list/detail, comments, votes.
+
+Starts `uvicorn app.main:app` as a subprocess from --app-dir (default: this
+checkout) on a fresh temporary SQLite file, seeds it over HTTP, then for
+each --levels value holds that many concurrent client connections for
+--seconds, every client looping through a read-heavy mix:
+
+  GET /articles (60%)  GET /articles/{id} (15%)  GET comments (15%)  POST /vote (10%)
+
+For each level it prints throughput, p50/p99 latency and the error rate.
+"capacity" is the highest level whose p99 stayed under --slo-ms with under
+1% errors.
+
+To compare the threaded routes with the async ones, check out the older
+revision next to this one and point --app-dir at it:
+
+  git worktree add /tmp/threaded <rev>
+  python bench/load_api_concurrency.py --app-dir /tmp/threaded
+  python bench/load_api_concurrency.py
+
+Usage: python bench/load_api_concurrency.py [--levels 25,100,250,500] [--seconds 10] [--slo-ms 500]
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=str(ROOT), help="checkout whose app.main:app is served")
+    parser.add_argument("--levels", default="25,100,250,500", help="comma-separated concurrent connections")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--slo-ms", type=float, default=500)
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--seed", type=int, default=3)
+    return parser.parse_args()
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def seed(client: httpx.AsyncClient, args) -> tuple[list[int], list[str]]:
+    tokens = []
+    for i in range(args.users):
+        creds = {"username": f"load{i}@example.com", "password": "load-test"}
+        await client.post("/auth/register", json={"email": creds["username"], "password": creds["password"]})
+        if i == 0:
+            await client.post("/auth/promote_self", data=creds)
+        r = await client.post("/auth/login", data=creds)
+        tokens.append(r.json()["access_token"])
+    admin = {"Authorization": f"Bearer {tokens[0]}"}
+    ids = []
+    for i in range(args.articles):
+        r = await client.post(
+            "/articles",
+            headers=admin,
+            json={"title": f"Load article {i}", "canonical_url": f"https://example.com/load/{i}", "sources": []},
+        )
+        ids.append(r.json()["id"])
+        if i % 4 == 0:
+            await client.post(f"/articles/{ids[-1]}/comments", headers=admin, json={"body": f"Comment on {i}"})
+    return ids, tokens
+
+
+async def run_level(args, level: int, ids: list[int], tokens: list[str]) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    rng = random.Random(args.seed + level)
+    limits = httpx.Limits(max_connections=level, max_keepalive_connections=level)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30) as client:
+        stop = time.perf_counter() + args.seconds
+
+        async def worker(n: int):
+            nonlocal errors
+            headers = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"}
+            while time.perf_counter() < stop:
+                roll = rng.random()
+                article_id = rng.choice(ids)
+                started = time.perf_counter()
+                try:
+                    if roll < 0.60:
+                        r = await client.get("/articles", params={"limit": 20})
+                    elif roll < 0.75:
+                        r = await client.get(f"/articles/{article_id}")
+                    elif roll < 0.90:
+                        r = await client.get(f"/articles/{article_id}/comments")
+                    else:
+                        direction = rng.choice(("up", "down", "clear"))
+                        r = await client.post(
+                            "/vote", headers=headers, json={"article_id": article_id, "direction": direction}
+                        )
+                    ok = r.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                errors += not ok
+
+        await asyncio.gather(*(worker(n) for n in range(level)))
+    total = len(latencies)
+    return {
+        "level": level,
+        "rps": total / args.seconds,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "error_rate": errors / total if total else 1.0,
+    }
+
+
+def main():
+    args = parse_args()
+    levels = [int(x) for x in args.levels.split(",")]
+    try:
+        httpx.get(f"http://127.0.0.1:{args.port}/healthz")
+        raise SystemExit(f"port {args.port} is already serving; stop that server or pass --port")
+    except httpx.HTTPError:
+        pass
+    tmpdir = tempfile.TemporaryDirectory()
+    env = {
+        **os.environ,
+        "APP_DATABASE_URL": f"sqlite:///{tmpdir.name}/load.db",
+        "APP_ENVIRONMENT": "test",
+        # Cheap hashes so seeding users doesn't dominate
+        "APP_PASSWORD_BCRYPT_ROUNDS": "4",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=args.app_dir,
+        env=env,
+        # Pool timeouts and the like surface as 5xx in the error column
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{args.port}/healthz").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.time() > deadline:
+                raise SystemExit("server did not start")
+            time.sleep(0.2)
+
+        async def seed_all():
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60) as client:
+                return await seed(client, args)
+
+        ids, tokens = asyncio.run(seed_all())
+        print(f"app: {args.app_dir}")
+        print(f"{'conns':>6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>9} {'errors':>7}")
+        capacity = 0
+        for level in levels:
+            r = asyncio.run(run_level(args, level, ids, tokens))
+            print(f"{r['level']:>6} {r['rps']:8.0f} {r['p50_ms']:8.1f} {r['p99_ms']:9.1f} {r['error_rate']:7.1%}")
+            if r["p99_ms"] <= args.slo_ms and r["error_rate"] < 0.01:
+                capacity = level
+        print(f"capacity (p99 <= {args.slo_ms:g}ms, <1% errors): {capacity} connections")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            # Still draining stuck requests
+            server.kill()
+            server.wait()
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Load-test suite for the API surface, with baselines to compare against.
+
+`run` serves the app with uvicorn (subprocess, from --app-dir) on a copy of
+a generated dataset, then runs each workload mix for --seconds at
+--concurrency connections after --warmup seconds. It writes p50/p95/p99
+latency, throughput, error rate and status counts per mix and per
+operation to a JSON file (--out):
+
+  feed      read-heavy browsing: front page and its tag/sort variants, hot
+            feed, article pages, comment threads
+  votes     vote storm: up/down/clear on a Zipf-skewed set of hot articles
+  search    title/snippet search (?q=), with some plain feed reads
+  comments  reading and posting comments
+  auth      logins (bcrypt at the app's cost) and registrations; past
+            password_hash_max_pending in flight the app sheds them with 429,
+            which counts as an error
+  stats     wrestler stats routes: list, profile, search, top rated
+            (--target integrated only)
+
+The dataset comes from `python -m app.jobs.generate_dataset`. With
+--dataset PATH it is generated once into PATH (plus PATH.wrestlers.json)
+and reused by later runs; every run serves a fresh copy, so votes and
+comments from one run never leak into the next. Generated users log in
+as user{n}@example.com with --password.
+
+--target news serves app.main:app. --target integrated serves
+backend/integrated_app.py (the news routes under /news, stats under
+/stats), which needs the integrated app's own requirements and the
+newsite checkout it imports from.
+
+`compare` reads two result files and flags every mix and operation whose
+p95 or p99 rose, or whose throughput fell, by more than --tolerance, or
+whose error rate rose by more than --error-tolerance. It exits with
+status 1 when anything regressed, so it can gate CI. `run --compare
+BASELINE` runs and compares in one go.
+
+The load generator shares the machine with the server: compare results
+from the same machine only.
+
+Usage:
+  python bench/load_suite.py run [--mix feed,votes,search] [--seconds 20] [--concurrency 50]
+                                 [--dataset big.db --articles 1000000] [--out results.json]
+                                 [--compare baseline.json]
+  python bench/load_suite.py compare baseline.json results.json [--tolerance 0.1]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SEARCH_TERMS = ["Cody", "Rhodes", "Okada", "title match", "injury", "contract", "return", "backstage", "Ripley"]
+FEED_TAGS = [None, None, None, "Confirmed", "Pending", "Rumor"]
+FEED_SORTS = [None, None, "top_week", "top_all"]
+COMMENT_BODIES = ["Great match.", "Source?", "Called it.", "Not buying it.", "Huge if true."]
+
+
+class Context:
+    """What the operations need: route prefixes, tokens and the dataset's ids."""
+
+    def __init__(self, args, dataset: dict, tokens: list[str], hot_ids: list[int], wrestler_ids: list[str]):
+        self.news = "/news" if args.target == "integrated" else ""
+        self.password = args.password
+        self.users = dataset["users"]
+        self.articles = dataset["articles"]
+        self.tokens = tokens
+        self.hot_ids = hot_ids or [1]
+        self.wrestler_ids = wrestler_ids or ["missing"]
+        self.registered = 0
+        self.run_id = int(time.time())
+
+    def auth(self, rng: random.Random) -> dict:
+        return {"Authorization": f"Bearer {rng.choice(self.tokens)}"}
+
+    def any_article(self, rng: random.Random) -> int:
+        return rng.randint(1, self.articles)
+
+    def hot_article(self, rng: random.Random) -> int:
+        # Pareto-skewed index: a handful of stories take most of the traffic
+        index = int(rng.paretovariate(1.2)) - 1
+        return self.hot_ids[index % len(self.hot_ids)]
+
+
+# --- Operations ---------------------------------------------------------------------
+
+
+async def op_feed(client, ctx, rng):
+    params = {"limit": 20}
+    tag, sort = rng.choice(FEED_TAGS), rng.choice(FEED_SORTS)
+    if tag:
+        params["tag"] = tag
+    if sort:
+        params["sort"] = sort
+    return await client.get(f"{ctx.news}/articles", params=params)
+
+
+async def op_feed_hot(client, ctx, rng):
+    return await client.get(f"{ctx.news}/articles", params={"sort": "hot", "limit": 20})
+
+
+async def op_article(client, ctx, rng):
+    article_id = ctx.hot_article(rng) if rng.random() < 0.7 else ctx.any_article(rng)
+    return await client.get(f"{ctx.news}/articles/{article_id}")
+
+
+async def op_comments(client, ctx, rng):
+    return await client.get(f"{ctx.news}/articles/{ctx.hot_article(rng)}/comments")
+
+
+async def op_comment_post(client, ctx, rng):
+    return await client.post(
+        f"{ctx.news}/articles/{ctx.hot_article(rng)}/comments",
+        headers=ctx.auth(rng),
+        json={"body": rng.choice(COMMENT_BODIES)},
+    )
+
+
+async def op_vote(client, ctx, rng):
+    direction = rng.choices(("up", "down", "clear"), (6, 3, 1))[0]
+    return await client.post(
+        f"{ctx.news}/vote", headers=ctx.auth(rng), json={"article_id": ctx.hot_article(rng), "direction": direction}
+    )
+
+
+async def op_search(client, ctx, rng):
+    return await client.get(f"{ctx.news}/articles", params={"q": rng.choice(SEARCH_TERMS), "limit": 20})
+
+
+async def op_login(client, ctx, rng):
+    email = f"user{rng.randint(1, ctx.users)}@example.com"
+    return await client.post(f"{ctx.news}/auth/login", data={"username": email, "password": ctx.password})
+
+
+async def op_register(client, ctx, rng):
+    ctx.registered += 1
+    email = f"load-{ctx.run_id}-{ctx.registered}@example.com"
+    return await client.post(f"{ctx.news}/auth/register", json={"email": email, "password": ctx.password})
+
+
+async def op_stats_wrestlers(client, ctx, rng):
+    return await client.get("/stats/wrestlers")
+
+
+async def op_stats_wrestler(client, ctx, rng):
+    return await client.get(f"/stats/wrestlers/{rng.choice(ctx.wrestler_ids)}")
+
+
+async def op_stats_search(client, ctx, rng):
+    return await client.get("/stats/search", params={"q": rng.choice(SEARCH_TERMS)})
+
+
+async def op_stats_top(client, ctx, rng):
+    return await client.get("/stats/top-rated", params={"limit": 10})
+
+
+async def op_stats_database(client, ctx, rng):
+    return await client.get("/stats/database-stats")
+
+
+# Weighted operations per workload
+MIXES = {
+    "feed": [(op_feed, 55), (op_feed_hot, 15), (op_article, 15), (op_comments, 15)],
+    "votes": [(op_vote, 85), (op_article, 15)],
+    "search": [(op_search, 70), (op_feed, 30)],
+    "comments": [(op_comments, 60), (op_comment_post, 40)],
+    "auth": [(op_login, 85), (op_register, 15)],
+    "stats": [
+        (op_stats_wrestlers, 25),
+        (op_stats_wrestler, 35),
+        (op_stats_search, 20),
+        (op_stats_top, 10),
+        (op_stats_database, 10),
+    ],
+}
+DEFAULT_MIXES = {"news": "feed,votes,search,comments,auth", "integrated": "feed,votes,search,comments,auth,stats"}
+
+
+# --- Measurement ----------------------------------------------------------------------
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(latencies: list[float], statuses: Counter, seconds: float) -> dict:
+    total = len(latencies)
+    if not total:
+        return {"requests": 0, "rps": 0, "p50_ms": 0, "p95_ms": 0, "p99_ms": 0, "error_rate": 0, "statuses": {}}
+    errors = sum(count for code, count in statuses.items() if code == "error" or int(code) >= 400)
+    return {
+        "requests": total,
+        "rps": round(total / seconds, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "error_rate": round(errors / total, 4),
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+async def run_mix(args, name: str, ctx: Context) -> dict:
+    operations, weights = zip(*MIXES[name])
+    samples = {op.__name__[3:]: ([], Counter()) for op in operations}
+    rng = random.Random(f"{args.seed}-{name}")
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30) as client:
+        warm_until = time.perf_counter() + args.warmup
+        stop = warm_until + args.seconds
+
+        async def worker():
+            while (now := time.perf_counter()) < stop:
+                op = rng.choices(operations, weights)[0]
+                try:
+                    code = str((await op(client, ctx, rng)).status_code)
+                except httpx.HTTPError:
+                    code = "error"
+                if now >= warm_until:
+                    latencies, statuses = samples[op.__name__[3:]]
+                    latencies.append(time.perf_counter() - now)
+                    statuses[code] += 1
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    per_op = {op: summarize(latencies, statuses, args.seconds) for op, (latencies, statuses) in samples.items()}
+    every = [latency for latencies, _ in samples.values() for latency in latencies]
+    result = summarize(every, sum((statuses for _, statuses in samples.values()), Counter()), args.seconds)
+    result["operations"] = per_op
+    return result
+
+
+# --- Dataset and server ------------------------------------------------------------------
+
+
+def prepare_dataset(args, tmpdir: str) -> tuple[Path, Path, dict]:
+    """A fresh copy of the dataset (generated first if needed), its wrestler JSON and its row counts."""
+    source = Path(args.dataset) if args.dataset else Path(tmpdir) / "dataset.db"
+    wrestlers = source.with_name(source.name + ".wrestlers.json")
+    if not source.exists():
+        print(f"generating {args.articles} articles, {args.users} users into {source}")
+        subprocess.run(
+            [
+                sys.executable, "-m", "app.jobs.generate_dataset",
+                "--articles", str(args.articles),
+                "--users", str(args.users),
+                "--password", args.password,
+                "--seed", str(args.seed),
+                "--wrestlers", str(args.wrestlers),
+                "--wrestlers-out", str(wrestlers),
+            ],
+            cwd=args.app_dir,
+            env={**os.environ, "APP_DATABASE_URL": f"sqlite:///{source}"},
+            check=True,
+        )
+    copy = Path(tmpdir) / "serve.db"
+    shutil.copy(source, copy)
+    with sqlite3.connect(copy) as conn:
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("users", "articles", "votes", "comments")}
+    counts["wrestlers"] = len(json.loads(wrestlers.read_text())["wrestlers"]) if wrestlers.exists() else 0
+    return copy, wrestlers, counts
+
+
+def start_server(args, database: Path, wrestlers: Path) -> subprocess.Popen:
+    env = {**os.environ, "APP_DATABASE_URL": f"sqlite:///{database}", "APP_ENVIRONMENT": "test"}
+    if args.target == "integrated":
+        command = ["integrated_app:app"]
+        env["WRESTLER_DATABASE_FILE"] = str(wrestlers)
+        env["PYTHONPATH"] = os.pathsep.join([args.app_dir, str(Path(args.app_dir) / "backend")])
+    else:
+        command = ["app.main:app"]
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *command, "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=args.app_dir,
+        env=env,
+        # Failures surface as 5xx in the error_rate column
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(args, server: subprocess.Popen) -> None:
+    health = "/health" if args.target == "integrated" else "/healthz"
+    deadline = time.time() + 120
+    while True:
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}{health}").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None or time.time() > deadline:
+            raise SystemExit("server did not start")
+        time.sleep(0.2)
+
+
+async def setup(args, dataset: dict) -> Context:
+    """Log in the token pool and look up the hot articles and some wrestler ids."""
+    news = "/news" if args.target == "integrated" else ""
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120) as client:
+        tokens = []
+        for n in range(1, min(args.token_users, dataset["users"]) + 1):
+            r = await client.post(f"{news}/auth/login", data={"username": f"user{n}@example.com", "password": args.password})
+            r.raise_for_status()
+            tokens.append(r.json()["access_token"])
+        hot = await client.get(f"{news}/articles", params={"sort": "hot", "limit": 100})
+        hot_ids = [a["id"] for a in hot.json()]
+        wrestler_ids = []
+        if args.target == "integrated":
+            wrestlers = await client.get("/stats/wrestlers")
+            wrestler_ids = [w["id"] for w in wrestlers.json().get("wrestlers", [])[:200]]
+    return Context(args, dataset, tokens, hot_ids, wrestler_ids)
+
+
+def git_revision(app_dir: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=app_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> int:
+    mixes = (args.mix or DEFAULT_MIXES[args.target]).split(",")
+    unknown = [m for m in mixes if m not in MIXES]
+    if unknown:
+        raise SystemExit(f"unknown mix {', '.join(unknown)}; choose from {', '.join(MIXES)}")
+    if "stats" in mixes and args.target != "integrated":
+        raise SystemExit("the stats routes are only served by --target integrated")
+    try:
+        httpx.get(f"http://127.0.0.1:{args.port}/")
+        raise SystemExit(f"port {args.port} is already serving; stop that server or pass --port")
+    except httpx.HTTPError:
+        pass
+
+    tmpdir = tempfile.TemporaryDirectory()
+    database, wrestlers, dataset = prepare_dataset(args, tmpdir.name)
+    server = start_server(args, database, wrestlers)
+    try:
+        wait_ready(args, server)
+        ctx = asyncio.run(setup(args, dataset))
+        results = {
+            "meta": {
+                "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "revision": git_revision(args.app_dir),
+                "target": args.target,
+                "concurrency": args.concurrency,
+                "seconds": args.seconds,
+                "workers": args.workers,
+                "dataset": dataset,
+                "python": platform.python_version(),
+                "machine": f"{platform.machine()} x{os.cpu_count()}",
+            },
+            "mixes": {},
+        }
+        print(f"app: {args.app_dir} ({results['meta']['revision']}), dataset: {dataset}")
+        print(f"{'mix':<10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>9} {'errors':>7}")
+        for name in mixes:
+            r = results["mixes"][name] = asyncio.run(run_mix(args, name, ctx))
+            print(f"{name:<10} {r['rps']:8.0f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:9.1f} {r['error_rate']:7.1%}")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        tmpdir.cleanup()
+
+    Path(args.out).write_text(json.dumps(results, indent=2) + "\n")
+    print(f"results written to {args.out}")
+    if args.compare:
+        return compare(json.loads(Path(args.compare).read_text()), results, args)
+    return 0
+
+
+# --- Comparison --------------------------------------------------------------------------
+
+
+def regressions(old: dict, new: dict, args) -> list[str]:
+    """What got worse between two summaries, one line per metric."""
+    found = []
+    for metric in ("p95_ms", "p99_ms"):
+        if old[metric] > 0 and new[metric] > old[metric] * (1 + args.tolerance):
+            found.append(f"{metric} {old[metric]:.1f} -> {new[metric]:.1f} (+{new[metric] / old[metric] - 1:.0%})")
+    if old["rps"] > 0 and new["rps"] < old["rps"] * (1 - args.tolerance):
+        found.append(f"rps {old['rps']:.0f} -> {new['rps']:.0f} ({new['rps'] / old['rps'] - 1:.0%})")
+    if new["error_rate"] > old["error_rate"] + args.error_tolerance:
+        found.append(f"error_rate {old['error_rate']:.1%} -> {new['error_rate']:.1%}")
+    return found
+
+
+def compare(baseline: dict, results: dict, args) -> int:
+    print(f"\ncomparing {baseline['meta'].get('revision')} ({baseline['meta']['created_at']}) "
+          f"-> {results['meta'].get('revision')} ({results['meta']['created_at']}), tolerance {args.tolerance:.0%}")
+    for key in ("target", "concurrency", "seconds", "workers", "dataset", "machine"):
+        if baseline["meta"].get(key) != results["meta"].get(key):
+            print(f"warning: the runs differ in {key}: {baseline['meta'].get(key)} vs {results['meta'].get(key)}")
+    regressed = 0
+    for name, new in results["mixes"].items():
+        old = baseline["mixes"].get(name)
+        if old is None:
+            print(f"{name:<10} new mix, no baseline")
+            continue
+        print(f"{name:<10} p95 {old['p95_ms']:.1f} -> {new['p95_ms']:.1f}ms, rps {old['rps']:.0f} -> {new['rps']:.0f}")
+        checks = [(name, old, new)] + [
+            (f"{name}/{op}", old["operations"][op], summary)
+            for op, summary in new["operations"].items()
+            if op in old.get("operations", {})
+        ]
+        for label, old_summary, new_summary in checks:
+            # Too few samples on both sides to tell noise from change
+            if max(old_summary["requests"], new_summary["requests"]) < args.min_requests:
+                continue
+            for line in regressions(old_summary, new_summary, args):
+                print(f"  REGRESSION {label}: {line}")
+                regressed += 1
+    print(f"{regressed} regression(s)" if regressed else "no regressions")
+    return 1 if regressed else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the workloads and write a results file")
+    run_parser.add_argument("--app-dir", default=str(ROOT), help="checkout whose app is served")
+    run_parser.add_argument("--target", choices=("news", "integrated"), default="news")
+    run_parser.add_argument("--mix", default=None, help=f"comma-separated, from {', '.join(MIXES)}")
+    run_parser.add_argument("--seconds", type=float, default=20, help="measured seconds per mix")
+    run_parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before each mix")
+    run_parser.add_argument("--concurrency", type=int, default=50)
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    run_parser.add_argument("--dataset", default=None, help="SQLite file to reuse (generated into if missing)")
+    run_parser.add_argument("--articles", type=int, default=100_000, help="when generating")
+    run_parser.add_argument("--users", type=int, default=10_000, help="when generating")
+    run_parser.add_argument("--wrestlers", type=int, default=500, help="when generating")
+    run_parser.add_argument("--password", default="loadtest", help="the generated users' password")
+    run_parser.add_argument("--token-users", type=int, default=20, help="users logged in up front for writes")
+    run_parser.add_argument("--port", type=int, default=8795)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--out", default="load_results.json")
+    run_parser.add_argument("--compare", default=None, metavar="BASELINE", help="compare against this results file")
+
+    compare_parser = commands.add_parser("compare", help="compare a results file against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--tolerance", type=float, default=0.10, help="allowed relative p95/p99/rps change")
+        sub.add_argument("--error-tolerance", type=float, default=0.01, help="allowed error-rate increase")
+        sub.add_argument("--min-requests", type=int, default=50, help="mixes and operations with fewer requests in both runs are not judged")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "run":
+        sys.exit(run(args))
+    baseline, results = (json.loads(Path(p).read_text()) for p in (args.baseline, args.results))
+    sys.exit(compare(baseline, results, args))
+
+
+if __name__ == "__main__":
+    main()
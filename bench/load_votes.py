@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Vote storm load test: many users hammer /vote on a single article at once,
+then the article's counters are checked against the votes table.
+
+Each simulated user sends a short sequence of up/down/clear votes one after
+another, while all users run concurrently. Counters must end up exactly
+equal to the aggregate of the votes table. When every request succeeded
+they must also match each user's last vote.
+
+By default the app is started in-process (uvicorn, temporary SQLite file).
+Point --database-url at Postgres to test row contention there, and pass
+--vote-buffer to exercise the coalescing vote buffer.
+
+Usage: python bench/load_votes.py [--users 1000] [--votes-per-user 3] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--votes-per-user", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--vote-buffer", action="store_true", help="run with APP_VOTE_BUFFER_ENABLED")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    tmpdir = None
+    if args.database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{tmpdir.name}/load_votes.db"
+    # Configure before the app modules read their settings
+    os.environ["APP_DATABASE_URL"] = args.database_url
+    os.environ.setdefault("APP_ENVIRONMENT", "test")
+    if args.vote_buffer:
+        os.environ["APP_VOTE_BUFFER_ENABLED"] = "true"
+
+    import httpx
+    import uvicorn
+    from sqlalchemy import func
+
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token, get_password_hash
+    from app.jobs.bootstrap import run_bootstrap
+    from app.main import app
+    from app.models.article import Article
+    from app.models.user import User
+    from app.models.vote import Vote
+
+    # The app's own bootstrap runs after startup; the schema is needed now, for seeding
+    run_bootstrap()
+    app.state.ready.set()
+    # Users are inserted directly and tokens minted locally: bcrypt per user would dominate the run
+    db = SessionLocal()
+    password_hash = get_password_hash("load-test")
+    users = [User(email=f"load{i}@example.com", password_hash=password_hash) for i in range(args.users)]
+    db.add_all(users)
+    article = Article(title="Vote storm target", canonical_url=f"https://example.com/storm/{time.time()}")
+    db.add(article)
+    db.commit()
+    article_id = article.id
+    tokens = [create_access_token(str(u.id)) for u in users]
+    db.close()
+
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning"))
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    rng = random.Random(args.seed)
+    plans = [[rng.choice(["up", "down", "clear"]) for _ in range(args.votes_per_user)] for _ in tokens]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    errors: list[str] = []
+
+    async def run_user(client: httpx.AsyncClient, token: str, plan: list[str]):
+        for direction in plan:
+            async with semaphore:
+                try:
+                    r = await client.post(
+                        "/vote",
+                        json={"article_id": article_id, "direction": direction},
+                        headers={"Authorization": f"Bearer {token}"},
+                    )
+                except httpx.HTTPError as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+                    continue
+            if r.status_code != 200:
+                errors.append(f"{r.status_code} {r.text[:100]}")
+
+    async def storm():
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await asyncio.gather(*(run_user(client, t, p) for t, p in zip(tokens, plans)))
+
+    total = args.users * args.votes_per_user
+    started = time.perf_counter()
+    asyncio.run(storm())
+    elapsed = time.perf_counter() - started
+    server.should_exit = True
+    # Shutdown flushes the vote buffer, so wait for it before counting
+    server_thread.join(timeout=30)
+
+    db = SessionLocal()
+    art = db.get(Article, article_id)
+    table_up = db.query(func.count()).filter(Vote.article_id == article_id, Vote.is_upvote == True).scalar()
+    table_down = db.query(func.count()).filter(Vote.article_id == article_id, Vote.is_upvote == False).scalar()
+    db.close()
+
+    print(f"{total} votes from {args.users} users in {elapsed:.2f}s ({total / elapsed:.0f} req/s), {len(errors)} errors")
+    for e in errors[:5]:
+        print(f"  error: {e}")
+    print(f"counters:    up={art.upvotes} down={art.downvotes}")
+    print(f"votes table: up={table_up} down={table_down}")
+    ok = (art.upvotes, art.downvotes) == (table_up, table_down)
+    if not errors:
+        expected_up = sum(1 for p in plans if p[-1] == "up")
+        expected_down = sum(1 for p in plans if p[-1] == "down")
+        print(f"expected:    up={expected_up} down={expected_down}")
+        ok = ok and (art.upvotes, art.downvotes) == (expected_up, expected_down)
+    print("PASS" if ok else "FAIL: counters drifted")
+    if tmpdir:
+        tmpdir.cleanup()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+# Settings are read at import, so the database must be chosen before the app is imported
+os.environ["APP_DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("APP_ENVIRONMENT", "test")
+os.environ["APP_STARTUP_BOOTSTRAP"] = "off"
+
+import pytest
+from fastapi.testclient import TestClient
+
+pytest_plugins = ["app.testing.query_budget"]
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.jobs.bootstrap import run_bootstrap
+    from app.main import app
+
+    # Bootstrap here rather than through the lifespan, which would also start the feed poller
+    run_bootstrap()
+    app.state.ready.set()
+    return TestClient(app)
+
+
+@pytest.fixture
+def cold_caches():
+    """Clear the auth caches, so requests take their most expensive path."""
+    from app.core.auth_cache import token_cache, user_cache
+
+    def clear():
+        token_cache.clear()
+        user_cache.clear()
+
+    return clear
+
+
+@pytest.fixture(scope="session")
+def auth(client):
+    client.post("/auth/register", json={"email": "budget@example.com", "password": "pw"})
+    token = client.post("/auth/login", data={"username": "budget@example.com", "password": "pw"}).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def admin(client):
+    credentials = {"username": "admin@example.com", "password": "pw"}
+    client.post("/auth/register", json={"email": credentials["username"], "password": credentials["password"]})
+    client.post("/auth/promote_self", data=credentials)
+    token = client.post("/auth/login", data=credentials).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
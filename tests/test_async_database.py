@@ -0,0 +1,39 @@
+import asyncio
+import sqlite3
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.core.async_database import AsyncWriteSessionLocal, async_url, asyncpg_connect_args
+
+
+def test_async_url_translates_libpq_parameters():
+    url = (
+        "postgresql://news:secret@db:5432/news"
+        "?sslmode=verify-full&connect_timeout=10&application_name=web&target_session_attrs=read-write"
+    )
+    assert async_url(url) == "postgresql+asyncpg://news:secret@db:5432/news?ssl=verify-full&target_session_attrs=read-write"
+    args = asyncpg_connect_args(url)
+    assert args["timeout"] == 10.0
+    assert args["server_settings"]["application_name"] == "web"
+
+
+def test_async_url_drops_parameters_asyncpg_rejects():
+    assert async_url("postgres://news@db/news?sslrootcert=/etc/ca.pem&keepalives=1") == "postgresql+asyncpg://news@db/news"
+
+
+def test_async_write_session_holds_the_write_lock(client):
+    async def write_lock_taken() -> bool:
+        async with AsyncWriteSessionLocal() as db:
+            # Only a read so far: a deferred BEGIN would not have taken the lock yet
+            await db.execute(text("SELECT 1"))
+            other = sqlite3.connect(make_url(str(db.bind.url)).database, timeout=0)
+            try:
+                other.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError:
+                return True
+            finally:
+                other.close()
+            return False
+
+    assert asyncio.run(write_lock_taken())
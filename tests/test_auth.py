@@ -0,0 +1,43 @@
+from app.core.database import SessionLocal
+from app.core.security import password_hasher
+from app.models.user import User
+
+
+def _login(client, email: str) -> tuple[dict, dict]:
+    credentials = {"username": email, "password": "pw"}
+    client.post("/auth/register", json={"email": email, "password": "pw"})
+    token = client.post("/auth/login", data=credentials).json()
+    return credentials, {"Authorization": f"Bearer {token['access_token']}"}
+
+
+def test_user_cache_follows_promotion_and_deactivation(client):
+    credentials, headers = _login(client, "cached@example.com")
+    # Warms both caches with a non-admin snapshot
+    assert client.get("/metrics/db-pool", headers=headers).status_code == 403
+
+    client.post("/auth/promote_self", data=credentials)
+    assert client.get("/metrics/db-pool", headers=headers).status_code == 200
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == credentials["username"]).one()
+        user.is_admin = False
+        db.commit()
+        assert client.get("/metrics/db-pool", headers=headers).status_code == 403
+
+        db.delete(user)
+        db.commit()
+    finally:
+        db.close()
+    assert client.get("/metrics/db-pool", headers=headers).status_code == 401
+
+
+def test_full_hash_queue_turns_sign_ins_away(client, monkeypatch):
+    monkeypatch.setattr(password_hasher, "pending", password_hasher.max_pending)
+    rejected = password_hasher.rejected
+    response = client.post("/auth/login", data={"username": "queued@example.com", "password": "pw"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert password_hasher.rejected == rejected + 1
+    # Refused before taking a slot, so the count is left as it was
+    assert password_hasher.pending == password_hasher.max_pending
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from app.core.config import get_settings
+from app.core.credibility import _wilson_formula, compute_credibility, wilson_lower_bound, wilson_lower_bound_lookup
+from app.jobs.rescore import compute_credibility_array
+
+
+def _domain() -> tuple[np.ndarray, np.ndarray]:
+    # Every pair the table covers, plus a ring just past its edge where the formula takes over
+    size = get_settings().credibility_wilson_table_size
+    up, down = np.indices((size + 2, size + 2))
+    return up.ravel(), down.ravel()
+
+
+def test_table_matches_the_formula():
+    z = get_settings().credibility_wilson_z
+    up, down = _domain()
+    looked_up = wilson_lower_bound_lookup(up, down)
+    for u, d, vectorized in zip(up.tolist(), down.tolist(), looked_up.tolist()):
+        expected = _wilson_formula(u, d, z)
+        assert wilson_lower_bound(u, d) == pytest.approx(expected, abs=1e-12)
+        assert vectorized == pytest.approx(expected, abs=1e-12)
+
+
+@pytest.mark.parametrize("source_score", [0.0, 0.5, 1.0])
+def test_vectorized_credibility_matches_compute_credibility(source_score):
+    up, down = _domain()
+    scores, tags = compute_credibility_array(up, down, np.full(up.shape, source_score))
+    for u, d, score, tag in zip(up.tolist(), down.tolist(), scores.tolist(), tags.tolist()):
+        expected_score, expected_tag = compute_credibility(u, d, source_score)
+        assert score == pytest.approx(expected_score, abs=1e-12)
+        assert tag == expected_tag
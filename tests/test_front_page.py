@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from app.api.articles import _feed_version
+from app.core.database import SessionLocal
+from app.core.front_page import FrontPageStore
+from app.models.article import Article
+
+
+def _insert(db, n: int) -> int:
+    # Written straight to the table, as another worker or a job would: no event reaches this process
+    article = Article(title=f"Front page story {n}", canonical_url=f"https://example.com/front/{n}")
+    db.add(article)
+    db.commit()
+    return article.id
+
+
+def test_snapshot_takes_events_without_a_rebuild(client):
+    store = FrontPageStore()
+    db = SessionLocal()
+    try:
+        _insert(db, 1)
+        version = _feed_version(db)
+        first = store.ids(db, None, "latest", 5, version)
+        assert store.misses == 1
+
+        newest = first[0] + 1000
+        store.apply(newest, "Pending", datetime.utcnow(), 0, 0)
+        assert store.ids(db, None, "latest", 5, version)[0] == newest
+        assert (store.hits, store.misses) == (1, 1)
+    finally:
+        db.close()
+
+
+def test_snapshot_rebuilds_when_the_feed_version_moves(client):
+    store = FrontPageStore()
+    db = SessionLocal()
+    try:
+        _insert(db, 2)
+        store.ids(db, None, "latest", 5, _feed_version(db))
+        written = _insert(db, 3)
+        assert store.ids(db, None, "latest", 5, _feed_version(db))[0] == written
+        assert store.misses == 2
+    finally:
+        db.close()
+
+
+def test_feed_etag_never_covers_a_stale_snapshot(client):
+    first = client.get("/articles")
+    db = SessionLocal()
+    try:
+        written = _insert(db, 4)
+    finally:
+        db.close()
+    second = client.get("/articles", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()[0]["id"] == written
@@ -0,0 +1,13 @@
+from fastapi.testclient import TestClient
+
+
+def test_anonymous_feed_is_shared_cacheable(client):
+    response = client.get("/articles")
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert "Cookie" in response.headers["vary"]
+
+
+def test_feed_is_private_after_own_write(client):
+    # mark_recent_write's cookie: the client reads the primary, so no shared copy may answer for it
+    writer = TestClient(client.app, cookies={"read_primary": "1"})
+    assert writer.get("/articles").headers["cache-control"] == "private, no-cache"
@@ -0,0 +1,39 @@
+from app.core.config import get_settings
+
+
+def _voters(client, count: int) -> list[dict]:
+    headers = []
+    for n in range(count):
+        email = f"learner{n}@example.com"
+        client.post("/auth/register", json={"email": email, "password": "pw"})
+        token = client.post("/auth/login", data={"username": email, "password": "pw"}).json()
+        headers.append({"Authorization": f"Bearer {token['access_token']}"})
+    return headers
+
+
+def test_learned_scores_follow_the_votes(client, admin, monkeypatch):
+    # Votes are committed by the time the job runs; nothing is in flight
+    monkeypatch.setattr(get_settings(), "source_score_lag_seconds", 0)
+    sources = {
+        name: client.post("/admin/sources", json={"name": f"Learning {name}", **extra}, headers=admin).json()["id"]
+        for name, extra in (("trusted", {}), ("doubted", {}), ("pinned", {"source_score": 0.9}))
+    }
+    voters = _voters(client, 3)
+    for name, direction in (("trusted", "up"), ("doubted", "down"), ("pinned", "down")):
+        article = client.post(
+            "/articles",
+            json={
+                "title": f"Story from {name}",
+                "canonical_url": f"https://example.com/learning/{name}",
+                "sources": [{"source_id": sources[name], "url": f"https://example.com/learning/{name}"}],
+            },
+            headers=admin,
+        ).json()
+        for headers in voters:
+            client.post("/vote", json={"article_id": article["id"], "direction": direction}, headers=headers)
+
+    assert client.post("/admin/learn-source-scores", headers=admin).status_code == 200
+    scores = {src["id"]: src["source_score"] for src in client.get("/admin/sources", headers=admin).json()}
+    assert scores[sources["trusted"]] > 0.5
+    assert scores[sources["doubted"]] < 0.5
+    assert scores[sources["pinned"]] == 0.9
@@ -0,0 +1,17 @@
+import pytest
+
+from app.core.config import get_settings
+
+
+@pytest.mark.parametrize("path", ["/metrics", "/metrics/db-pool"])
+def test_metrics_are_not_public(client, auth, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers=auth).status_code == 403
+
+
+@pytest.mark.parametrize("path", ["/metrics", "/metrics/db-pool"])
+def test_metrics_for_admins_and_the_scraper(client, admin, monkeypatch, path):
+    assert client.get(path, headers=admin).status_code == 200
+    monkeypatch.setattr(get_settings(), "metrics_scrape_token", "scrape-secret")
+    assert client.get(path, headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+    assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
@@ -0,0 +1,63 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.articles import router as articles_router
+from app.core.query_budget import ROUTE_BUDGETS, trace_app
+
+
+def _article(n: int, sources: int = 1) -> dict:
+    return {
+        "title": f"Budget story {n}",
+        "canonical_url": f"https://example.com/budget/{n}",
+        "sources": [{"source_id": s, "url": f"https://example.com/budget/{n}/{s}"} for s in range(1, sources + 1)],
+    }
+
+
+def test_every_budget_names_a_route(client):
+    names = {route.name for route in client.app.routes}
+    assert set(ROUTE_BUDGETS) <= names
+
+
+def test_create_article_does_not_grow_with_sources(client, auth, cold_caches, query_budget):
+    for n, sources in enumerate((0, 1, 3, 6)):
+        cold_caches()
+        with query_budget() as traces:
+            assert client.post("/articles", json=_article(n, sources), headers=auth).status_code == 200
+        assert traces[0].statements.most_common(1)[0][1] == 1
+
+
+def test_article_routes(client, auth, cold_caches, query_budget):
+    article = client.post("/articles", json=_article(100), headers=auth).json()
+    with query_budget():
+        client.get("/articles")
+        client.get("/articles", params={"q": "Budget", "sort": "hot"})
+        client.get(f"/articles/{article['id']}")
+        client.get(f"/articles/{article['id']}/comments")
+        cold_caches()
+        client.post(f"/articles/{article['id']}/comments", json={"body": "hi"}, headers=auth)
+
+
+def test_vote_flip(client, auth, cold_caches, query_budget):
+    article = client.post("/articles", json=_article(200), headers=auth).json()
+    with query_budget() as traces:
+        for direction in ("up", "down", "clear"):
+            cold_caches()
+            client.post("/vote", json={"article_id": article["id"], "direction": direction}, headers=auth)
+    assert [t.key for t in traces] == ["POST /vote"] * 3
+
+
+def test_auth_routes(client, query_budget):
+    with query_budget() as traces:
+        client.post("/auth/register", json={"email": "budget2@example.com", "password": "pw"})
+        client.post("/auth/login", data={"username": "budget2@example.com", "password": "pw"})
+    assert [t.limit for t in traces] == [ROUTE_BUDGETS["register"], ROUTE_BUDGETS["login"]]
+
+
+def test_budgets_apply_under_a_mount_prefix(client, query_budget):
+    mounted = FastAPI()
+    mounted.include_router(articles_router, prefix="/news")
+    trace_app(mounted)
+    with query_budget() as traces:
+        TestClient(mounted).get("/news/articles")
+    assert traces[0].key == "GET /news/articles"
+    assert traces[0].limit == ROUTE_BUDGETS["list_articles"]
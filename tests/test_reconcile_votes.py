@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.api import votes
+from app.core.database import JobSessionLocal, SessionLocal
+from app.core.vote_buffer import HEARTBEAT_PREFIX, HEARTBEAT_TTL_SECONDS, VoteBuffer
+from app.jobs.reconcile_votes import reconcile_vote_counters
+from app.models.article import Article
+from app.models.job_checkpoint import JobCheckpoint
+
+
+def _token(client, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "pw"})
+    token = client.post("/auth/login", data={"username": email, "password": "pw"}).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+def test_reconcile_repairs_a_crashed_buffer_next_to_a_live_one(client, auth, monkeypatch):
+    article = client.post(
+        "/articles", json={"title": "Buffered story", "canonical_url": "https://example.com/buffered", "sources": []}, headers=auth
+    ).json()
+
+    # This worker dies holding an up vote: the vote row is committed, its delta never flushed
+    crashed = VoteBuffer()
+    crashed._heartbeat_name = f"{HEARTBEAT_PREFIX}crashed:1"
+    monkeypatch.setattr(crashed, "flush", lambda: 0)
+    crashed.start()
+    monkeypatch.setattr(votes, "vote_buffer", crashed)
+    assert client.post("/vote", json={"article_id": article["id"], "direction": "up"}, headers=auth).json()["upvotes"] == 1
+    crashed._stop.set()
+    crashed._wake.set()
+    crashed._thread.join()
+    db = SessionLocal()
+    stale = datetime.utcnow() - timedelta(seconds=HEARTBEAT_TTL_SECONDS + 1)
+    db.execute(update(JobCheckpoint).where(JobCheckpoint.name == crashed._heartbeat_name).values(updated_at=stale))
+    db.commit()
+
+    # Another worker is alive and holds a down vote when reconciliation starts
+    live = VoteBuffer()
+    live.start()
+    monkeypatch.setattr(votes, "vote_buffer", live)
+    try:
+        other = _token(client, "buffered@example.com")
+        client.post("/vote", json={"article_id": article["id"], "direction": "down"}, headers=other)
+
+        job = JobSessionLocal()
+        try:
+            result = reconcile_vote_counters(job, pause_ms=0, restart=True)
+        finally:
+            job.close()
+        assert "skipped" not in result
+        assert result["repaired"] >= 1
+    finally:
+        live.stop()
+
+    row = db.get(Article, article["id"])
+    db.refresh(row)
+    # The lost up vote is repaired, the live buffer's down vote is counted once
+    assert (row.upvotes, row.downvotes) == (1, 1)
+    db.close()
+
+
+def test_reconcile_stops_for_a_buffer_that_does_not_go_write_through(client, monkeypatch):
+    from app.jobs import reconcile_votes
+
+    monkeypatch.setattr(reconcile_votes, "QUIESCE_WAIT_SECONDS", 0)
+    # Registered and heartbeating, but never following the lease
+    silent = VoteBuffer()
+    silent._heartbeat_name = f"{HEARTBEAT_PREFIX}silent:1"
+    silent._heartbeat()
+    try:
+        job = JobSessionLocal()
+        try:
+            result = reconcile_vote_counters(job, pause_ms=0)
+        finally:
+            job.close()
+        assert result["checked"] == 0
+        assert "silent:1" in result["skipped"]
+    finally:
+        silent._unregister()
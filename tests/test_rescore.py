@@ -0,0 +1,35 @@
+from sqlalchemy import update
+
+from app.core.database import JobSessionLocal
+from app.jobs import rescore
+from app.models.article import Article
+
+
+def test_rescore_counts_only_rows_it_wrote(client, auth, monkeypatch):
+    ids = [
+        client.post(
+            "/articles", json={"title": f"Rescore story {n}", "canonical_url": f"https://example.com/rescore/{n}", "sources": []}, headers=auth
+        ).json()["id"]
+        for n in range(2)
+    ]
+    db = JobSessionLocal()
+    try:
+        rescore.rescore_articles(db)
+        db.execute(update(Article).where(Article.id.in_(ids)).values(credibility_score=0.0))
+        db.commit()
+
+        hot_score_array = rescore.hot_score_array
+
+        def vote_lands_mid_chunk(*args):
+            # A vote on the second article commits between the chunk's read and its UPDATE
+            db.execute(update(Article).where(Article.id == ids[1]).values(upvotes=Article.upvotes + 1))
+            return hot_score_array(*args)
+
+        monkeypatch.setattr(rescore, "hot_score_array", vote_lands_mid_chunk)
+        assert rescore.rescore_articles(db)["changed"] == 1
+    finally:
+        db.close()
+
+
+def test_admin_rescore_runs_in_the_background(client, admin):
+    assert client.post("/admin/rescore", headers=admin).json() == {"status": "scheduled"}
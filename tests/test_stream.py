@@ -0,0 +1,37 @@
+import asyncio
+
+from app.core.events import event_bus, sse_stream
+
+
+class _HungUp:
+    # Disconnects as soon as the replay is written, so the stream ends there
+    async def is_disconnected(self) -> bool:
+        return True
+
+
+def _frames(last_event_id: str | None) -> list[str]:
+    async def collect() -> list[str]:
+        return [frame async for frame in sse_stream(event_bus, _HungUp(), last_event_id)]
+
+    return asyncio.run(collect())
+
+
+def _post(client, auth, n: int) -> int:
+    return client.post(
+        "/articles", json={"title": f"Streamed story {n}", "canonical_url": f"https://example.com/stream/{n}", "sources": []}, headers=auth
+    ).json()["id"]
+
+
+def test_last_event_id_replays_only_missed_events(client, auth):
+    _post(client, auth, 1)
+    seen = event_bus.replay_since(0)[0][-1].id
+    missed = [_post(client, auth, n) for n in (2, 3)]
+
+    frames = _frames(str(seen))
+    assert [frame.split("\n")[0] for frame in frames] == [f"id: {seen + 1}", f"id: {seen + 2}"]
+    assert all(f'"id":{article_id}' in frame for frame, article_id in zip(frames, missed))
+
+
+def test_last_event_id_outside_the_buffer_asks_for_a_reset(client, auth):
+    _post(client, auth, 4)
+    assert _frames("999999")[0] == "event: reset\ndata: {}\n\n"
@@ -0,0 +1,26 @@
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.core.vote_counters import apply_counter_delta
+from app.models.article import Article
+
+
+def test_counter_delta_is_relative_to_the_stored_counts(client, auth):
+    article = client.post(
+        "/articles", json={"title": "Counter story", "canonical_url": "https://example.com/counter", "sources": []}, headers=auth
+    ).json()
+    db = SessionLocal()
+    try:
+        # Another writer moves the counters after this session last saw the row
+        stale = db.get(Article, article["id"])
+        assert stale.upvotes == 0
+        other = SessionLocal()
+        other.execute(update(Article).where(Article.id == article["id"]).values(upvotes=5))
+        other.commit()
+        other.close()
+
+        row = apply_counter_delta(db, article["id"], 1, 2)
+        db.commit()
+        assert (row.upvotes, row.downvotes) == (6, 2)
+    finally:
+        db.close()